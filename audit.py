@@ -0,0 +1,231 @@
+# audit.py
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import serializer
+from search import normalize
+from store import atomic_write
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# DIFERENCIAS POR CAMPO
+# -----------------------------
+# Campos de un evento que se registran al crear, editar o borrar. Las
+# inscripciones van aparte, una entrada por usuario (ver `signup_diff`).
+AUDITED_FIELDS = (
+    "title", "description", "channel_id", "start", "end", "max_attendees", "multi_response",
+    "registration_open", "registration_close", "mention_roles", "allowed_roles", "assign_role",
+    "color", "image",
+)
+
+
+def audit_fields(event):
+    """Valores actuales de AUDITED_FIELDS, en el mismo formato que el archivo"""
+    return {
+        "title": event.title,
+        "description": event.description,
+        "channel_id": event.channel_id,
+        "start": event.start.isoformat(timespec="minutes"),
+        "end": event.end_text,
+        "max_attendees": event.max_attendees,
+        "multi_response": event.multi_response,
+        "registration_open": event.registration_open,
+        "registration_close": event.registration_close,
+        "mention_roles": list(event.mention_roles),
+        "allowed_roles": list(event.allowed_roles),
+        "assign_role": event.assign_role,
+        "color": event.color,
+        "image": event.image,
+    }
+
+
+# Al crear, importar o borrar basta con identificar el evento: las ediciones
+# posteriores guardan ya el valor anterior de cada campo que cambian
+SUMMARY_FIELDS = ("title", "channel_id", "start", "end")
+
+
+def field_diff(before, after, fields=AUDITED_FIELDS):
+    """{campo: [antes, después]} solo con lo que cambió; sin valor = None"""
+    return {
+        key: [before.get(key), after.get(key)]
+        for key in fields
+        if before.get(key) != after.get(key)
+    }
+
+
+def signup_diff(user_id, before, after):
+    return {"signup": [str(user_id), sorted(before), sorted(after)]}
+
+
+# -----------------------------
+# HISTORIAL DE CAMBIOS
+# -----------------------------
+class AuditLog:
+    """Historial de cambios de los eventos en JSON Lines, solo se añaden líneas.
+
+    Cada entrada guarda quién hizo qué y el diff de los campos que cambiaron,
+    no una copia del evento. Las entradas se agrupan y se añaden al archivo
+    desde un hilo. La retención (antigüedad y número máximo de entradas) se
+    aplica al cargar y en cada escritura; el archivo se reescribe, de forma
+    atómica y solo con lo que se conserva, cuando las líneas descartadas
+    pasan del 25 % del límite o, si hay alguna, cada `compact_every` segundos.
+    """
+
+    def __init__(self, path, max_age_days=90, max_entries=50000, delay=1.0, compact_every=86400):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self.delay = delay
+        self.compact_every = compact_every
+        self._stale = 0  # líneas del archivo que ya no se conservan
+        self._compacted = time.monotonic()
+        self._entries = deque()  # en orden de llegada
+        self._by_event = {}  # event_id -> [entrada]
+        self._titles = {}  # event_id -> último título conocido (también de eventos borrados)
+        self._pending = []  # entradas sin escribir
+        self._task = None
+        self._current = None  # escritura en curso en el hilo
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -----------------------------
+    # CARGA Y RETENCIÓN
+    # -----------------------------
+    def load(self):
+        """Lee el historial (en un hilo, al arrancar) y aplica la retención"""
+        if not os.path.exists(self.path):
+            return
+        skipped = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    self._index(serializer.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1  # línea a medias de un corte de luz
+        if skipped:
+            log.warning("Líneas del historial ilegibles descartadas", extra={"skipped": skipped})
+        if self._expire() or skipped:
+            atomic_write(self.path, self._snapshot())
+
+    def _index(self, entry):
+        self._entries.append(entry)
+        self._by_event.setdefault(entry["event"], []).append(entry)
+        if entry.get("title"):
+            self._titles[entry["event"]] = entry["title"]
+
+    def _expire(self):
+        """Quita lo que sobra por antigüedad o por número. Devuelve cuántas entradas quitó"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        while self._entries and (len(self._entries) > self.max_entries or self._entries[0]["t"] < cutoff):
+            entry = self._entries.popleft()
+            history = self._by_event[entry["event"]]
+            history.pop(0)
+            if not history:
+                del self._by_event[entry["event"]]
+                self._titles.pop(entry["event"], None)
+            removed += 1
+        return removed
+
+    def _snapshot(self):
+        return b"".join(serializer.dumps(entry) + b"\n" for entry in self._entries)
+
+    # -----------------------------
+    # REGISTRO
+    # -----------------------------
+    def record(self, event, user_id, action, diff=None):
+        """Añade una entrada (no bloquea). `diff` es {campo: [antes, después]}"""
+        entry = {"t": round(time.time(), 3), "event": event.id, "title": event.title, "user": user_id, "action": action}
+        if diff:
+            entry["diff"] = diff
+        self._index(entry)
+        self._pending.append(entry)
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin loop (scripts, pruebas): se escribe directamente
+            self._append(self._take_pending())
+            return
+        self._task = loop.create_task(self._run())
+
+    def _take_pending(self):
+        lines = b"".join(serializer.dumps(entry) + b"\n" for entry in self._pending)
+        self._pending = []
+        return lines
+
+    def _append(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.delay)
+            await self._write()
+
+    def _compact_due(self):
+        if self._stale > self.max_entries * 0.25:
+            return True
+        return self._stale > 0 and time.monotonic() - self._compacted >= self.compact_every
+
+    async def _write(self):
+        self._stale += self._expire()
+        if self._compact_due():
+            # Reescribir con la retención aplicada ya incluye lo pendiente
+            self._pending = []
+            self._stale = 0
+            self._compacted = time.monotonic()
+            write = asyncio.to_thread(atomic_write, self.path, self._snapshot())
+        else:
+            write = asyncio.to_thread(self._append, self._take_pending())
+        self._current = asyncio.ensure_future(write)
+        try:
+            # shield: cancelar la tarea (al apagar) no deja la escritura a medias
+            await asyncio.shield(self._current)
+        except OSError as e:
+            log.error("Error al guardar el historial %s: %s", self.path, e)
+
+    async def flush(self):
+        """Escribe lo pendiente (al apagar)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._current is not None and not self._current.done():
+            try:
+                await self._current
+            except OSError:
+                pass
+        if self._pending:
+            await asyncio.to_thread(self._append, self._take_pending())
+
+    # -----------------------------
+    # CONSULTAS
+    # -----------------------------
+    def history(self, event_id, limit=None):
+        """Entradas del evento, de la más reciente a la más antigua"""
+        entries = self._by_event.get(event_id, [])
+        return list(reversed(entries if limit is None else entries[-limit:]))
+
+    def find_events(self, query, limit=25):
+        """[(event_id, título)] con historial cuyo título contiene `query`, los más recientes primero"""
+        query = normalize(query).strip()
+        results = []
+        for event_id, history in sorted(self._by_event.items(), key=lambda item: item[1][-1]["t"], reverse=True):
+            title = self._titles.get(event_id, "")
+            if query in normalize(title):
+                results.append((event_id, title))
+                if len(results) == limit:
+                    break
+        return results
@@ -0,0 +1,93 @@
+# background.py
+import asyncio
+import logging
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# LATENCIA POR MANEJADOR
+# -----------------------------
+class LatencyStats:
+    """Últimas N duraciones (en segundos) de cada manejador"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}  # nombre -> deque de duraciones
+        self.counts = {}
+
+    def record(self, name, seconds):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def summary(self):
+        """nombre -> (llamadas, p50, p95, máximo) en milisegundos"""
+        result = {}
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+            p50 = ordered[len(ordered) // 2]
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            result[name] = (self.counts[name], p50 * 1000, p95 * 1000, ordered[-1] * 1000)
+        return result
+
+
+# -----------------------------
+# TAREAS EN SEGUNDO PLANO
+# -----------------------------
+class BackgroundTasks:
+    """Tareas lanzadas después de responder a Discord.
+
+    Se guarda una referencia a cada tarea (si no, el recolector de basura
+    puede cancelarlas a medias), se informa de sus errores y se mide cuánto
+    tardan.
+    """
+
+    def __init__(self, latency=None):
+        self.latency = latency
+        self._tasks = set()
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def spawn(self, coro, name):
+        task = asyncio.get_running_loop().create_task(self._run(coro, name), name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, coro, name):
+        started = time.perf_counter()
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            log.exception("Error en la tarea en segundo plano", extra={"task": name})
+        finally:
+            if self.latency is not None:
+                self.latency.record(f"bg:{name.split(':')[0]}", time.perf_counter() - started)
+
+    async def drain(self, timeout):
+        """Espera a las tareas pendientes hasta `timeout` segundos; devuelve las que no terminaron"""
+        if not self._tasks:
+            return set()
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        return pending
+
+    async def cancel(self, tasks, timeout=5):
+        """Cancela las tareas y les da `timeout` segundos para dejar constancia de dónde se quedaron"""
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def running(self, prefix):
+        """Tareas en curso cuyo nombre empieza por `prefix`"""
+        return [t for t in self._tasks if t.get_name().startswith(prefix)]
@@ -0,0 +1,139 @@
+# calendar_feed.py
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from models import NOT_ATTENDING_MASK, ROLE_BITS, ROLE_KEYS
+
+# -----------------------------
+# ICALENDAR (RFC 5545)
+# -----------------------------
+PRODID = "-//BOT-DISCORD-EVENTOS//Eventos//ES"
+# Roles que cuentan como asistencia en el resumen de cada evento
+ATTENDING_KEYS = [key for key in ROLE_KEYS if not ROLE_BITS[key] & NOT_ATTENDING_MASK]
+
+
+def escape_text(text):
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Parte las líneas de más de 75 bytes (RFC 5545 §3.1) sin cortar caracteres UTF-8"""
+    if len(line.encode()) <= 75:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(current)
+            # La continuación empieza por un espacio, que también cuenta
+            current, size = " ", 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts)
+
+
+def format_utc(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def signup_summary(event):
+    counts = {key: 0 for key in ATTENDING_KEYS}
+    for mask in event.signups.values():
+        for key in ATTENDING_KEYS:
+            if mask & ROLE_BITS[key]:
+                counts[key] += 1
+    return " · ".join(f"{key} {n}" for key, n in counts.items() if n)
+
+
+def render_vevent(event, url, stamp):
+    description = event.description or ""
+    summary = signup_summary(event)
+    if summary:
+        description += f"\n\nInscritos: {summary}"
+    if url:
+        description += f"\n{url}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.id}@eventos",
+        f"DTSTAMP:{format_utc(stamp)}",
+        f"DTSTART:{format_utc(event.start)}",
+        f"DTEND:{format_utc(event.end)}",
+        f"SUMMARY:{escape_text(event.title)}",
+        f"DESCRIPTION:{escape_text(description)}",
+    ]
+    if url:
+        lines.append(f"URL:{url}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) + "\r\n" for line in lines)
+
+
+# -----------------------------
+# FEED CON CACHÉ
+# -----------------------------
+class CalendarFeed:
+    """Calendario .ics de los próximos eventos, opcionalmente filtrado por clave de rol.
+
+    Cada VEVENT se guarda con una firma de los campos que muestra y solo se
+    vuelve a generar si cambian. El feed entero se guarda por (clave, versión
+    de los datos): mientras la versión no cambie, `current` devuelve el mismo
+    cuerpo y ETag sin recorrer los eventos. Last-Modified solo avanza cuando
+    el contenido cambia de verdad.
+    """
+
+    def __init__(self, name="Eventos"):
+        self.name = name
+        self._blocks = {}  # event_id -> (firma, VEVENT)
+        self._feeds = {}  # clave -> (versión, cuerpo, etag, last_modified)
+        self._lock = threading.Lock()  # se consulta desde el hilo del servidor web
+
+    def current(self, key, version):
+        """(cuerpo, etag, last_modified) si el feed de `key` sigue al día, si no None"""
+        with self._lock:
+            cached = self._feeds.get(key)
+        if cached and cached[0] == version:
+            return cached[1:]
+        return None
+
+    def render(self, key, version, events, role=None, url=None, now=None):
+        """Genera (o reutiliza) el feed. `url(event)` da el enlace al mensaje del evento"""
+        cached = self.current(key, version)
+        if cached:
+            return cached
+        now = now or datetime.now(timezone.utc)
+        bit = ROLE_BITS[role] if role else None
+        blocks, live = [], set()
+        for event in sorted(events, key=lambda e: e.start):
+            live.add(event.id)
+            if event.end < now:
+                continue
+            if bit and not any(mask & bit for mask in event.signups.values()):
+                continue
+            link = url(event) if url else None
+            signature = (event.title, event.description, event.start, event.end, link, signup_summary(event))
+            block = self._blocks.get(event.id)
+            if block is None or block[0] != signature:
+                block = self._blocks[event.id] = (signature, render_vevent(event, link, now))
+            blocks.append(block[1])
+        # Eventos borrados
+        for event_id in self._blocks.keys() - live:
+            del self._blocks[event_id]
+
+        name = f"{self.name} ({role})" if role else self.name
+        body = (
+            "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+            f"PRODID:{PRODID}\r\nCALSCALE:GREGORIAN\r\n"
+            + fold(f"X-WR-CALNAME:{escape_text(name)}") + "\r\n"
+            + "".join(blocks)
+            + "END:VCALENDAR\r\n"
+        ).encode()
+        etag = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            previous = self._feeds.get(key)
+            last_modified = previous[3] if previous and previous[2] == etag else now.replace(microsecond=0)
+            self._feeds[key] = (version, body, etag, last_modified)
+        return body, etag, last_modified
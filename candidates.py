@@ -0,0 +1,72 @@
+# candidates.py
+from bisect import bisect_left, insort
+
+from search import TOKEN_RE, normalize
+
+
+# -----------------------------
+# CANDIDATOS PARA AUTOCOMPLETAR
+# -----------------------------
+class CandidateIndex:
+    """Nombres de canales o roles ordenados para autocompletar por prefijo.
+
+    Cada palabra del nombre es también una entrada, así que "gen" encuentra
+    "chat-general". Se actualiza elemento a elemento con los eventos del
+    gateway en vez de recorrer guild.channels en cada consulta.
+    """
+
+    def __init__(self):
+        self._keys = []  # (clave normalizada, id) ordenadas
+        self._items = {}  # id -> (nombre, claves)
+
+    def __len__(self):
+        return len(self._items)
+
+    def rebuild(self, items):
+        """Sustituye todo el contenido por [(id, nombre)]"""
+        self._keys, self._items = [], {}
+        for item_id, name in items:
+            keys = self._keys_for(name)
+            self._items[item_id] = (name, keys)
+            self._keys.extend((key, item_id) for key in keys)
+        self._keys.sort()
+
+    def add(self, item_id, name):
+        self.remove(item_id)
+        keys = self._keys_for(name)
+        self._items[item_id] = (name, keys)
+        for key in keys:
+            insort(self._keys, (key, item_id))
+
+    def remove(self, item_id):
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return
+        for key in item[1]:
+            i = bisect_left(self._keys, (key, item_id))
+            if i < len(self._keys) and self._keys[i] == (key, item_id):
+                del self._keys[i]
+
+    def name(self, item_id):
+        item = self._items.get(item_id)
+        return item[0] if item else None
+
+    def complete(self, prefix, limit=25):
+        """[(id, nombre)] cuyo nombre o alguna de sus palabras empieza por `prefix`"""
+        prefix = normalize(prefix).strip()
+        results, seen = [], set()
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(results) < limit:
+            key, item_id = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if item_id not in seen:
+                seen.add(item_id)
+                results.append((item_id, self._items[item_id][0]))
+            i += 1
+        return results
+
+    @staticmethod
+    def _keys_for(name):
+        full = normalize(name)
+        return {full, *TOKEN_RE.findall(full)}
@@ -0,0 +1,270 @@
+# cogs/admin.py
+# Comandos básicos y de administración: /ping, /hola, /perf y /admin
+import asyncio
+import io
+import time
+from collections import Counter
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    AUDIT_RETENTION_DAYS, EXTENSIONS, add_commands, audit, background, bot, clip, guild_tz, image_cache, lag_monitor,
+    latency, log, member_cache, message_cache, profiler, recorder, recording_header, reminder_queue,
+    response_cache_stats, rest, settings, slow_callbacks, stats, store, sync_commands_if_changed, threads,
+)
+from profiling import render_profile
+from settings import timezone_names
+
+# -----------------------------
+# COMANDO /ping
+# -----------------------------
+@app_commands.command(name="ping", description="Responde con Pong!")
+async def ping(interaction: discord.Interaction):
+    await interaction.response.send_message("🏓 Pong!", ephemeral=True)
+
+# -----------------------------
+# COMANDO /hola
+# -----------------------------
+@app_commands.command(name="hola", description="Te saluda el bot")
+async def hola(interaction: discord.Interaction):
+    await interaction.response.send_message("👋 Hola! ¿Cómo estás?", ephemeral=True)
+
+# -----------------------------
+# COMANDOS /perf
+# -----------------------------
+# Diagnóstico en caliente, sin reiniciar: perfil con cProfile, avisos de
+# callbacks lentos del loop y un resumen de colas, cachés y latencias.
+perf = app_commands.Group(
+    name="perf",
+    description="Diagnóstico de rendimiento del bot",
+    default_permissions=discord.Permissions(administrator=True),
+    guild_only=True
+)
+
+@perf.command(name="perfil", description="Perfila el bot durante unos segundos y envía el informe")
+@app_commands.describe(segundos="Duración máxima del perfil (se puede cortar con /perf detener)")
+async def perfil(interaction: discord.Interaction, segundos: app_commands.Range[int, 1, 120] = 30):
+    if profiler.running:
+        await interaction.response.send_message("⚠️ Ya hay un perfil en curso. Usa `/perf detener` para terminarlo.", ephemeral=True)
+        return
+    await interaction.response.send_message(f"⏱️ Perfilando durante {segundos} s…", ephemeral=True)
+    background.spawn(send_profile(interaction, segundos), name="perfil")
+
+async def send_profile(interaction: discord.Interaction, seconds):
+    started = time.perf_counter()
+    profile = await profiler.run(seconds)
+    if profile is None:
+        return
+    elapsed = time.perf_counter() - started
+    # Ordenar y serializar las estadísticas es lento: fuera del loop
+    report, dump = await asyncio.to_thread(render_profile, profile)
+    log.info("Perfil terminado", extra={"elapsed_ms": round(elapsed * 1000), "user_id": interaction.user.id})
+    await interaction.followup.send(
+        f"📊 Perfil de {elapsed:.1f} s. `perfil.prof` se abre con `python -m pstats` o snakeviz.",
+        files=[
+            discord.File(io.BytesIO(report.encode()), filename="perfil.txt"),
+            discord.File(io.BytesIO(dump), filename="perfil.prof"),
+        ],
+        ephemeral=True
+    )
+
+@perf.command(name="detener", description="Termina antes de tiempo el perfil en curso")
+async def detener(interaction: discord.Interaction):
+    if profiler.stop():
+        await interaction.response.send_message("⏹️ Perfil detenido, ahora llega el informe.", ephemeral=True)
+    else:
+        await interaction.response.send_message("No hay ningún perfil en curso.", ephemeral=True)
+
+@perf.command(name="lentos", description="Activa o desactiva los avisos de callbacks lentos del loop")
+@app_commands.describe(activar="Activar el modo debug del loop", umbral_ms="Avisar de los callbacks que tarden más que esto")
+async def lentos(interaction: discord.Interaction, activar: bool, umbral_ms: app_commands.Range[int, 10, 5000] = 100):
+    loop = asyncio.get_running_loop()
+    if activar:
+        slow_callbacks.enable(loop, umbral_ms)
+        text = f"🐢 Avisos de callbacks de más de {umbral_ms} ms activados. Míralos en `/perf estado`."
+    else:
+        slow_callbacks.disable(loop)
+        text = "Avisos de callbacks lentos desactivados."
+    log.info("Modo debug del loop %s", "activado" if activar else "desactivado", extra={"threshold_ms": umbral_ms})
+    await interaction.response.send_message(text, ephemeral=True)
+
+@perf.command(name="grabar", description="Graba botones, comandos y DMs para reproducirlos con replay.py")
+@app_commands.describe(activar="Empezar (sí) o terminar (no) la grabación")
+async def grabar(interaction: discord.Interaction, activar: bool):
+    if activar:
+        if recorder.active:
+            await interaction.response.send_message(f"⚠️ Ya se está grabando en `{recorder.path}`.", ephemeral=True)
+            return
+        path = recorder.start(recording_header())
+        log.info("Grabación iniciada", extra={"path": path, "user_id": interaction.user.id})
+        await interaction.response.send_message(
+            f"⏺️ Grabando en `{path}`. Los DMs a los asistentes también se guardan; termina con `/perf grabar activar:False`.",
+            ephemeral=True
+        )
+        return
+    if not recorder.active:
+        await interaction.response.send_message("No hay ninguna grabación en curso.", ephemeral=True)
+        return
+    path, count = await recorder.stop()
+    log.info("Grabación terminada", extra={"path": path, "entries": count})
+    await interaction.response.send_message(
+        f"⏹️ {count} entradas en `{path}`. Reprodúcela con `python replay.py {path}`.", ephemeral=True
+    )
+
+@perf.command(name="estado", description="Retraso del loop, colas, cachés y latencias")
+async def estado(interaction: discord.Interaction):
+    await interaction.response.send_message(embed=build_status_embed(), ephemeral=True)
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return f"{hits / total:.0%} de {total}" if total else "sin datos"
+
+def build_status_embed():
+    embed = discord.Embed(title="🩺 Estado del bot", color=discord.Color.blurple())
+
+    lag = lag_monitor.summary()
+    embed.add_field(
+        name="⏳ Retraso del loop",
+        value=f"último {lag[0]:.1f} ms · p95 {lag[1]:.1f} ms · máx {lag[2]:.1f} ms" if lag else "Sin muestras",
+        inline=False
+    )
+
+    by_prefix = Counter(t.get_name().split(":")[0] for t in background.running(""))
+    tasks_text = f"{len(background)}"
+    if by_prefix:
+        tasks_text += " (" + ", ".join(f"{name}: {n}" for name, n in by_prefix.most_common()) + ")"
+    queues = [
+        f"Recordatorios programados: {len(reminder_queue)}",
+        f"Tareas en segundo plano: {tasks_text}",
+        "REST en cola: " + ", ".join(f"{name} {n}" for name, n in rest.queued().items())
+        + f" (cedidas por presupuesto: {rest.deferred}, fallidas: {rest.failed})",
+        f"Inscritos por anunciar en hilos: {threads.pending_count}",
+        f"Escritura pendiente: eventos {'sí' if store.writer.pending else 'no'}, estadísticas {'sí' if stats.writer.pending else 'no'}",
+    ]
+    embed.add_field(name="📥 Colas", value=clip("\n".join(queues), 1000), inline=False)
+
+    caches = [
+        f"Miembros: {hit_rate(member_cache.hits, member_cache.misses)} ({len(member_cache)} guardados)",
+        f"Respuestas: {hit_rate(response_cache_stats['hits'], response_cache_stats['misses'])}",
+        f"Imágenes: {hit_rate(image_cache.hits, image_cache.misses)}",
+        f"Mensajes de eventos: {len(message_cache)}",
+    ]
+    embed.add_field(name="🗃️ Cachés", value="\n".join(caches), inline=False)
+
+    slowest = sorted(latency.summary().items(), key=lambda item: item[1][2], reverse=True)[:8]
+    lines = [f"`{name}` ×{n}: p50 {p50:.0f} · p95 {p95:.0f} · máx {top:.0f} ms" for name, (n, p50, p95, top) in slowest]
+    embed.add_field(name="⏱️ Latencias (p95 más alto)", value=clip("\n".join(lines) or "Sin datos", 1000), inline=False)
+
+    if slow_callbacks.enabled or slow_callbacks.entries:
+        recent = list(slow_callbacks.entries)[-5:]
+        embed.add_field(name="🐢 Callbacks lentos", value=clip("\n".join(recent) or "Ninguno todavía", 1000), inline=False)
+    if profiler.running:
+        embed.set_footer(text="Hay un perfil en curso")
+    return embed
+
+# -----------------------------
+# COMANDOS /admin
+# -----------------------------
+admin = app_commands.Group(
+    name="admin",
+    description="Administración del bot",
+    default_permissions=discord.Permissions(administrator=True),
+    guild_only=True
+)
+
+@admin.command(name="recargar", description="Recarga un módulo del bot sin reiniciarlo")
+@app_commands.describe(modulo="Módulo a recargar; los eventos y las cachés se conservan")
+@app_commands.choices(modulo=[app_commands.Choice(name=name.split(".")[-1], value=name) for name in EXTENSIONS])
+async def recargar(interaction: discord.Interaction, modulo: str):
+    await interaction.response.defer(ephemeral=True)
+    started = time.perf_counter()
+    try:
+        # Si la versión nueva falla al cargar, discord.py vuelve a ejecutar el
+        # setup de la anterior, que registra otra vez comandos y manejadores
+        await bot.reload_extension(modulo)
+    except commands.ExtensionError as e:
+        log.exception("Error al recargar la extensión", extra={"extension": modulo})
+        await interaction.followup.send(clip(f"❌ No se pudo recargar **{modulo}**: {e}"), ephemeral=True)
+        return
+    await sync_commands_if_changed()
+    elapsed = time.perf_counter() - started
+    log.info("Extensión recargada", extra={"extension": modulo, "elapsed_ms": round(elapsed * 1000)})
+    await interaction.followup.send(f"🔄 **{modulo}** recargado en {elapsed * 1000:.0f} ms", ephemeral=True)
+
+@admin.command(name="zona_horaria", description="Zona horaria en la que se escriben las fechas de los eventos")
+@app_commands.describe(zona="Zona IANA, por ejemplo Europe/Madrid; vacío para ver la actual")
+async def zona_horaria(interaction: discord.Interaction, zona: str = None):
+    if zona is None:
+        await interaction.response.send_message(f"🕒 Zona horaria actual: **{guild_tz().key}**", ephemeral=True)
+        return
+    try:
+        tz = await asyncio.to_thread(settings.set_timezone, interaction.guild_id, zona)
+    except ValueError:
+        await interaction.response.send_message(f"❌ Zona horaria desconocida: `{clip(zona, 100)}`", ephemeral=True)
+        return
+    log.info("Zona horaria cambiada", extra={"guild_id": interaction.guild_id, "timezone": tz.key})
+    # Los eventos ya creados conservan su hora exacta; la zona se usa para las fechas nuevas
+    await interaction.response.send_message(
+        f"✅ Zona horaria: **{tz.key}**. Las fechas nuevas se interpretarán en esta zona; los eventos existentes no cambian de hora.",
+        ephemeral=True
+    )
+
+@admin.command(name="historial", description="Quién cambió qué en un evento, también si ya se borró")
+@app_commands.describe(evento="Evento (los borrados también aparecen)", limite="Cuántos cambios mostrar, del más reciente al más antiguo")
+async def historial(interaction: discord.Interaction, evento: str, limite: app_commands.Range[int, 1, 50] = 20):
+    entries = audit.history(evento, limite)
+    if not entries:
+        await interaction.response.send_message("📭 No hay cambios registrados para ese evento.", ephemeral=True)
+        return
+    embed = discord.Embed(
+        title=clip(f"🗂️ Historial: {entries[0]['title']}", 240),
+        description=clip("\n".join(format_audit_entry(entry) for entry in entries), 4000),
+        color=discord.Color.dark_teal()
+    )
+    embed.set_footer(text=f"Id {evento} · se conservan {AUDIT_RETENTION_DAYS} días")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def format_audit_value(value):
+    if value is None or value == []:
+        return "—"
+    return clip(str(value), 60)
+
+def format_audit_entry(entry):
+    who = f"<@{entry['user']}>" if entry.get("user") else "sistema"
+    line = f"<t:{int(entry['t'])}:f> {who} **{entry['action']}**"
+    changes = []
+    for key, change in entry.get("diff", {}).items():
+        if key == "signup":
+            # [usuario, roles antes, roles después]
+            changes.append(f"{', '.join(change[1]) or '—'} → {', '.join(change[2]) or '—'}")
+        else:
+            changes.append(f"`{key}` {format_audit_value(change[0])} → {format_audit_value(change[1])}")
+    if changes:
+        line += ": " + "; ".join(changes)
+    return line
+
+@historial.autocomplete("evento")
+async def historial_autocomplete(interaction: discord.Interaction, current: str):
+    return [
+        app_commands.Choice(name=clip(title or event_id, 85), value=event_id)
+        for event_id, title in audit.find_events(current)
+    ]
+
+TIMEZONE_NAMES = []  # se cargan en un hilo al cargar la extensión (ver setup)
+
+@zona_horaria.autocomplete("zona")
+async def zona_horaria_autocomplete(interaction: discord.Interaction, current: str):
+    current = current.lower()
+    matches = [name for name in TIMEZONE_NAMES if current in name.lower()]
+    return [app_commands.Choice(name=name, value=name) for name in matches[:25]]
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+async def setup(bot):
+    global TIMEZONE_NAMES
+    # Recorrer la base de zonas horarias lee cientos de archivos: fuera del loop
+    TIMEZONE_NAMES = await asyncio.to_thread(timezone_names)
+    add_commands(ping, hola, perf, admin)
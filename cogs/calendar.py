@@ -0,0 +1,112 @@
+# cogs/calendar.py
+# Consultas de solo lectura: /estadisticas y /proximos_eventos_visual
+from datetime import datetime, timezone
+
+import discord
+from discord import app_commands
+
+from core import BUTTONS, add_commands, cached_response, guild_tz, stats, store
+from stats import ATTENDANCE
+
+# -----------------------------
+# COMANDO /estadisticas
+# -----------------------------
+STATS_METRICS = [ATTENDANCE] + list(BUTTONS.keys())
+
+@app_commands.command(name="estadisticas", description="Ranking de asistencia o resumen de un usuario")
+@app_commands.describe(usuario="Ver el resumen de este usuario", metrica="Qué contar en el ranking", top="Cuántos puestos mostrar")
+@app_commands.choices(metrica=[app_commands.Choice(name=m.capitalize(), value=m) for m in STATS_METRICS])
+async def estadisticas(interaction: discord.Interaction, usuario: discord.Member = None, metrica: str = ATTENDANCE, top: app_commands.Range[int, 1, 25] = 10):
+    if usuario:
+        summary = stats.user_summary(usuario.id)
+        embed = discord.Embed(title=f"📊 Estadísticas de {usuario.display_name}", color=discord.Color.blue())
+        if not summary:
+            embed.description = "Sin inscripciones registradas."
+        embed.add_field(name="✅ Asistencias", value=str(summary.get(ATTENDANCE, 0)), inline=True)
+        embed.add_field(name="❔ Tentativo", value=str(summary.get("TENTATIVO", 0)), inline=True)
+        embed.add_field(name="❌ Declinado", value=str(summary.get("DECLINADO", 0)), inline=True)
+        roles_text = "\n".join(f"{BUTTONS[k][0]} {k}: {summary[k]}" for k in BUTTONS if summary.get(k))
+        if roles_text:
+            embed.add_field(name="Por rol", value=roles_text, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+
+    embed = cached_response(("estadisticas", metrica, top), lambda: build_leaderboard_embed(metrica, top))
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def build_leaderboard_embed(metrica, top):
+    ranking = stats.leaderboard(metrica, top)
+    embed = discord.Embed(
+        title=f"🏆 Ranking: {metrica.capitalize()}",
+        description="\n".join(f"**{i}.** <@{uid}> — {n}" for i, (uid, n) in enumerate(ranking, start=1)) or "Sin datos todavía.",
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text=f"{stats.events_counted} eventos contabilizados")
+    return embed
+
+# -----------------------------
+# COMANDO /proximos_eventos_visual
+# -----------------------------
+@app_commands.command(name="proximos_eventos_visual", description="Muestra los próximos eventos tipo calendario con emojis")
+async def proximos_eventos_visual(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True)
+    # Las horas van como marcas <t:...> que calcula cada cliente: el embed solo
+    # cambia cuando empieza un evento, así que vale la caché normal
+    embed = cached_response(("proximos_eventos", guild_tz().key), build_upcoming_embed)
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+def build_upcoming_embed():
+    now = datetime.now(timezone.utc)
+    tz = guild_tz()
+
+    # Filtrar eventos futuros
+    upcoming = [e for e in store.events if e.start >= now]
+
+    if not upcoming:
+        return discord.Embed(
+            title="📭 Sin eventos próximos",
+            description="No hay eventos futuros registrados.",
+            color=discord.Color.red()
+        )
+
+    # Ordenar por fecha
+    upcoming.sort(key=lambda e: e.start)
+
+    # Agrupar por día
+    events_by_day = {}
+    for e in upcoming:
+        start_dt = e.start.astimezone(tz)  # el día se agrupa en la zona del servidor
+        day_str = start_dt.strftime("%A, %d %B %Y")  # Ej. Lunes, 15 Septiembre 2025
+        if day_str not in events_by_day:
+            events_by_day[day_str] = []
+        events_by_day[day_str].append(e)
+
+    # Crear embed principal
+    embed = discord.Embed(
+        title="📅 Próximos eventos",
+        description="Eventos próximos organizados por día 🌟",
+        color=discord.Color.green()
+    )
+
+    for day_index, (day, day_events) in enumerate(events_by_day.items()):
+        value_text = ""
+        for e in day_events:
+            # Hora local de quien lo lee y tiempo relativo ("dentro de 2 horas")
+            time_str = discord.utils.format_dt(e.start, "t")
+            relative = discord.utils.format_dt(e.start, "R")
+
+            # Añadir detalles del evento
+            value_text += f"📌 {time_str} ({relative}) - **{e.title}** en <#{e.channel_id}>\n"
+
+        # Separador de semanas cada 7 días
+        week_emoji = "🗓️" if day_index % 7 == 0 else ""
+        embed.add_field(name=f"{week_emoji} {day}", value=value_text, inline=False)
+
+    return embed
+
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+async def setup(bot):
+    add_commands(estadisticas, proximos_eventos_visual)
@@ -0,0 +1,97 @@
+# cogs/registration.py
+# Botones de inscripción y de eliminar evento
+import asyncio
+
+import discord
+
+from audit import SUMMARY_FIELDS, audit_fields, field_diff, signup_diff
+from core import (
+    BUTTONS, add_interaction_handlers, audit, background, can_manage_event, conflicts, describe_conflicts,
+    get_event_message, interaction_handler, member_cache, message_cache, refresh_event_message,
+    remove_interaction_handlers, reminder_log, rest, search_index, span, stats, store, threads,
+)
+from outbound import EDIT
+
+# -----------------------------
+# INSCRIPCIÓN
+# -----------------------------
+@interaction_handler("rol")
+async def handle_register(interaction: discord.Interaction, event, role_key):
+    if role_key not in BUTTONS:
+        await interaction.followup.send("Rol no válido.", ephemeral=True)
+        return
+    user_id = interaction.user.id
+    if isinstance(interaction.user, discord.Member):
+        member_cache.put(interaction.user)
+
+    # Sin multi-respuesta, el nuevo rol sustituye a los anteriores
+    with span("store"):
+        before, after = event.sign_up(user_id, role_key)
+        stats.update(user_id, before, after)
+        store.save()
+        stats.save()
+        if before != after:
+            audit.record(event, user_id, "inscribir", signup_diff(user_id, before, after))
+
+    # Los nuevos inscritos se publican en el hilo en el siguiente resumen
+    attending = bool(after - {"DECLINADO"})
+    conflicts.set_member(event, user_id, attending)
+    if role_key != "DECLINADO":
+        threads.announce(event, [user_id])
+
+    message = f"✅ Te has inscrito como **{role_key}**"
+    overlapping = conflicts.member_conflicts(user_id, event) if attending else []
+    if overlapping:
+        message += "\n⚠️ A la misma hora ya estás inscrito en:\n" + describe_conflicts(overlapping)
+    with span("rest.followup"):
+        await interaction.followup.send(message, ephemeral=True)
+    background.spawn(refresh_event_message(event), name=f"refrescar:{event.id}")
+
+
+# -----------------------------
+# ELIMINAR EVENTO
+# -----------------------------
+@interaction_handler("eliminar")
+async def handle_delete(interaction: discord.Interaction, event, _arg):
+    if not can_manage_event(interaction.user, event):
+        await interaction.followup.send("Solo el creador del evento puede eliminarlo.", ephemeral=True)
+        return
+
+    # Se busca antes de quitarlo de la caché: get_event_message lo volvería a guardar
+    msg = get_event_message(event)
+    message_cache.pop(event.id, None)
+    store.remove(event)
+    audit.record(event, interaction.user.id, "eliminar", field_diff(audit_fields(event), {}, SUMMARY_FIELDS))
+    conflicts.remove_event(event)
+    search_index.remove(event.id)
+    threads.forget(event.id)
+    background.spawn(asyncio.to_thread(reminder_log.forget, event.id), name=f"olvidar_recordatorio:{event.id}")
+    if not event.started():
+        # Un evento que no llegó a celebrarse no cuenta en las estadísticas
+        stats.remove_event(event)
+        stats.save()
+    store.save()
+
+    if msg:
+        try:
+            await rest.run(EDIT, f"edit:{event.channel_id}", msg.delete)
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            await interaction.followup.send("No tengo permisos para eliminar el mensaje.", ephemeral=True)
+            return
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"Ocurrió un error: {e}", ephemeral=True)
+            return
+
+    await interaction.followup.send("Evento eliminado ✅", ephemeral=True)
+
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+async def setup(bot):
+    add_interaction_handlers(handle_register, handle_delete)
+
+async def teardown(bot):
+    remove_interaction_handlers(handle_register, handle_delete)
@@ -0,0 +1,305 @@
+# cogs/reminders.py
+# Recordatorios 15 minutos antes, lease entre réplicas y loops de hilos
+import asyncio
+import heapq
+import os
+from datetime import datetime, timedelta, timezone
+
+import discord
+from discord.ext import tasks
+
+import core
+from core import (
+    BUTTONS, LEASE_TTL, REMINDERS_RETENTION_DAYS, background, bot, ensure_members, latency, lease, log, reminder_log,
+    reminder_payloads, reminder_queue, resolve_member, rest, store, threads,
+)
+from outbound import DM, POST
+
+# -----------------------------
+# 🔹 RECORDATORIOS PREPARADOS
+# -----------------------------
+# Unos minutos antes de cada recordatorio se dejan hechos el embed, las
+# menciones y la lista de destinatarios de los DMs; a la hora en punto solo
+# queda enviar. Si cambian los inscritos se vuelve a preparar.
+REMINDER_PREPARE_MINUTES = int(os.getenv("REMINDER_PREPARE_MINUTES", "5"))
+
+def payload_signature(event):
+    """Todo lo que muestra el recordatorio preparado (ver build_reminder_payload)"""
+    return (event.title, event.start, event.channel_id, tuple(sorted(event.signups.items())))
+
+async def build_reminder_payload(event, channel):
+    """(embed, menciones, miembros a los que enviar DM)"""
+    guild = channel.guild
+
+    # Crear embed del recordatorio
+    reminder_embed = discord.Embed(
+        title=f"⏰ Recordatorio: {event.title}",
+        description=f"El evento empieza {discord.utils.format_dt(event.start, 'R')} en <#{channel.id}>!",
+        color=discord.Color.green()
+    )
+
+    # Preparar menciones y agregar campos por rol
+    mention_members = []  # Aquí guardamos objetos Member
+    mention_strings = []  # Aquí guardamos los .mention (str)
+
+    await ensure_members(guild, event.participant_ids(skip_declined=True))
+    for role_key in BUTTONS:
+        if role_key == "DECLINADO":
+            continue
+
+        user_ids = event.members_in(role_key)
+        members = [resolve_member(guild, uid) for uid in user_ids]
+
+        if user_ids:
+            reminder_embed.add_field(
+                name=f"{BUTTONS[role_key][0]} {role_key} ({len(user_ids)})",
+                value="\n".join(f"- {m.display_name if m else f'❓({uid})'}" for m, uid in zip(members, user_ids)),
+                inline=False
+            )
+
+        for member in members:
+            if member and member not in mention_members:
+                mention_members.append(member)
+                mention_strings.append(member.mention)  # <- convertir a string
+
+    return reminder_embed, mention_strings, mention_members
+
+async def reminder_payload(event, channel):
+    """El payload preparado si sigue valiendo; si no, se construye ahora"""
+    prepared = reminder_payloads.pop(event.id, None)
+    if prepared and prepared[0] == payload_signature(event):
+        return prepared[1:]
+    log.debug("Recordatorio sin preparar, se construye ahora", extra={"event_id": event.id})
+    return await build_reminder_payload(event, channel)
+
+@tasks.loop(seconds=30)
+async def prepare_reminders():
+    if not lease.is_leader:
+        return
+    now = datetime.now(timezone.utc)
+    horizon = now + timedelta(minutes=REMINDER_PREPARE_MINUTES)
+    # Se descartan los de eventos borrados, enviados o movidos más tarde
+    for event_id in list(reminder_payloads):
+        event = store.get(event_id)
+        if not event or event.reminder_sent or event.reminder_time > horizon:
+            del reminder_payloads[event_id]
+
+    for reminder_time, event_id in list(reminder_queue):
+        event = store.get(event_id)
+        if reminder_time > horizon or not event or event.reminder_sent or event.reminder_time != reminder_time:
+            continue
+        signature = payload_signature(event)
+        prepared = reminder_payloads.get(event_id)
+        if prepared and prepared[0] == signature:
+            continue
+        channel = bot.get_channel(event.channel_id)
+        if channel:
+            reminder_payloads[event_id] = (signature, *await build_reminder_payload(event, channel))
+
+
+# -----------------------------
+# 🔹 FUNCION DE RECORDATORIO
+# -----------------------------
+async def send_event_reminder(event, record=None):
+    """Envía un recordatorio 15 min antes, crea hilo y menciona participantes correctamente.
+
+    Con `record` continúa un envío interrumpido saltándose los pasos que ya
+    constan como hechos.
+    """
+    channel = bot.get_channel(event.channel_id)
+    if not channel:
+        return
+
+    on_time = record is None
+    if record is None:
+        # La marca se escribe antes de enviar nada: si otra réplica ya la creó,
+        # el recordatorio está enviado (o enviándose) y no se repite
+        record = await asyncio.to_thread(reminder_log.claim, event.id, lease.owner)
+        event.reminder_sent = True
+        store.save()
+        if record is None:
+            log.info("Recordatorio ya enviado por otra instancia", extra={"event_id": event.id})
+            return
+
+    steps = record.setdefault("steps", {})
+    sent_dms = set(record.setdefault("dms", []))
+    reminder_embed, mention_strings, mention_members = await reminder_payload(event, channel)
+
+    try:
+        # Enviar embed en el canal principal
+        if "anuncio" in steps:
+            reminder_msg = channel.get_partial_message(steps["anuncio"])
+        else:
+            reminder_msg = await rest.run(POST, f"post:{channel.id}", lambda: channel.send(
+                embed=reminder_embed,
+                content=f"Participantes confirmados: {', '.join(mention_strings)}" if mention_strings else None
+            ))
+            steps["anuncio"] = reminder_msg.id
+            if on_time:
+                lateness = (datetime.now(timezone.utc) - event.reminder_time).total_seconds()
+                latency.record("recordatorio:retraso", lateness)
+                log.info("Recordatorio publicado", extra={"event_id": event.id, "lateness_ms": round(lateness * 1000)})
+            await asyncio.to_thread(reminder_log.save, record)
+
+        # Reutilizar el hilo del evento o crearlo a partir del recordatorio
+        if "hilo" not in steps:
+            try:
+                thread = await threads.get_or_create(event, channel, starter=reminder_msg)
+            except discord.HTTPException as e:
+                log.warning("Error al crear el hilo del evento: %s", e, extra={"event_id": event.id})
+                thread = None
+
+            # Mensaje dentro del hilo
+            if thread:
+                if mention_members:
+                    welcome = "¡Bienvenidos al evento! " + " ".join(mention_strings)
+                else:
+                    welcome = "¡Bienvenidos al evento! No hay participantes aún."
+                await rest.run(POST, f"post:{thread.id}", lambda: thread.send(welcome))
+            steps["hilo"] = thread.id if thread else None
+            await asyncio.to_thread(reminder_log.save, record)
+
+        # Enviar DM a cada participante (se apunta cada envío para no repetirlo).
+        # Los DMs van los últimos en la cola de `rest`: no retrasan los botones.
+        dm_text = f"⏰ Tu evento **{event.title}** empieza {discord.utils.format_dt(event.start, 'R')} en <#{channel.id}>!"
+        for member in mention_members:
+            if member.id in sent_dms:
+                continue
+            try:
+                await rest.run(DM, "dm", lambda: member.send(dm_text))
+            except discord.HTTPException as e:
+                log.info("No se pudo enviar el DM del recordatorio: %s", e, extra={"event_id": event.id, "user_id": member.id})
+            sent_dms.add(member.id)
+            record["dms"].append(member.id)
+            if len(record["dms"]) % 10 == 0:
+                await asyncio.to_thread(reminder_log.save, record)
+    except asyncio.CancelledError:
+        # Apagado a mitad del envío: la siguiente instancia lo continúa
+        record["interrupted"] = True
+        await asyncio.shield(asyncio.to_thread(reminder_log.save, record))
+        log.warning("Recordatorio interrumpido", extra={"event_id": event.id, "dms_sent": len(record["dms"]), "dms_total": len(mention_members)})
+        raise
+
+    await asyncio.to_thread(reminder_log.complete, record)
+
+async def resume_interrupted_reminders():
+    """Continúa los recordatorios que otra instancia dejó a medias"""
+    for record in await asyncio.to_thread(reminder_log.unfinished):
+        event = store.get(record["event_id"])
+        if not event:
+            continue
+        record = await asyncio.to_thread(reminder_log.adopt, record, lease.owner)
+        log.info("Continuando el recordatorio", extra={"event_id": event.id})
+        # No se espera: los recordatorios a medias se continúan a la vez
+        background.spawn(send_event_reminder(event, record), name=f"recordatorio:{event.id}")
+
+
+# -----------------------------
+# 🔹 LOOP DE RECORDATORIOS
+# -----------------------------
+@tasks.loop(seconds=max(1, LEASE_TTL // 3))
+async def renew_lease():
+    was_leader = lease.is_leader
+    try:
+        await asyncio.to_thread(lease.try_acquire)
+    except OSError as e:
+        log.error("Error al renovar el lease: %s", e)
+        lease.is_leader = False
+    if lease.is_leader != was_leader:
+        log.info("Esta instancia programa los recordatorios" if lease.is_leader else "Otra instancia programa los recordatorios", extra={"owner": lease.owner})
+        if lease.is_leader:
+            background.spawn(resume_interrupted_reminders(), name="reanudar_recordatorios")
+
+# Cada segundo, para que el recordatorio salga a su hora; mirar la cabeza de
+# la cola no cuesta nada
+@tasks.loop(seconds=1)
+async def check_event_reminders():
+    # Solo la réplica con el lease envía recordatorios
+    if not lease.is_leader:
+        return
+    now = datetime.now(timezone.utc)
+    while reminder_queue and reminder_queue[0][0] <= now:
+        reminder_time, event_id = heapq.heappop(reminder_queue)
+        event = store.get(event_id)
+        if not event or event.reminder_sent:
+            continue
+        if event.reminder_time != reminder_time:
+            continue  # entrada antigua: el evento se editó y tiene otra entrada en la cola
+        # Como tarea registrada, para que el apagado pueda esperarla o interrumpirla.
+        # No se espera: varios recordatorios a la misma hora salen a la vez.
+        background.spawn(send_event_reminder(event), name=f"recordatorio:{event.id}")
+
+
+# Las marcas de recordatorios terminados se conservan unos días: una réplica
+# con una copia antigua de los eventos todavía podría intentar reenviarlos.
+# La primera pasada se hace al arrancar.
+@tasks.loop(hours=6)
+async def prune_reminder_log():
+    removed = await asyncio.to_thread(reminder_log.prune, REMINDERS_RETENTION_DAYS * 86400)
+    if removed:
+        log.info("%d marcas de recordatorio antiguas borradas", removed)
+
+
+# -----------------------------
+# 🔹 LOOPS DE HILOS
+# -----------------------------
+THREAD_DIGEST_SECONDS = int(os.getenv("THREAD_DIGEST_SECONDS", "120"))
+
+@tasks.loop(seconds=THREAD_DIGEST_SECONDS)
+async def post_thread_digests():
+    await threads.flush_digests(store.get)
+
+@tasks.loop(minutes=10)
+async def archive_finished_threads():
+    if not lease.is_leader:
+        return
+    now = datetime.now(timezone.utc)
+    finished = [
+        e for e in store.events
+        if e.thread_id and not e.thread_archived and e.end <= now
+    ]
+    if finished:
+        archived = await threads.archive(finished)
+        log.info("%d hilos archivados", archived)
+
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+# Los loops arrancan cuando el warm-up termina (evento "eventos_listos") o,
+# si la extensión se recarga después, directamente en setup.
+LOOPS = (renew_lease, prepare_reminders, check_event_reminders, prune_reminder_log, post_thread_digests, archive_finished_threads)
+
+def start_loops():
+    for loop in LOOPS:
+        if not loop.is_running():
+            loop.start()
+
+def stop_loops():
+    """Detiene los loops salvo el del lease, que se libera al salir (ver release_lease)"""
+    for loop in LOOPS:
+        if loop is not renew_lease:
+            loop.cancel()
+
+async def release_lease():
+    """Detiene la renovación, espera a que pare y suelta el lease: una renovación
+    posterior lo volvería a tomar durante LEASE_TTL y bloquearía a la siguiente instancia"""
+    renew_lease.cancel()
+    task = renew_lease.get_task()
+    if task is not None and not task.done():
+        await asyncio.wait({task})
+    # Sin mirar is_leader: una renovación cancelada puede seguir en su hilo
+    await asyncio.to_thread(lease.release)
+
+async def on_eventos_listos():
+    start_loops()
+
+async def setup(bot):
+    bot.add_listener(on_eventos_listos)
+    if core.ready:
+        start_loops()
+
+async def teardown(bot):
+    # Los recordatorios en curso son tareas de `background` y siguen su curso
+    for loop in LOOPS:
+        loop.cancel()
@@ -0,0 +1,57 @@
+# cogs/search.py
+# Búsqueda de eventos por texto: /buscar_evento
+import discord
+from discord import app_commands
+
+from core import add_commands, clip, create_event_embed, event_files, event_label, event_url, search_index, store
+
+# -----------------------------
+# COMANDO /buscar_evento
+# -----------------------------
+# El índice cubre también los eventos pasados; a igual puntuación sale antes
+# el más reciente
+RESULTS_SHOWN = 10
+
+def find_events(query, limit):
+    results = search_index.search(query, limit, rank=lambda eid: store.get(eid).start)
+    return [store.get(eid) for eid, _ in results]
+
+@app_commands.command(name="buscar_evento", description="Busca eventos por título, descripción o creador")
+@app_commands.describe(consulta="Palabras a buscar; no importan tildes ni mayúsculas")
+async def buscar_evento(interaction: discord.Interaction, consulta: str):
+    # Elegido en el autocompletado: el valor es el id del evento
+    event = store.get(consulta)
+    if event:
+        embed = await create_event_embed(event)
+        link = event_url(event)
+        # La imagen del embed puede ser un adjunto (attachment://): se sube con la respuesta
+        await interaction.response.send_message(
+            f"🔗 {link}" if link else None, embed=embed, files=event_files(event), ephemeral=True
+        )
+        return
+
+    events = find_events(consulta, RESULTS_SHOWN)
+    if not events:
+        await interaction.response.send_message(f"🔍 Ningún evento coincide con `{clip(consulta, 100)}`.", ephemeral=True)
+        return
+    lines = []
+    for e in events:
+        link = event_url(e)
+        title = f"[{e.title}]({link})" if link else e.title
+        lines.append(f"• **{title}** — {discord.utils.format_dt(e.start, 'f')}")
+    embed = discord.Embed(
+        title=f"🔍 Resultados para «{clip(consulta, 100)}»",
+        description=clip("\n".join(lines), 4000),
+        color=discord.Color.blue()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@buscar_evento.autocomplete("consulta")
+async def buscar_evento_autocomplete(interaction: discord.Interaction, current: str):
+    return [app_commands.Choice(name=event_label(e), value=e.id) for e in find_events(current, 25)]
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+async def setup(bot):
+    add_commands(buscar_evento)
@@ -0,0 +1,215 @@
+# cogs/store.py
+# Carga del almacén al arrancar, migraciones e importación/exportación de eventos
+import asyncio
+import tempfile
+from datetime import datetime
+
+import aiohttp
+import discord
+from discord import app_commands
+
+import core
+from audit import SUMMARY_FIELDS, audit_fields, field_diff
+from core import (
+    GUILD_ID, EventView, add_commands, audit, bot, clip, conflicts, create_event_embed, ensure_members,
+    event_files, guild_tz, image_cache, index_for_search, log, member_cache, message_cache, rebuild_message_cache,
+    rebuild_reminder_queue, rest, schedule_reminder, settings, stats, store,
+)
+from legacy import normalize_participants
+from outbound import POST
+
+# -----------------------------
+# EVENTO ON_READY
+# -----------------------------
+async def on_ready():
+    log.info("Bot conectado como %s", bot.user)
+
+    # on_ready se repite tras cada reconexión: el warm-up solo se hace una vez
+    if core.startup_done:
+        return
+    core.startup_done = True
+    bot.loop.create_task(warm_up())
+
+async def warm_up():
+    """Carga el almacén, pide los miembros usados y reconstruye las cachés en segundo plano"""
+    started = datetime.now()
+    await asyncio.to_thread(settings.load)
+    store.tz = guild_tz()  # fechas antiguas sin zona: hora del servidor
+    await asyncio.to_thread(store.load)
+    await load_stats()
+    await asyncio.to_thread(audit.load)
+
+    guild = bot.get_guild(GUILD_ID)
+    if guild:
+        await normalize_legacy_events(guild)
+        await chunk_event_members(guild)
+
+    rebuild_message_cache()
+    rebuild_reminder_queue()
+    conflicts.rebuild(store.events)
+    for event in store.events:
+        index_for_search(event)
+    referenced = {image_cache.local_name(e.image) for e in store.events} - {None}
+    removed = await asyncio.to_thread(image_cache.prune, referenced)
+    if removed:
+        log.info("%d imágenes sin usar borradas", removed)
+
+    # Los loops (cogs/reminders.py) arrancan al recibir este evento
+    core.ready = True
+    bot.dispatch("eventos_listos")
+
+    elapsed = (datetime.now() - started).total_seconds()
+    log.info("Warm-up completado", extra={"elapsed_ms": round(elapsed * 1000), "events": len(store.events)})
+
+def referenced_member_ids():
+    """Ids de creadores y participantes de todos los eventos"""
+    ids = set()
+    for event in store.events:
+        if event.creator_id:
+            ids.add(event.creator_id)
+        ids.update(event.signups)
+    return ids
+
+async def chunk_event_members(guild):
+    """Pide al gateway solo los miembros que aparecen en eventos"""
+    await ensure_members(guild, referenced_member_ids())
+
+async def resolve_member_name(guild, name):
+    """Id del miembro cuyo display_name o nombre coincide exactamente con `name`"""
+    try:
+        candidates = await guild.query_members(query=name[:100], limit=10, cache=False)
+    except (discord.HTTPException, asyncio.TimeoutError):
+        log.exception("Error al buscar el miembro", extra={"member_name": name})
+        return None
+    for member in candidates:
+        if name in (member.display_name, member.name, member.global_name):
+            member_cache.put(member)
+            return member.id
+    return None
+
+async def normalize_legacy_events(guild):
+    """Migración única: inscripciones guardadas por nombre -> ids de usuario"""
+    if not store.needs_migration:
+        return
+    changed = await normalize_participants(store.events, lambda name: resolve_member_name(guild, name))
+    # Las inscripciones convertidas pasan a contar en las estadísticas
+    for event, before in changed:
+        for user_id, roles in before.items():
+            stats.update(user_id, roles, event.roles_of(user_id))
+    store.mark_migrated()
+    stats.save()
+    pending = sum(len(names) for e in store.events if e.legacy_names for names in e.legacy_names.values())
+    log.info("%d eventos normalizados", len(changed), extra={"unresolved_names": pending})
+
+async def load_stats():
+    """Carga los agregados; si no existen se calculan una vez a partir de todos los eventos"""
+    if await asyncio.to_thread(stats.load):
+        return
+    stats.rebuild(store.events)
+    stats.save()
+    log.info("Estadísticas reconstruidas a partir de %d eventos", len(store.events))
+
+# -----------------------------
+# COMANDOS /eventos_importar y /eventos_exportar
+# -----------------------------
+async def download_attachment(attachment, fp, chunk_size=64 * 1024):
+    """Descarga el adjunto por trozos a `fp` sin cargarlo entero en memoria"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(attachment.url) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                await asyncio.to_thread(fp.write, chunk)
+    fp.seek(0)
+
+@app_commands.command(name="eventos_importar", description="Importa eventos desde un archivo JSON Lines o CSV")
+@app_commands.describe(archivo="Archivo .jsonl o .csv con un evento por fila", publicar="Publicar el embed de cada evento en su canal")
+@app_commands.default_permissions(manage_guild=True)
+async def eventos_importar(interaction: discord.Interaction, archivo: discord.Attachment, publicar: bool = False):
+    await interaction.response.defer(ephemeral=True)
+    import event_io  # se carga la primera vez que se usa
+
+    fmt = event_io.detect_format(archivo.filename)
+    if not fmt:
+        await interaction.followup.send("❌ El archivo debe ser .jsonl o .csv", ephemeral=True)
+        return
+
+    fp = await asyncio.to_thread(tempfile.TemporaryFile)
+    with fp:
+        try:
+            await download_attachment(archivo, fp)
+        except aiohttp.ClientError as e:
+            await interaction.followup.send(f"❌ No pude descargar el archivo: {e}", ephemeral=True)
+            return
+        # Validar en un hilo aparte para no bloquear el loop con miles de filas
+        valid, errors, error_count = await asyncio.to_thread(
+            event_io.read_events, fp, fmt, interaction.channel_id, interaction.user.id,
+            [e.id for e in store.events], guild_tz()
+        )
+
+    # Insertar todo el lote de una vez y guardar una sola vez
+    store.add_many(valid)
+    store.save()
+    # Creadores que vienen en el archivo: se piden para indexar su nombre
+    await ensure_members(bot.get_guild(GUILD_ID), {e.creator_id for e in valid if e.creator_id} - {interaction.user.id})
+    for event in valid:
+        schedule_reminder(event)
+        conflicts.index_event(event)
+        index_for_search(event, interaction.user.display_name if event.creator_id == interaction.user.id else None)
+        stats.add_event(event)
+        audit.record(event, interaction.user.id, "importar", field_diff({}, audit_fields(event), SUMMARY_FIELDS))
+    stats.save()
+
+    published = 0
+    if publicar:
+        for event in valid:
+            channel = bot.get_channel(event.channel_id)
+            if not channel:
+                continue
+            try:
+                embed = await create_event_embed(event)
+                sent_message = await rest.run(POST, f"post:{channel.id}", lambda: channel.send(embed=embed, view=EventView(event.id), files=event_files(event)))
+            except discord.HTTPException as e:
+                log.warning("Error al publicar el evento importado: %s", e, extra={"event_id": event.id})
+                continue
+            event.message_id = sent_message.id
+            message_cache[event.id] = sent_message
+            published += 1
+        if published:
+            store.save()
+
+    summary = f"✅ {len(valid)} eventos importados"
+    if publicar:
+        summary += f", {published} publicados"
+    if error_count:
+        summary += f"\n⚠️ {error_count} filas con errores:\n" + "\n".join(errors)
+        if error_count > len(errors):
+            summary += f"\n… y {error_count - len(errors)} más"
+    await interaction.followup.send(clip(summary), ephemeral=True)
+
+@app_commands.command(name="eventos_exportar", description="Exporta los eventos a un archivo JSON Lines o CSV")
+@app_commands.describe(formato="Formato del archivo")
+@app_commands.choices(formato=[app_commands.Choice(name="JSON Lines", value="jsonl"), app_commands.Choice(name="CSV", value="csv")])
+@app_commands.default_permissions(manage_guild=True)
+async def eventos_exportar(interaction: discord.Interaction, formato: str = "jsonl"):
+    await interaction.response.defer(ephemeral=True)
+    import event_io
+
+    # Se escribe a un archivo temporal en un hilo aparte y se sube desde disco
+    snapshot = [e.to_dict() for e in store.events]  # el hilo no debe ver cambios a medias
+    fp = await asyncio.to_thread(tempfile.TemporaryFile)
+    with fp:
+        await asyncio.to_thread(event_io.write_events, snapshot, fp, formato)
+        fp.seek(0)
+        await interaction.followup.send(
+            f"📦 {len(snapshot)} eventos exportados",
+            file=discord.File(fp, filename=f"eventos.{formato}"),
+            ephemeral=True
+        )
+
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+async def setup(bot):
+    bot.add_listener(on_ready)
+    add_commands(eventos_importar, eventos_exportar)
@@ -0,0 +1,736 @@
+# cogs/wizard.py
+# Asistentes por DM para crear (/eventos) y editar eventos
+import asyncio
+import heapq
+import uuid
+from datetime import datetime, timezone
+
+import discord
+from discord import app_commands
+
+import core
+from audit import SUMMARY_FIELDS, audit_fields, field_diff
+from core import (
+    GUILD_ID, EventView, add_commands, add_interaction_handlers, audit, background, bot,
+    can_manage_event, channel_candidates, clip, conflicts, create_event_embed, describe_conflicts,
+    event_files, event_label, guild_tz, image_cache, index_for_search, interaction_handler,
+    lifecycle, log, message_cache, rebuild_candidates, refresh_event_message, remove_interaction_handlers,
+    resolve_candidate, rest, role_candidates, schedule_reminder, search_index, selectable_role, stats, store,
+    wizard_users,
+)
+from images import INVALID_IMAGE_ERRORS
+from models import DATE_FORMAT, Event
+from outbound import EDIT, POST
+
+# -----------------------------
+# ESPERA POR MENSAJES
+# -----------------------------
+async def wait_for_number(user, dm, min_val, max_val, cancel_word="cancelar"):
+    def check(m):
+        return m.author == user and m.guild is None
+    while True:
+        msg = await bot.wait_for("message", check=check)
+        if msg.content.lower() == cancel_word:
+            return None
+        if msg.content.isdigit() and min_val <= int(msg.content) <= max_val:
+            return int(msg.content)
+        await dm.send(f"Introduce un número entre {min_val} y {max_val}, o '{cancel_word}' para salir.")
+
+async def wait_for_text(user, dm, max_length, allow_none=False, cancel_word="cancelar"):
+    def check(m):
+        return m.author == user and m.guild is None
+    while True:
+        msg = await bot.wait_for("message", check=check)
+        if msg.content.lower() == cancel_word:
+            return None
+        if allow_none and msg.content.lower() == "none":
+            return ""
+        if len(msg.content) <= max_length:
+            return msg.content
+        await dm.send(f"Texto demasiado largo. Máximo {max_length} caracteres. Escribe '{cancel_word}' para salir.")
+
+RESTARTING_MESSAGE = "🔄 El bot se está reiniciando. Inténtalo de nuevo en un minuto."
+
+async def run_wizard(wizard, user):
+    """Ejecuta un asistente por DM; si el apagado lo corta, avisa al usuario"""
+    wizard_users[user.id] += 1  # para que la grabación guarde sus respuestas
+    try:
+        await wizard
+    except asyncio.CancelledError:
+        try:
+            await user.send("🔄 El bot se ha reiniciado y el asistente se ha cancelado. Vuelve a empezar con el comando.")
+        except discord.HTTPException as e:
+            log.info("No se pudo avisar del asistente cancelado: %s", e, extra={"user_id": user.id})
+        raise
+    finally:
+        wizard_users[user.id] -= 1
+        if not wizard_users[user.id]:
+            del wizard_users[user.id]
+
+# -----------------------------
+# EDITAR EVENTO
+# -----------------------------
+@interaction_handler("editar")
+async def handle_edit(interaction: discord.Interaction, event, _arg):
+    if not can_manage_event(interaction.user, event):
+        await interaction.followup.send("Solo el creador del evento puede editarlo.", ephemeral=True)
+        return
+    if lifecycle.stopping:
+        await interaction.followup.send(RESTARTING_MESSAGE, ephemeral=True)
+        return
+
+    await interaction.followup.send(
+        "📬 Te enviaré un DM para editar el evento paso a paso.",
+        ephemeral=True
+    )
+    # El asistente puede durar minutos: no debe ocupar el despachador
+    background.spawn(run_wizard(edit_wizard(interaction, event), interaction.user), name=f"asistente:editar:{event.id}")
+
+@app_commands.command(name="editar_evento", description="Edita un evento paso a paso")
+@app_commands.describe(evento="Evento a editar", canal="Mover el evento a este canal")
+async def editar_evento(interaction: discord.Interaction, evento: str, canal: str = None):
+    event = store.get(evento)
+    if not event:
+        await interaction.response.send_message("❌ Evento no encontrado. Elígelo de la lista.", ephemeral=True)
+        return
+    if not can_manage_event(interaction.user, event):
+        await interaction.response.send_message("Solo el creador del evento puede editarlo.", ephemeral=True)
+        return
+    channel_id = None
+    if canal:
+        channel_id = resolve_candidate(channel_candidates, canal)
+        if channel_id is None:
+            await interaction.response.send_message(f"❌ Canal no encontrado: `{clip(canal, 100)}`", ephemeral=True)
+            return
+    if lifecycle.stopping:
+        await interaction.response.send_message(RESTARTING_MESSAGE, ephemeral=True)
+        return
+
+    await interaction.response.send_message("📬 Te enviaré un DM para editar el evento paso a paso.", ephemeral=True)
+    background.spawn(
+        run_wizard(edit_wizard(interaction, event, channel_id), interaction.user),
+        name=f"asistente:editar:{event.id}"
+    )
+
+@editar_evento.autocomplete("evento")
+async def editar_evento_autocomplete(interaction: discord.Interaction, current: str):
+    user = interaction.user
+    if current.strip():
+        results = search_index.search(current, limit=100, rank=lambda eid: store.get(eid).start)
+        events = [e for e in (store.get(eid) for eid, _ in results) if can_manage_event(user, e)][:25]
+    else:
+        # Sin texto: los próximos eventos que puede editar
+        now = datetime.now(timezone.utc)
+        events = heapq.nsmallest(
+            25, (e for e in store.events if e.start >= now and can_manage_event(user, e)), key=lambda e: e.start
+        )
+    return [app_commands.Choice(name=event_label(e), value=e.id) for e in events]
+
+def apply_edits(event, edits):
+    """Aplica los cambios del asistente de edición ({atributo: valor})"""
+    for key in ("title", "description", "channel_id", "end_text", "max_attendees"):
+        if key in edits:
+            setattr(event, key, edits[key])
+    # El fin se recalcula con el inicio y la duración definitivos
+    event.set_start(edits.get("start", event.start))
+
+async def edit_wizard(interaction: discord.Interaction, event, channel_id=None):
+    user = interaction.user
+
+    # Intentar enviar DM
+    try:
+        dm = await user.create_dm()
+        await dm.send(
+            "📬 Vamos a editar tu evento paso a paso.\n"
+            "Escribe `cancelar` en cualquier momento para detener."
+        )
+    except discord.Forbidden:
+        await interaction.followup.send(
+            "❌ No pude enviarte DM. Activa los mensajes privados del servidor.",
+            ephemeral=True
+        )
+        return
+
+    # === INICIO DEL FLUJO DE EDICIÓN ===
+    current_title = clip(event.title)
+    current_description = clip(event.description)
+    current_channel_id = event.channel_id
+    tz = guild_tz()
+    current_start = event.start.astimezone(tz).strftime(DATE_FORMAT)
+    current_end = event.end_text
+    current_max = event.max_attendees
+    # Los cambios se apuntan aquí y se aplican al final, todos a la vez: una
+    # edición cancelada (o cortada por un reinicio) no deja nada a medias
+    edits = {}
+
+    # -------------------------------------------
+    # 1️⃣ TÍTULO
+    # -------------------------------------------
+    await dm.send(
+        f"Título actual: **{current_title}**\n"
+        "Escribe el nuevo título o `skip`:"
+    )
+    new_title = await wait_for_text(user, dm, 200, allow_none=True)
+    if new_title is None:
+        await dm.send("❌ Edición cancelada.")
+        return
+    if new_title.lower() != "skip" and new_title.strip() != "":
+        edits["title"] = new_title
+
+    # -------------------------------------------
+    # 2️⃣ DESCRIPCIÓN
+    # -------------------------------------------
+    await dm.send(
+        f"Descripción actual: **{current_description or 'Ninguna'}**\n"
+        "Nueva descripción o `skip`:"
+    )
+    new_desc = await wait_for_text(user, dm, 1600, allow_none=True)
+    if new_desc is None:
+        await dm.send("❌ Edición cancelada.")
+        return
+    if new_desc.lower() != "skip":
+        edits["description"] = new_desc
+
+    # -------------------------------------------
+    # 3️⃣ CANAL
+    # -------------------------------------------
+    if channel_id is not None:
+        # Elegido con la opción `canal` de /editar_evento
+        edits["channel_id"] = channel_id
+    else:
+        guild = bot.get_guild(GUILD_ID)
+        text_channels = guild.text_channels
+
+        channels_list = "\n".join(f"{i+1}. {c.name}" for i, c in enumerate(text_channels))
+        channels_list = clip(channels_list, 1800)
+
+        await dm.send(
+            f"Canal actual: <#{current_channel_id}>\nSelecciona canal por número o `cancelar` para dejarlo igual "
+            "(si no aparece, usa la opción `canal` de /editar_evento):\n" + channels_list
+        )
+
+        chan_idx = await wait_for_number(user, dm, 1, len(text_channels))
+        if chan_idx is not None:
+            edits["channel_id"] = text_channels[chan_idx - 1].id
+
+    # -------------------------------------------
+    # 4️⃣ FECHA Y HORA
+    # -------------------------------------------
+    await dm.send(
+        f"Fecha actual: **{current_start}** (hora de {tz.key})\n"
+        "Nueva fecha `YYYY-MM-DD HH:MM` o `skip`:"
+    )
+
+    while True:
+        msg_time = await bot.wait_for(
+            "message",
+            check=lambda m: m.author == user and m.guild is None
+        )
+
+        if msg_time.content.lower() == "cancelar":
+            await dm.send("❌ Edición cancelada.")
+            return
+
+        if msg_time.content.lower() == "skip":
+            break
+
+        try:
+            edits["start"] = datetime.strptime(msg_time.content, DATE_FORMAT).replace(tzinfo=tz)
+            break
+        except ValueError:
+            await dm.send("Formato inválido. Intenta de nuevo.")
+
+    # -------------------------------------------
+    # 5️⃣ DURACIÓN
+    # -------------------------------------------
+    await dm.send(
+        f"Duración actual: **{current_end or 'Ninguna'}**\n"
+        "Nueva duración o `skip`:"
+    )
+
+    new_duration = await wait_for_text(user, dm, 100, allow_none=True)
+    if new_duration and new_duration.lower() != "skip":
+        edits["end_text"] = new_duration
+
+    # -------------------------------------------
+    # 6️⃣ MÁXIMO ASISTENTES
+    # -------------------------------------------
+    await dm.send(
+        f"Máximo actual: **{current_max or 'Ninguno'}**\n"
+        "Nuevo número (1–250) o `skip`:"
+    )
+
+    while True:
+        msg = await bot.wait_for(
+            "message",
+            check=lambda m: m.author == user and m.guild is None
+        )
+
+        if msg.content.lower() == "cancelar":
+            await dm.send("❌ Edición cancelada.")
+            return
+
+        if msg.content.lower() == "skip":
+            break
+
+        if msg.content.isdigit() and 1 <= int(msg.content) <= 250:
+            edits["max_attendees"] = int(msg.content)
+            break
+
+        await dm.send("Valor inválido. Intenta de nuevo.")
+
+    # -------------------------------------------
+    # GUARDAR CAMBIOS
+    # -------------------------------------------
+    before = audit_fields(event)
+    reminder_time = event.reminder_time
+    apply_edits(event, edits)
+    changes = field_diff(before, audit_fields(event))
+    if changes:
+        audit.record(event, user.id, "editar", changes)
+    store.save()
+    if event.reminder_time != reminder_time:
+        # La entrada antigua de la cola se descarta sola al salir (ver check_event_reminders)
+        schedule_reminder(event)
+    conflicts.index_event(event)
+    index_for_search(event, user.display_name if user.id == event.creator_id else None)
+    overlapping = conflicts.channel_conflicts(event)
+    if overlapping:
+        await dm.send("⚠️ El evento se solapa con otros del mismo canal:\n" + describe_conflicts(overlapping))
+
+    # -------------------------------------------
+    # ACTUALIZAR MENSAJE ORIGINAL
+    # -------------------------------------------
+    if event.channel_id != current_channel_id:
+        # El mensaje se vuelve a publicar en el canal nuevo
+        old_channel = bot.get_channel(current_channel_id)
+        message_cache.pop(event.id, None)
+        if old_channel and event.message_id:
+            old_message = old_channel.get_partial_message(event.message_id)
+            try:
+                await rest.run(EDIT, f"edit:{old_channel.id}", old_message.delete)
+            except discord.HTTPException as e:
+                log.warning("No se pudo borrar el mensaje del canal anterior: %s", e, extra={"event_id": event.id})
+        event.message_id = None
+    await refresh_event_message(event, notice="Hubo un error actualizando el evento. Enviando uno nuevo.")
+
+    await dm.send("✅ **Evento editado correctamente.**")
+
+# -----------------------------
+# COMANDO /eventos
+# -----------------------------
+@app_commands.command(
+    name="eventos",
+    description="Crear un evento paso a paso"
+)
+@app_commands.describe(
+    canal="Canal donde publicar; si no se indica, se pregunta por DM",
+    mencionar="Rol a mencionar al publicar",
+    rol_asistentes="Rol que se asigna a quien se inscribe"
+)
+async def eventos(interaction: discord.Interaction, canal: str = None, mencionar: str = None, rol_asistentes: str = None):
+    if lifecycle.stopping:
+        await interaction.response.send_message(RESTARTING_MESSAGE, ephemeral=True)
+        return
+    # Las opciones llegan como id (elegidas en el autocompletado) o como texto libre
+    preset = {}
+    for option, value, candidates, what in (
+        ("channel_id", canal, channel_candidates, "Canal"),
+        ("mention_role", mencionar, role_candidates, "Rol"),
+        ("assign_role", rol_asistentes, role_candidates, "Rol"),
+    ):
+        if value:
+            preset[option] = resolve_candidate(candidates, value)
+            if preset[option] is None:
+                await interaction.response.send_message(f"❌ {what} no encontrado: `{clip(value, 100)}`", ephemeral=True)
+                return
+    await interaction.response.defer(ephemeral=True)  # Dice a Discord "espera"
+    await interaction.followup.send("Te enviaré un DM para crear el evento paso a paso.", ephemeral=True)
+    background.spawn(run_wizard(create_wizard(interaction, **preset), interaction.user), name=f"asistente:crear:{interaction.user.id}")
+
+# -----------------------------
+# AUTOCOMPLETADO DE CANALES Y ROLES
+# -----------------------------
+# Las listas numeradas por DM no caben en servidores grandes; las opciones de
+# los comandos se autocompletan desde channel_candidates y role_candidates
+def candidate_choices(candidates, current, prefix=""):
+    return [
+        app_commands.Choice(name=clip(prefix + name, 85), value=str(item_id))
+        for item_id, name in candidates.complete(current)
+    ]
+
+@eventos.autocomplete("canal")
+@editar_evento.autocomplete("canal")
+async def canal_autocomplete(interaction: discord.Interaction, current: str):
+    return candidate_choices(channel_candidates, current, prefix="#")
+
+@eventos.autocomplete("mencionar")
+@eventos.autocomplete("rol_asistentes")
+async def rol_autocomplete(interaction: discord.Interaction, current: str):
+    return candidate_choices(role_candidates, current, prefix="@")
+
+def update_channel(channel):
+    if channel.guild.id != GUILD_ID:
+        return
+    if isinstance(channel, discord.TextChannel):
+        channel_candidates.add(channel.id, channel.name)
+    else:
+        channel_candidates.remove(channel.id)
+
+def update_role(role):
+    if role.guild.id != GUILD_ID:
+        return
+    if selectable_role(role):
+        role_candidates.add(role.id, role.name)
+    else:
+        role_candidates.remove(role.id)
+
+async def on_guild_channel_create(channel):
+    update_channel(channel)
+
+async def on_guild_channel_update(before, after):
+    update_channel(after)
+
+async def on_guild_channel_delete(channel):
+    channel_candidates.remove(channel.id)
+
+async def on_guild_role_create(role):
+    update_role(role)
+
+async def on_guild_role_update(before, after):
+    update_role(after)
+
+async def on_guild_role_delete(role):
+    role_candidates.remove(role.id)
+
+async def on_eventos_listos():
+    rebuild_candidates(bot.get_guild(GUILD_ID))
+
+async def create_wizard(interaction: discord.Interaction, channel_id=None, mention_role=None, assign_role=None):
+    user = interaction.user
+    dm = await user.create_dm()
+
+    # -----------------------------
+    # 1️⃣ Canal
+    # -----------------------------
+    if channel_id is None:
+        await dm.send("¿Dónde publicar el evento?\n1️⃣ Canal actual\n2️⃣ Otro canal\nEscribe el número o 'cancelar'.")
+        option = await wait_for_number(user, dm, 1, 2)
+        if option is None:
+            await dm.send("Creación cancelada.")
+            return
+
+        if option == 1:
+            channel_id = interaction.channel_id
+        else:
+            guild = bot.get_guild(GUILD_ID)
+            text_channels = guild.text_channels
+            await dm.send(clip(
+                "Listado de canales (si no aparece, usa la opción `canal` de /eventos):\n"
+                + "\n".join(f"{i+1}. {c.name}" for i, c in enumerate(text_channels))
+            ))
+            chan_option = await wait_for_number(user, dm, 1, len(text_channels))
+            if chan_option is None:
+                await dm.send("Creación cancelada.")
+                return
+            channel_id = text_channels[chan_option - 1].id
+
+    # -----------------------------
+    # 2️⃣ Título
+    # -----------------------------
+    await dm.send("Ingresa el título del evento (máx 200 caracteres):")
+    title = await wait_for_text(user, dm, 200)
+    if title is None:
+        await dm.send("Creación cancelada.")
+        return
+
+    # -----------------------------
+    # 3️⃣ Descripción
+    # -----------------------------
+    await dm.send("Ingresa la descripción (máx 1600 caracteres, 'None' para sin descripción):")
+    description = await wait_for_text(user, dm, 1600, allow_none=True)
+    if description is None:
+        await dm.send("Creación cancelada.")
+        return
+
+    # -----------------------------
+    # 4️⃣ Máximo asistentes
+    # -----------------------------
+    await dm.send("Número máximo de asistentes (1-250, 'None' para sin límite):")
+    while True:
+        msg = await bot.wait_for("message", check=lambda m: m.author == user and m.guild is None)
+        if msg.content.lower() == "cancelar":
+            await dm.send("Creación cancelada.")
+            return
+        if msg.content.lower() == "none":
+            max_attendees = None
+            break
+        if msg.content.isdigit() and 1 <= int(msg.content) <= 250:
+            max_attendees = int(msg.content)
+            break
+        await dm.send("Número inválido. Intenta de nuevo.")
+
+    # -----------------------------
+    # 5️⃣ Fecha inicio
+    # -----------------------------
+    tz = guild_tz()
+    await dm.send(f"Fecha y hora de inicio ('YYYY-MM-DD HH:MM', hora de {tz.key}) o 'ahora':")
+    while True:
+        msg_time = await bot.wait_for("message", check=lambda m: m.author == user and m.guild is None)
+        if msg_time.content.lower() == "cancelar":
+            await dm.send("Creación cancelada.")
+            return
+        try:
+            start_dt = datetime.now(tz) if msg_time.content.lower() == "ahora" else datetime.strptime(msg_time.content, DATE_FORMAT).replace(tzinfo=tz)
+            break
+        except ValueError:
+            await dm.send("Formato inválido. Intenta de nuevo.")
+
+    # -----------------------------
+    # 6️⃣ Duración
+    # -----------------------------
+    await dm.send("Duración del evento (ej. '2 horas', '1 día', '30 minutos') o 'None' si no hay duración:")
+    duration = await wait_for_text(user, dm, 100, allow_none=True)
+
+    event = Event(
+        id=str(uuid.uuid4()),
+        title=title,
+        description=description or "Sin descripción",
+        channel_id=channel_id,
+        start=start_dt.replace(second=0, microsecond=0),
+        end_text=duration or "No especificada",
+        creator_id=user.id,
+        max_attendees=max_attendees,
+        mention_roles=[mention_role] if mention_role else [],
+        assign_role=assign_role,
+    )
+
+    # Aviso (sin bloquear) si el canal ya tiene un evento a esa hora
+    overlapping = conflicts.channel_conflicts(event)
+    if overlapping:
+        await dm.send(
+            "⚠️ Ya hay eventos en ese canal a la misma hora:\n" + describe_conflicts(overlapping)
+            + "\nPuedes seguir igualmente o escribir 'cancelar' en el siguiente paso."
+        )
+
+    # -----------------------------
+    # 7️⃣ OPCIONES AVANZADAS
+    # -----------------------------
+    guild = bot.get_guild(GUILD_ID)
+    roles = [r for r in guild.roles if selectable_role(r)]
+
+    while True:
+        await dm.send(
+            "Opciones avanzadas:\n"
+            "1️⃣ Mencionar roles al publicar\n"
+            "2️⃣ Añadir imagen al embed\n"
+            "3️⃣ Cambiar color del evento\n"
+            "4️⃣ Restringir registro a ciertos roles\n"
+            "5️⃣ Permitir múltiples respuestas por usuario\n"
+            "6️⃣ Asignar un rol a los asistentes\n"
+            "7️⃣ Configurar cierre de inscripciones\n"
+            "8️⃣ Finalizar creación del evento\n"
+            "Escribe el número de la opción que quieres configurar, o '8' para finalizar."
+        )
+        option = await wait_for_number(user, dm, 1, 8)
+        if option is None:
+            await dm.send("Creación cancelada.")
+            return
+
+        # -----------------------------
+        # 1️⃣ Mencionar roles
+        # -----------------------------
+        if option == 1:
+            if not roles:
+                await dm.send("No hay roles disponibles para mencionar.")
+                continue
+            roles_text = "\n".join(f"{i+1}. {r.name}" for i, r in enumerate(roles))
+            await dm.send("Selecciona los roles a mencionar escribiendo sus números separados por comas, o 'none':\n" + roles_text)
+            while True:
+                response = await wait_for_text(user, dm, 200)
+                if response.lower() == "none":
+                    event.mention_roles = []
+                    break
+                try:
+                    indices = [int(x.strip()) - 1 for x in response.split(",")]
+                    selected_roles = [roles[i].id for i in indices if 0 <= i < len(roles)]
+                    if selected_roles:
+                        event.mention_roles = selected_roles
+                        break
+                    else:
+                        await dm.send("Ningún rol válido seleccionado. Intenta de nuevo o 'none'.")
+                except ValueError:
+                    await dm.send("Entrada inválida. Escribe los números separados por comas o 'none'.")
+
+        # -----------------------------
+        # 2️⃣ Añadir imagen
+        # -----------------------------
+        elif option == 2:
+            await dm.send("Envía la imagen directamente al chat o un URL de imagen, o escribe 'none' para omitir:")
+
+            def check_img(m):
+                return m.author == user and m.guild is None and (m.attachments or m.content)
+
+            while True:
+                msg_img = await bot.wait_for("message", check=check_img)
+                if msg_img.content.lower() == "cancelar":
+                    await dm.send("Creación cancelada.")
+                    return
+                if msg_img.content.lower() == "none":
+                    break
+
+                # Archivo
+                if msg_img.attachments:
+                    attachment = msg_img.attachments[0]
+                    if (attachment.content_type or "").startswith("image/"):
+                        # La URL del adjunto caduca: se guarda una copia propia
+                        try:
+                            data = await attachment.read()
+                        except discord.HTTPException:
+                            await dm.send("No pude descargar la imagen. Intenta otra vez.")
+                            continue
+                        try:
+                            event.image = await asyncio.to_thread(image_cache.store, data, attachment.content_type)
+                        except INVALID_IMAGE_ERRORS as e:
+                            log.info("Imagen no válida: %s", e, extra={"user_id": user.id})
+                            await dm.send("⚠️ No pude procesar la imagen; el evento se creará sin imagen.")
+                            break
+                        await dm.send("Imagen añadida correctamente ✅")
+                        break
+                    else:
+                        await dm.send("El archivo no es una imagen válida. Intenta otra vez.")
+                        continue
+
+                # URL
+                elif msg_img.content.startswith("http"):
+                    event.image = msg_img.content
+                    await dm.send("Imagen añadida correctamente ✅")
+                    break
+                else:
+                    await dm.send("Debes enviar un URL válido o subir una imagen directamente.")
+
+        # -----------------------------
+        # 3️⃣ Color
+        # -----------------------------
+        elif option == 3:
+            await dm.send("Escribe el color en hexadecimal (ej. FF0000) o 'skip' para dejarlo verde:")
+            color_hex = await wait_for_text(user, dm, 7, allow_none=True)
+            if color_hex.lower() != "skip":
+                try:
+                    color_str = color_hex.replace("#", "")
+                    event.color = int(color_str, 16)
+                except ValueError:
+                    await dm.send("Color inválido, se usará verde por defecto.")
+
+        # -----------------------------
+        # 4️⃣ Restringir registro
+        # -----------------------------
+        elif option == 4:
+            if not roles:
+                await dm.send("No hay roles disponibles.")
+                continue
+            roles_text = "\n".join(f"{i+1}. {r.name}" for i, r in enumerate(roles))
+            await dm.send("Selecciona los roles permitidos escribiendo sus números separados por comas, o 'none':\n" + roles_text)
+            while True:
+                response = await wait_for_text(user, dm, 200)
+                if response.lower() == "none":
+                    event.allowed_roles = []
+                    break
+                try:
+                    indices = [int(x.strip()) - 1 for x in response.split(",")]
+                    allowed_roles = [roles[i].id for i in indices if 0 <= i < len(roles)]
+                    if allowed_roles:
+                        event.allowed_roles = allowed_roles
+                        break
+                    else:
+                        await dm.send("Ningún rol válido. Intenta de nuevo o escribe 'none'.")
+                except ValueError:
+                    await dm.send("Entrada inválida. Intenta de nuevo.")
+
+        # -----------------------------
+        # 5️⃣ Multi-respuesta
+        # -----------------------------
+        elif option == 5:
+            await dm.send("Permitir que un usuario elija múltiples roles? (si/no)")
+            multi = await wait_for_text(user, dm, 3)
+            event.multi_response = True if multi.lower() == "si" else False
+
+        # -----------------------------
+        # 6️⃣ Asignar rol automáticamente
+        # -----------------------------
+        elif option == 6:
+            if not roles:
+                await dm.send("No hay roles disponibles.")
+                continue
+            roles_text = "\n".join(f"{i+1}. {r.name}" for i, r in enumerate(roles))
+            await dm.send("Selecciona el rol que se asignará automáticamente a los asistentes o 'none':\n" + roles_text)
+            while True:
+                response = await wait_for_text(user, dm, 100)
+                if response.lower() == "none":
+                    event.assign_role = None
+                    break
+                try:
+                    index = int(response.strip()) - 1
+                    if 0 <= index < len(roles):
+                        event.assign_role = roles[index].id
+                        break
+                    else:
+                        await dm.send("Número inválido. Intenta de nuevo o 'none'.")
+                except ValueError:
+                    await dm.send("Entrada inválida. Intenta de nuevo o 'none'.")
+        elif option == 7:  # Cierre de inscripciones
+            await dm.send("Escribe cuándo cerrar las inscripciones ('10 minutos', '1 hora', 'none'):")
+            close_time = await wait_for_text(user, dm, 50, allow_none=True)
+            if close_time.lower() != "none":
+                event.registration_close = close_time
+        elif option == 8:  # Finalizar
+            break
+
+    # -----------------------------
+    # Guardar evento
+    # -----------------------------
+    event_id = event.id
+    store.add(event)
+    store.save()
+    audit.record(event, user.id, "crear", field_diff({}, audit_fields(event), SUMMARY_FIELDS))
+    schedule_reminder(event)
+    conflicts.index_event(event)
+    index_for_search(event, user.display_name)
+    stats.add_event(event)
+    stats.save()
+
+    # -----------------------------
+    # Enviar embed con roles mencionados
+    # -----------------------------
+    channel = bot.get_channel(event.channel_id)
+    if channel:
+        embed = await create_event_embed(event)  # ✅
+        sent_message = await rest.run(
+            POST, f"post:{channel.id}", lambda: channel.send(embed=embed, view=EventView(event_id), files=event_files(event))
+        )
+        event.message_id = sent_message.id
+        message_cache[event_id] = sent_message
+        store.save()
+        await dm.send(f"Evento creado correctamente en <#{channel.id}>")
+    else:
+        await dm.send("No se pudo enviar el evento al canal, pero se guardó en la base de datos.")
+
+
+# -----------------------------
+# EXTENSIÓN
+# -----------------------------
+CANDIDATE_LISTENERS = (
+    on_guild_channel_create, on_guild_channel_update, on_guild_channel_delete,
+    on_guild_role_create, on_guild_role_update, on_guild_role_delete, on_eventos_listos,
+)
+
+async def setup(bot):
+    for listener in CANDIDATE_LISTENERS:
+        bot.add_listener(listener)
+    add_commands(eventos, editar_evento)
+    add_interaction_handlers(handle_edit)
+    if core.ready:
+        rebuild_candidates(bot.get_guild(GUILD_ID))
+
+async def teardown(bot):
+    remove_interaction_handlers(handle_edit)
@@ -0,0 +1,106 @@
+# conflicts.py
+from bisect import bisect_left, bisect_right, insort
+from datetime import timedelta
+
+from models import ROLE_BITS
+
+
+# -----------------------------
+# ÍNDICE DE INTERVALOS
+# -----------------------------
+class IntervalIndex:
+    """Intervalos [inicio, fin) agrupados por clave y ordenados por inicio.
+
+    Un intervalo que se solapa con [a, b) empieza antes de b y después de
+    a - (duración más larga de la clave), así que basta con dos bisecciones
+    y filtrar ese tramo: O(log n + k) en vez de recorrer todos.
+    """
+
+    def __init__(self):
+        self._starts = {}  # clave -> lista ordenada de (inicio, id)
+        self._items = {}  # clave -> {id: (inicio, fin)}
+        self._longest = {}  # clave -> duración más larga (solo crece)
+
+    def add(self, key, item_id, start, end):
+        self.remove(key, item_id)
+        insort(self._starts.setdefault(key, []), (start, item_id))
+        self._items.setdefault(key, {})[item_id] = (start, end)
+        self._longest[key] = max(self._longest.get(key, timedelta(0)), end - start)
+
+    def remove(self, key, item_id):
+        interval = self._items.get(key, {}).pop(item_id, None)
+        if interval is None:
+            return
+        starts = self._starts[key]
+        i = bisect_left(starts, (interval[0], item_id))
+        if i < len(starts) and starts[i] == (interval[0], item_id):
+            del starts[i]
+        if not starts:
+            del self._starts[key], self._items[key], self._longest[key]
+
+    def overlapping(self, key, start, end, exclude=None):
+        """Ids de la clave cuyo intervalo se solapa con [start, end)"""
+        starts = self._starts.get(key)
+        if not starts:
+            return []
+        items = self._items[key]
+        lo = bisect_right(starts, (start - self._longest[key],))
+        hi = bisect_left(starts, (end,))
+        return [item_id for s, item_id in starts[lo:hi] if item_id != exclude and items[item_id][1] > start]
+
+
+# -----------------------------
+# CONFLICTOS ENTRE EVENTOS
+# -----------------------------
+class ConflictIndex:
+    """Solapes de eventos en el mismo canal y de un mismo participante"""
+
+    def __init__(self):
+        self.channels = IntervalIndex()
+        self.members = IntervalIndex()
+        self._indexed = {}  # event_id -> (channel_id, inicio, fin, {user_id})
+
+    def rebuild(self, events):
+        self.__init__()
+        for event in events:
+            self.index_event(event)
+
+    def index_event(self, event):
+        """(Re)indexa el evento tras crearlo o editarlo"""
+        self.remove_event(event)
+        declined = ROLE_BITS["DECLINADO"]
+        user_ids = {uid for uid, mask in event.signups.items() if mask & ~declined}
+        self.channels.add(event.channel_id, event.id, event.start, event.end)
+        for uid in user_ids:
+            self.members.add(uid, event.id, event.start, event.end)
+        self._indexed[event.id] = (event.channel_id, event.start, event.end, user_ids)
+
+    def remove_event(self, event):
+        indexed = self._indexed.pop(event.id, None)
+        if indexed is None:
+            return
+        channel_id, _, _, user_ids = indexed
+        self.channels.remove(channel_id, event.id)
+        for uid in user_ids:
+            self.members.remove(uid, event.id)
+
+    def set_member(self, event, user_id, attending):
+        """Actualiza un participante tras inscribirse o declinar"""
+        indexed = self._indexed.get(event.id)
+        if indexed is None:
+            self.index_event(event)
+            return
+        if attending:
+            self.members.add(user_id, event.id, event.start, event.end)
+            indexed[3].add(user_id)
+        else:
+            self.members.remove(user_id, event.id)
+            indexed[3].discard(user_id)
+
+    def channel_conflicts(self, event):
+        """Ids de otros eventos del mismo canal que se solapan con `event`"""
+        return self.channels.overlapping(event.channel_id, event.start, event.end, exclude=event.id)
+
+    def member_conflicts(self, user_id, event):
+        """Ids de otros eventos en los que `user_id` está inscrito a la misma hora"""
+        return self.members.overlapping(user_id, event.start, event.end, exclude=event.id)
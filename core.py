@@ -0,0 +1,718 @@
+# core.py
+# Estado compartido del bot: configuración, almacén, cachés, colas y utilidades
+# que usan las extensiones de cogs/. Este módulo no se recarga nunca, así que
+# recargar una extensión conserva los eventos, las cachés y las colas.
+import os
+import discord
+from discord.ext import commands
+from discord import app_commands
+from dotenv import load_dotenv
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from audit import AuditLog
+from background import BackgroundTasks, LatencyStats
+from calendar_feed import CalendarFeed
+from conflicts import ConflictIndex
+from event_threads import ThreadManager
+from lease import Lease
+from images import ImageCache
+from lifecycle import Lifecycle
+from logs import begin_trace, finish_trace, setup_logging, span
+from candidates import CandidateIndex
+from members import MemberCache
+from models import DATE_FORMAT, ROLE_BITS
+from search import SearchIndex
+from outbound import EDIT, INTERACTION, POST, OutboundScheduler
+from profiling import LoopLagMonitor, LoopProfiler, SlowCallbackLog
+from recording import TrafficRecorder
+from reminders import ReminderLog
+from settings import GuildSettings
+from stats import AttendanceStats
+from store import EventStore, atomic_write
+
+# -----------------------------
+# CARGAR VARIABLES DE ENTORNO
+# -----------------------------
+load_dotenv()
+TOKEN = os.getenv("DISCORD_TOKEN")
+GUILD_ID = int(os.getenv("GUILD_ID"))
+
+# -----------------------------
+# LOGS
+# -----------------------------
+# JSON por stdout a través de una cola (ver logs.py). Las interacciones que
+# tardan más de LOG_SLOW_MS, y una fracción LOG_TRACE_SAMPLE del resto,
+# incluyen el desglose de tiempos por paso.
+log_listener = setup_logging(os.getenv("LOG_LEVEL", "INFO").upper())
+log = logging.getLogger("eventos")
+LOG_SLOW_MS = int(os.getenv("LOG_SLOW_MS", "500"))
+LOG_TRACE_SAMPLE = float(os.getenv("LOG_TRACE_SAMPLE", "0.01"))
+
+# -----------------------------
+# CONFIGURACIÓN DEL BOT
+# -----------------------------
+intents = discord.Intents.default()
+intents.members = True
+
+# "full": discord.py descarga y guarda todos los miembros del servidor.
+# "selective" (por defecto): no se guarda ningún miembro; solo se piden los
+# participantes de los eventos y se guardan en una caché acotada con TTL.
+MEMBER_CHUNKING = os.getenv("MEMBER_CHUNKING", "selective").lower()
+FULL_CHUNKING = MEMBER_CHUNKING == "full"
+GUILD = discord.Object(id=GUILD_ID)
+
+# Hasta que el warm-up termina (`ready`) los eventos no están cargados: leerlos
+# desde una interacción bloquearía el loop con la lectura del archivo y
+# competiría con la carga en el hilo del warm-up
+STARTING_MESSAGE = "⏳ El bot está arrancando. Inténtalo de nuevo en unos segundos."
+
+class TracedCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        if not ready:
+            if interaction.type == discord.InteractionType.autocomplete:
+                await interaction.response.autocomplete([])
+            else:
+                await interaction.response.send_message(STARTING_MESSAGE, ephemeral=True)
+            return False
+        # Cada slash command abre su traza; el comando y sus tareas heredan el id
+        begin_trace()
+        interaction.extras["started"] = time.perf_counter()
+        return True
+
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    tree_cls=TracedCommandTree,
+    chunk_guilds_at_startup=FULL_CHUNKING,
+    member_cache_flags=discord.MemberCacheFlags.from_intents(intents) if FULL_CHUNKING else discord.MemberCacheFlags.none()
+)
+member_cache = MemberCache(
+    maxsize=int(os.getenv("MEMBER_CACHE_SIZE", "5000")),
+    ttl=int(os.getenv("MEMBER_CACHE_TTL", str(6 * 3600)))
+)
+
+# -----------------------------
+# ARCHIVO DE EVENTOS
+# -----------------------------
+EVENTS_FILE = "eventos.json"
+STATS_FILE = "estadisticas.json"
+COMMANDS_HASH_FILE = ".comandos_hash"
+# Compartidos entre réplicas (mismo volumen): quién programa recordatorios y
+# qué recordatorios ya se enviaron
+LEASE_FILE = os.getenv("LEASE_FILE", ".lider.json")
+LEASE_TTL = int(os.getenv("LEASE_TTL", "30"))
+REMINDERS_DIR = os.getenv("REMINDERS_DIR", ".recordatorios")
+REMINDERS_RETENTION_DAYS = int(os.getenv("REMINDERS_RETENTION_DAYS", "7"))
+# Imágenes de eventos descargadas una vez y subidas como adjunto del mensaje
+IMAGES_DIR = os.getenv("IMAGES_DIR", "imagenes")
+IMAGE_MAX_SIZE = int(os.getenv("IMAGE_MAX_SIZE", "1280"))
+# Grabaciones de tráfico para reproducir con replay.py (/perf grabar)
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "grabaciones")
+# Historial de cambios de los eventos (/admin historial)
+AUDIT_FILE = os.getenv("AUDIT_FILE", "historial.jsonl")
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+AUDIT_MAX_ENTRIES = int(os.getenv("AUDIT_MAX_ENTRIES", "50000"))
+# Ajustes por servidor (zona horaria); DEFAULT_TIMEZONE mientras no se cambie
+SETTINGS_FILE = os.getenv("SETTINGS_FILE", "ajustes.json")
+settings = GuildSettings(SETTINGS_FILE, default_timezone=os.getenv("DEFAULT_TIMEZONE", "UTC"))
+
+def guild_tz():
+    """Zona horaria en la que se escriben y agrupan las fechas del servidor"""
+    return settings.timezone(GUILD_ID)
+
+# -----------------------------
+# SINCRONIZACIÓN DE COMANDOS
+# -----------------------------
+def _command_payload(cmd):
+    try:
+        return cmd.to_dict(bot.tree)  # discord.py >= 2.4
+    except TypeError:
+        return cmd.to_dict()
+
+def commands_hash(guild):
+    """Hash estable de las firmas de los slash commands del servidor"""
+    payload = sorted((_command_payload(cmd) for cmd in bot.tree.get_commands(guild=guild)), key=lambda c: c["name"])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+async def sync_commands_if_changed():
+    """Solo llama a tree.sync si las firmas cambiaron desde la última sincronización"""
+    current = commands_hash(GUILD)
+    stored = await asyncio.to_thread(read_commands_hash)
+    if stored == current:
+        log.info("Slash commands sin cambios, no se sincronizan")
+        return
+    try:
+        synced = await bot.tree.sync(guild=GUILD)
+        log.info("Slash commands sincronizados", extra={"guild_id": GUILD_ID, "commands": [cmd.name for cmd in synced]})
+    except discord.HTTPException:
+        log.exception("Error al sincronizar los slash commands")
+        return
+    await asyncio.to_thread(atomic_write, COMMANDS_HASH_FILE, current.encode())
+
+def read_commands_hash():
+    if not os.path.exists(COMMANDS_HASH_FILE):
+        return None
+    with open(COMMANDS_HASH_FILE, "r") as f:
+        return f.read().strip()
+
+# -----------------------------
+# EXTENSIONES
+# -----------------------------
+# Cada módulo de cogs/ es una extensión de discord.py que se puede recargar
+# con /admin recargar. Sus comandos se registran en `setup` con add_commands;
+# al descargarla, discord.py quita solo los comandos y listeners del módulo.
+EXTENSIONS = ["cogs.store", "cogs.registration", "cogs.wizard", "cogs.reminders", "cogs.calendar", "cogs.search", "cogs.admin"]
+startup_done = False  # el warm-up ya se lanzó (on_ready se repite tras cada reconexión)
+ready = False  # el warm-up terminó: almacén cargado y cachés reconstruidas (ver cogs/store.py)
+
+def add_commands(*cmds):
+    for cmd in cmds:
+        bot.tree.add_command(cmd, guild=GUILD, override=True)
+
+
+# -----------------------------
+# RESOLUCIÓN DE MIEMBROS
+# -----------------------------
+def resolve_member(guild, user_id):
+    """Miembro desde la caché que corresponda al modo de chunking"""
+    if FULL_CHUNKING:
+        return guild.get_member(user_id) if guild else None
+    return member_cache.get(user_id)
+
+async def ensure_members(guild, user_ids):
+    """Se asegura de que los ids estén en caché antes de renderizar o mencionar"""
+    if FULL_CHUNKING or not guild:
+        return
+    try:
+        await member_cache.fetch_many(guild, list(user_ids))
+    except (discord.HTTPException, asyncio.TimeoutError):
+        log.exception("Error al pedir miembros")
+
+@bot.event
+async def on_raw_member_remove(payload):
+    member_cache.discard(payload.user.id)
+
+# -----------------------------
+# BOTONES CON EMOJIS VÁLIDOS
+# -----------------------------
+# Mismo orden que models.ROLE_KEYS
+BUTTONS = {
+    'INF': ('<:INF:1442537656553701486>', discord.ButtonStyle.success),
+    'OFICIAL': ('<:Oficiales:1442537652153745588>', discord.ButtonStyle.primary),
+    'RECON': ('<:Recon:1442537585183428770>', discord.ButtonStyle.secondary),
+    'TANQUE': ('<:Tanques:1442537587146227722>', discord.ButtonStyle.success),
+    'ARTY': ('<:Arty:1442537659103711333>', discord.ButtonStyle.primary),
+    'COMANDANTE': ('<:Commander:1442537583761428654>', discord.ButtonStyle.danger),
+    'TENTATIVO': ('<:Tentativo:1442537588765229220>', discord.ButtonStyle.primary),
+    'DECLINADO': ('<:Declinado:1442537654699692073>', discord.ButtonStyle.secondary)
+}
+
+# -----------------------------
+# LLAMADAS REST SALIENTES
+# -----------------------------
+# Todo lo que no es respuesta a una interacción (ni la conversación de los
+# asistentes por DM, que contesta al usuario) pasa por `rest`, que atiende
+# primero las ediciones de embeds, luego las publicaciones en canales e hilos
+# y por último los DMs. Presupuesto por ruta: (llamadas por segundo, ráfaga);
+# Discord permite unas 5 ediciones o mensajes cada 5 s por canal.
+REST_BUDGETS = {"edit": (1, 5), "post": (1, 5), "dm": (2, 5)}
+
+latency = LatencyStats()
+rest = OutboundScheduler(
+    concurrency=int(os.getenv("REST_CONCURRENCY", "4")),
+    budgets=REST_BUDGETS,
+    latency=latency
+)
+
+# -----------------------------
+# CARGAR / GUARDAR EVENTOS
+# -----------------------------
+# EVENTS_PRETTY=1 guarda eventos.json indentado (para depurar a mano)
+store = EventStore(EVENTS_FILE, pretty=os.getenv("EVENTS_PRETTY", "0") == "1")
+threads = ThreadManager(bot, on_change=store.save, rest=rest)
+stats = AttendanceStats(STATS_FILE)
+image_cache = ImageCache(IMAGES_DIR, max_size=IMAGE_MAX_SIZE)
+conflicts = ConflictIndex()  # solapes por canal y por participante
+audit = AuditLog(AUDIT_FILE, max_age_days=AUDIT_RETENTION_DAYS, max_entries=AUDIT_MAX_ENTRIES)
+search_index = SearchIndex()  # /buscar_evento: título, descripción y creador
+
+# Último nombre conocido de cada creador: la caché de miembros puede no tener
+# al creador (modo selectivo) o haberlo olvidado al caducar
+creator_names = {}  # user_id -> display_name
+
+def index_for_search(event, creator_name=None):
+    """(Re)indexa el evento en la búsqueda. Quien ya tiene al creador a mano
+    (el asistente, la importación) pasa su nombre en `creator_name`"""
+    if event.creator_id and creator_name is None:
+        creator = resolve_member(bot.get_guild(GUILD_ID), event.creator_id)
+        creator_name = creator.display_name if creator else creator_names.get(event.creator_id)
+    if event.creator_id and creator_name:
+        creator_names[event.creator_id] = creator_name
+    search_index.index(event.id, event.title, event.description, creator_name or "")
+
+# Canales y roles para autocompletar las opciones de /eventos y /editar_evento;
+# los listeners on_guild_channel_* y on_guild_role_* los mantienen al día
+channel_candidates = CandidateIndex()
+role_candidates = CandidateIndex()
+
+def selectable_role(role):
+    """Roles que se pueden mencionar o asignar: ni @everyone ni los de integraciones"""
+    return not role.is_default() and not role.managed
+
+def resolve_candidate(candidates, value):
+    """Id elegido en el autocompletado; si se escribió texto libre, el primer nombre que encaje"""
+    if value.isdigit() and candidates.name(int(value)) is not None:
+        return int(value)
+    matches = candidates.complete(value, limit=1)
+    return matches[0][0] if matches else None
+
+def rebuild_candidates(guild):
+    channel_candidates.rebuild((c.id, c.name) for c in guild.text_channels)
+    role_candidates.rebuild((r.id, r.name) for r in guild.roles if selectable_role(r))
+
+# -----------------------------
+# CACHÉ DE MENSAJES DE EVENTOS
+# -----------------------------
+message_cache = {}  # event_id -> PartialMessage
+
+def get_event_message(event):
+    """Mensaje del evento sin pasar por fetch_message"""
+    if not event.message_id:
+        return None
+    cached = message_cache.get(event.id)
+    if cached and cached.id == event.message_id and cached.channel.id == event.channel_id:
+        return cached
+    channel = bot.get_channel(event.channel_id)
+    if not channel:
+        return None
+    partial = channel.get_partial_message(event.message_id)
+    message_cache[event.id] = partial
+    return partial
+
+def rebuild_message_cache():
+    message_cache.clear()
+    for event in store.events:
+        get_event_message(event)
+
+# -----------------------------
+# COLA DE RECORDATORIOS
+# -----------------------------
+reminder_queue = []  # heap de (hora_recordatorio, event_id)
+reminder_payloads = {}  # event_id -> (firma, embed, menciones, miembros) preparados de antemano
+lease = Lease(LEASE_FILE, ttl=LEASE_TTL)
+reminder_log = ReminderLog(REMINDERS_DIR)
+
+def schedule_reminder(event):
+    if event.reminder_sent:
+        return
+    heapq.heappush(reminder_queue, (event.reminder_time, event.id))
+
+def rebuild_reminder_queue():
+    """Cola de recordatorios al arrancar. Los eventos que ya empezaron sin que
+    saliera su recordatorio (el bot estaba apagado) se dan por avisados:
+    mandarlo ahora llegaría tarde, con DMs incluidos"""
+    reminder_queue.clear()
+    now = datetime.now(timezone.utc)
+    missed = 0
+    for event in store.events:
+        if not event.reminder_sent and event.started(now):
+            event.reminder_sent = True
+            missed += 1
+        schedule_reminder(event)
+    if missed:
+        log.info("%d recordatorios de eventos ya empezados no se enviarán", missed)
+        store.save()
+
+# -----------------------------
+# CREAR EMBED DE EVENTO
+# -----------------------------
+async def create_event_embed(event):
+    embed = discord.Embed(
+        title=event.title,
+        description=event.description,
+        color=discord.Color(event.color if event.color is not None else 0x00ff00)
+    )
+
+    # Marcas <t:unix:...>: cada cliente muestra la hora en su zona y el tiempo
+    # relativo se actualiza solo, así que no hace falta volver a editar el mensaje
+    start = discord.utils.format_dt(event.start, "F")
+    embed.add_field(name="📅 Fecha de inicio", value=f"{start} ({discord.utils.format_dt(event.start, 'R')})", inline=True)
+    embed.add_field(name="⏱️ Duración/Fin", value=event.end_text or "No especificado", inline=True)
+
+    guild = bot.get_guild(GUILD_ID)
+    await ensure_members(guild, event.participant_ids())
+    for key, (emoji, _) in BUTTONS.items():
+        user_ids = event.members_in(key)
+        if user_ids:
+            names = []
+            for uid in user_ids:
+                member = resolve_member(guild, uid)
+                names.append(member.display_name if member else f"❓({uid})")
+            field_name = f"{emoji} {key} ({len(user_ids)})"  # número a la par
+            text = "\n".join(f"- {n}" for n in names)
+            
+        else:
+            field_name = f"{emoji} {key} (0)"
+            text = "Nadie aún"
+        embed.add_field(name=field_name, value=text, inline=False)
+
+    # Menciones de roles
+    if event.mention_roles:
+        mentions = " ".join(f"<@&{r}>" for r in event.mention_roles)
+        embed.add_field(name="Roles mencionados", value=mentions, inline=False)
+
+    if event.image:
+        embed.set_image(url=event.image)
+
+    return embed
+
+def event_files(event):
+    """Adjuntos que hay que subir al PUBLICAR el mensaje (al editarlo se conservan solos)"""
+    name = image_cache.local_name(event.image)
+    if not name:
+        return []
+    path = image_cache.path(name)
+    if not os.path.exists(path):
+        log.warning("Falta la imagen %s", name, extra={"event_id": event.id})
+        return []
+    return [discord.File(path, filename=name)]
+
+
+
+# -----------------------------
+# 🔹 ACTUALIZACIÓN DEL MENSAJE DEL EVENTO
+# -----------------------------
+# Como mucho una actualización en cola por evento: los clics que llegan
+# mientras espera su turno en `rest` se suman a ella. El embed se genera al
+# salir de la cola, con el estado de ese momento, así que ninguno se pierde.
+queued_refreshes = {}  # event_id -> tarea cuya edición aún no ha renderizado
+
+async def refresh_event_message(event, notice=None):
+    """Edita el embed del evento; si el mensaje ya no existe lo vuelve a publicar"""
+    task = queued_refreshes.get(event.id)
+    if task is None or task.done():
+        task = queued_refreshes[event.id] = asyncio.ensure_future(_refresh_event_message(event, notice))
+    # shield: si se cancela quien espera, la actualización compartida sigue
+    await asyncio.shield(task)
+
+async def _refresh_event_message(event, notice):
+    this = asyncio.current_task()
+    embed = None
+
+    async def render():
+        nonlocal embed
+        # A partir de aquí un cambio nuevo ya no saldría en este embed
+        if queued_refreshes.get(event.id) is this:
+            del queued_refreshes[event.id]
+        if embed is None:
+            with span("render"):
+                embed = await create_event_embed(event)  # Título, descripción, hora, duración, imagen
+
+    # Canal y mensaje se buscan al salir de la cola: el evento puede haberse
+    # movido de canal, o borrado, mientras esperaba
+    def deleted():
+        return store.get(event.id) is not event
+
+    async def edit():
+        """True si el mensaje queda al día (o ya no hace falta); False si hay que publicarlo"""
+        if deleted():
+            return True
+        msg = get_event_message(event)
+        if not msg:
+            return False
+        await render()
+        await msg.edit(embed=embed, view=EventView(event.id))
+        return True
+
+    async def send():
+        channel = bot.get_channel(event.channel_id)
+        if not channel or deleted():
+            return None
+        await render()
+        return await channel.send(content=notice, embed=embed, view=EventView(event.id), files=event_files(event))
+
+    try:
+        if not bot.get_channel(event.channel_id):
+            return
+        if event.message_id:
+            try:
+                with span("rest.edit"):
+                    if await rest.run(EDIT, f"edit:{event.channel_id}", edit):
+                        return
+            except discord.NotFound:
+                log.info("El mensaje del evento ya no existe, se vuelve a publicar", extra={"event_id": event.id})
+            except discord.HTTPException as e:
+                log.warning("Error al editar el mensaje del evento: %s", e, extra={"event_id": event.id})
+                return
+
+        with span("rest.send"):
+            sent_msg = await rest.run(POST, f"post:{event.channel_id}", send)
+        if sent_msg is None:
+            return
+        event.message_id = sent_msg.id
+        message_cache[event.id] = sent_msg
+        store.save()
+    finally:
+        if queued_refreshes.get(event.id) is this:
+            del queued_refreshes[event.id]
+
+def clip(text: str, limit=1800):
+    """Recorta texto largo para evitar error de 2000 chars en Discord"""
+    if not text:
+        return "Ninguna"
+    text = str(text)
+    return text if len(text) <= limit else text[:limit] + "… (recortado)"
+
+def describe_conflicts(event_ids, limit=5):
+    """Texto con los eventos en conflicto: título, hora y canal"""
+    events = [e for e in map(store.get, event_ids) if e]
+    events.sort(key=lambda e: e.start)
+    lines = [f"• **{clip(e.title, 100)}** {discord.utils.format_dt(e.start, 'f')} en <#{e.channel_id}>" for e in events[:limit]]
+    if len(events) > limit:
+        lines.append(f"… y {len(events) - limit} más")
+    return "\n".join(lines)
+
+def event_url(event):
+    """Enlace al mensaje del evento, o None si no está publicado"""
+    if event.message_id is None:
+        return None
+    return f"https://discord.com/channels/{GUILD_ID}/{event.channel_id}/{event.message_id}"
+
+def event_label(event):
+    """Título y fecha (en la zona del servidor) para las opciones de autocompletado"""
+    date = event.start.astimezone(guild_tz()).strftime(DATE_FORMAT)
+    # Discord rechaza nombres de más de 100 caracteres; clip añade su aviso al recortar
+    return f"{clip(event.title, 60)} — {date}"
+
+def can_manage_event(user, event):
+    """El creador del evento o quien pueda gestionar el servidor"""
+    if user.id == event.creator_id:
+        return True
+    perms = getattr(user, "guild_permissions", None)
+    return bool(perms and (perms.manage_guild or perms.manage_events))
+
+
+# -----------------------------
+# VISTA DEL EVENTO
+# -----------------------------
+# Cada botón lleva un custom_id "evento:<acción>:<event_id>[:<rol>]". No hace
+# falta registrar vistas al arrancar: dispatch_interaction atiende todos los
+# clics, también los de mensajes publicados antes de un reinicio.
+CUSTOM_ID_PREFIX = "evento"
+
+def event_custom_id(action, event_id, arg=None):
+    parts = [CUSTOM_ID_PREFIX, action, event_id] + ([arg] if arg else [])
+    return ":".join(parts)
+
+class EventView(discord.ui.View):
+    def __init__(self, event_id):
+        super().__init__(timeout=None)
+        self.event_id = event_id
+        for role_key, (emoji, style) in BUTTONS.items():
+            self.add_item(discord.ui.Button(label=role_key, emoji=emoji, style=style, custom_id=event_custom_id("rol", event_id, role_key)))
+        self.add_item(discord.ui.Button(label="Editar evento", style=discord.ButtonStyle.primary, custom_id=event_custom_id("editar", event_id)))
+        self.add_item(discord.ui.Button(label="Eliminar evento", style=discord.ButtonStyle.danger, custom_id=event_custom_id("eliminar", event_id)))
+
+# -----------------------------
+# DESPACHO DE INTERACCIONES
+# -----------------------------
+# Toda interacción se reconoce antes de hacer nada lento (Discord da 3 s). Con
+# ack="defer" el despachador difiere la actualización del componente y el
+# manejador responde con interaction.followup; lo que no haga falta para esa
+# respuesta (editar el embed, borrar mensajes, el asistente por DM) se lanza
+# con `background.spawn`.
+# Los manejadores viven en cogs/: el decorador solo los marca, la extensión
+# los registra en su `setup` y los quita en su `teardown`. Si una recarga
+# falla, discord.py vuelve a llamar al `setup` de la versión anterior, que
+# los registra de nuevo.
+INTERACTION_HANDLERS = {}  # acción -> (corrutina(interaction, event, arg), ack)
+
+background = BackgroundTasks(latency)
+lifecycle = Lifecycle(deadline=int(os.getenv("SHUTDOWN_DEADLINE", "20")))
+
+# Herramientas de /perf (ver cogs/admin.py): viven aquí para sobrevivir a una recarga
+profiler = LoopProfiler()
+lag_monitor = LoopLagMonitor()
+slow_callbacks = SlowCallbackLog()
+
+def interaction_handler(action, ack="defer"):
+    def decorator(func):
+        func.interaction_action = (action, ack)
+        return func
+    return decorator
+
+def add_interaction_handlers(*handlers):
+    for handler in handlers:
+        action, ack = handler.interaction_action
+        INTERACTION_HANDLERS[action] = (handler, ack)
+
+def remove_interaction_handlers(*handlers):
+    for handler in handlers:
+        INTERACTION_HANDLERS.pop(handler.interaction_action[0], None)
+
+@bot.listen("on_interaction")
+async def dispatch_interaction(interaction: discord.Interaction):
+    if interaction.type != discord.InteractionType.component:
+        return
+    parts = (interaction.data or {}).get("custom_id", "").split(":", 3)
+    if len(parts) < 3 or parts[0] != CUSTOM_ID_PREFIX:
+        return
+    action = parts[1]
+    if action not in INTERACTION_HANDLERS:
+        return
+    handler, ack = INTERACTION_HANDLERS[action]
+    if not ready:
+        await interaction.response.send_message(STARTING_MESSAGE, ephemeral=True)
+        return
+
+    started = time.perf_counter()
+    begin_trace()
+    event = store.get(parts[2])
+    if not event:
+        await interaction.response.send_message("Evento no encontrado.", ephemeral=True)
+        return
+    if ack == "defer":
+        with span("ack"):
+            await rest.run(INTERACTION, "interaction", lambda: interaction.response.defer(ephemeral=True, thinking=False))
+    latency.record(f"ack:{action}", time.perf_counter() - started)
+
+    try:
+        await handler(interaction, event, parts[3] if len(parts) > 3 else None)
+    except Exception:
+        log.exception("Error en el botón", extra={"action": action, "event_id": event.id})
+        try:
+            await interaction.followup.send("❌ Ocurrió un error procesando el botón.", ephemeral=True)
+        except discord.HTTPException:
+            log.debug("No se pudo avisar del error al usuario")
+    finally:
+        elapsed = time.perf_counter() - started
+        latency.record(action, elapsed)
+        finish_trace(log, "Botón atendido", elapsed, LOG_SLOW_MS, LOG_TRACE_SAMPLE,
+                     action=action, event_id=event.id, user_id=interaction.user.id)
+
+# -----------------------------
+# GRABACIÓN DE TRÁFICO
+# -----------------------------
+# Con /perf grabar activo se guarda cada interacción y cada respuesta por DM
+# a un asistente para reproducirlas sin conexión con replay.py
+recorder = TrafficRecorder(RECORDINGS_DIR)
+wizard_users = Counter()  # user_id -> asistentes abiertos (cogs/wizard.py)
+RECORDED_PERMISSIONS = ("administrator", "manage_guild", "manage_events")
+
+def recorded_user(user):
+    perms = getattr(user, "guild_permissions", None)
+    return {
+        "user": user.id,
+        "name": user.display_name,
+        "roles": [r.id for r in getattr(user, "roles", []) if not r.is_default()],
+        "perms": [p for p in RECORDED_PERMISSIONS if perms and getattr(perms, p)],
+    }
+
+def recording_header():
+    guild = bot.get_guild(GUILD_ID)
+    return {
+        "guild": GUILD_ID,
+        "channels": [(c.id, c.name) for c in guild.text_channels] if guild else [],
+        "roles": [(r.id, r.name) for r in guild.roles if selectable_role(r)] if guild else [],
+        "events": [e.to_dict() for e in store.events],
+    }
+
+@bot.listen("on_interaction")
+async def record_interaction(interaction: discord.Interaction):
+    if not recorder.active:
+        return
+    entry = {"type": "interaccion", "channel": interaction.channel_id, **recorded_user(interaction.user)}
+    data = interaction.data or {}
+    if interaction.type == discord.InteractionType.component:
+        entry["custom_id"] = data.get("custom_id", "")
+    elif interaction.type == discord.InteractionType.application_command:
+        # Subcomandos: "perf estado"; solo se guardan opciones con valor simple
+        name, options = data.get("name", ""), data.get("options", [])
+        while options and options[0].get("type") in (1, 2):
+            name, options = f"{name} {options[0]['name']}", options[0].get("options", [])
+        entry["command"] = name
+        # Texto, entero, booleano y número; usuarios, canales y adjuntos no se reproducen
+        entry["options"] = {o["name"]: o["value"] for o in options if o.get("type") in (3, 4, 5, 10)}
+    else:
+        return  # autocompletado y modales no se reproducen
+    recorder.record(entry)
+
+@bot.listen("on_message")
+async def record_dm(message: discord.Message):
+    # Solo los DMs que espera un asistente: el resto de conversaciones privadas no se guarda
+    if recorder.active and message.guild is None and wizard_users[message.author.id]:
+        recorder.record({
+            "type": "dm",
+            "user": message.author.id,
+            "content": message.content,
+            "attachments": [a.url for a in message.attachments],
+        })
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    started = interaction.extras.get("started")
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    latency.record(f"/{command.qualified_name}", elapsed)
+    finish_trace(log, "Comando atendido", elapsed, LOG_SLOW_MS, LOG_TRACE_SAMPLE,
+                 command=command.qualified_name, user_id=interaction.user.id)
+
+# -----------------------------
+# CACHÉ DE RESPUESTAS
+# -----------------------------
+# Las respuestas de solo lectura se reutilizan mientras no cambien ni los
+# eventos ni las estadísticas, y como mucho `ttl` segundos.
+response_cache = {}  # clave -> (versión de los datos, expira, embed)
+response_cache_stats = {"hits": 0, "misses": 0}
+
+def data_version():
+    return (store.writer.changes, stats.writer.changes)
+
+def cached_response(key, build, ttl=300):
+    now = time.monotonic()
+    version = data_version()
+    cached = response_cache.get(key)
+    if cached and cached[0] == version and cached[1] > now:
+        response_cache_stats["hits"] += 1
+        return cached[2]
+    response_cache_stats["misses"] += 1
+    embed = build()
+    response_cache[key] = (version, now + ttl, embed)
+    return embed
+
+# -----------------------------
+# CALENDARIO .ICS
+# -----------------------------
+# Lo sirve keep_alive.py en /calendario/<guild_id>.ics (?rol=CLAVE). Se consulta
+# desde el hilo de Flask: si la versión no cambió se responde desde la caché
+# sin tocar el loop; si cambió, se genera en el loop, donde se modifican los eventos.
+calendar_feed = CalendarFeed(name=os.getenv("CALENDAR_NAME", "Eventos"))
+CALENDAR_TIMEOUT = 10
+
+def calendar_version():
+    # La hora entra en la versión para que los eventos terminados vayan saliendo
+    return (store.writer.changes, int(time.time() // 3600))
+
+async def _render_calendar(role, version):
+    return calendar_feed.render(role, version, store.events, role=role, url=event_url)
+
+def calendar_for(guild_id, role=None):
+    """(cuerpo, etag, last_modified) del feed; None si el servidor o el rol no existen.
+    Lanza LookupError si el bot todavía no ha cargado los eventos"""
+    if guild_id != GUILD_ID or (role and role not in ROLE_BITS):
+        return None
+    if not ready:
+        raise LookupError("eventos sin cargar")
+    version = calendar_version()
+    cached = calendar_feed.current(role, version)
+    if cached:
+        return cached
+    future = asyncio.run_coroutine_threadsafe(_render_calendar(role, version), bot.loop)
+    return future.result(timeout=CALENDAR_TIMEOUT)
@@ -0,0 +1,214 @@
+# event_io.py
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import serializer
+from models import ROLE_KEYS, Event, parse_datetime
+
+
+# -----------------------------
+# IMPORTAR / EXPORTAR EVENTOS (JSON Lines y CSV)
+# -----------------------------
+# Columnas que se exportan y se aceptan al importar
+FIELDS = [
+    "id", "title", "description", "channel_id", "start", "end", "max_attendees",
+    "multi_response", "mention_roles", "allowed_roles", "assign_role", "color",
+    "image", "registration_close", "creator_id", "message_id", "thread_id",
+    "participants_roles", "reminder_sent",
+]
+LIST_FIELDS = {"mention_roles", "allowed_roles"}
+MAX_ERRORS = 20
+
+
+class RowError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f"Línea {line}: {message}")
+        self.line = line
+
+
+def detect_format(filename):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return None
+
+
+def iter_rows(fp, fmt):
+    """Recorre el archivo fila a fila sin leerlo entero.
+
+    Devuelve (línea, dict) o (línea, RowError) si la línea no se puede leer.
+    """
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = RowError(line_no, f"JSON inválido ({e.msg})")
+        if not isinstance(row, (dict, RowError)):
+            row = RowError(line_no, "cada línea debe ser un objeto JSON")
+        yield line_no, row
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+def _int(value, line, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(line, f"'{field}' debe ser un número")
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+def _id_list(value, line, field):
+    if isinstance(value, list):
+        return [_int(v, line, field) for v in value]
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            return _id_list(json.loads(text), line, field)
+        except json.JSONDecodeError:
+            raise RowError(line, f"'{field}' no es una lista válida")
+    return [_int(v, line, field) for v in text.replace(",", ";").split(";") if v.strip()]
+
+
+def validate_row(row, line, default_channel_id, creator_id, tz=timezone.utc, now=None):
+    """Convierte una fila en un Event listo para el almacén o lanza RowError.
+
+    Las fechas sin zona horaria se interpretan en `tz`. Si el evento ya
+    empezó (copias de seguridad con eventos antiguos), se importa con el
+    recordatorio dado por enviado; si no, se respeta la columna
+    `reminder_sent` de la exportación.
+    """
+    title = str(row.get("title") or "").strip()
+    if not title:
+        raise RowError(line, "falta 'title'")
+    if len(title) > 200:
+        raise RowError(line, "'title' supera 200 caracteres")
+    description = "" if _blank(row.get("description")) else str(row["description"])
+    if len(description) > 1600:
+        raise RowError(line, "'description' supera 1600 caracteres")
+
+    try:
+        start = parse_datetime(row.get("start") or "", tz)
+    except ValueError:
+        raise RowError(line, "'start' debe tener el formato YYYY-MM-DD HH:MM o ISO 8601")
+
+    event = {
+        "id": str(row.get("id") or "").strip() or str(uuid.uuid4()),
+        "title": title,
+        "description": description or "Sin descripción",
+        "channel_id": default_channel_id if _blank(row.get("channel_id")) else _int(row["channel_id"], line, "channel_id"),
+        "start": start.isoformat(timespec="minutes"),
+        "end": "No especificada" if _blank(row.get("end")) else str(row["end"]).strip(),
+        "max_attendees": None,
+        "multi_response": False if _blank(row.get("multi_response")) else _bool(row["multi_response"]),
+        "creator_id": creator_id if _blank(row.get("creator_id")) else _int(row["creator_id"], line, "creator_id"),
+        "participants_roles": {key: [] for key in ROLE_KEYS},
+        "registration_open": True,
+    }
+
+    if not _blank(row.get("max_attendees")):
+        max_attendees = _int(row["max_attendees"], line, "max_attendees")
+        if not 1 <= max_attendees <= 250:
+            raise RowError(line, "'max_attendees' debe estar entre 1 y 250")
+        event["max_attendees"] = max_attendees
+
+    for field in LIST_FIELDS:
+        if not _blank(row.get(field)):
+            event[field] = _id_list(row[field], line, field)
+
+    for field in ("assign_role", "message_id", "thread_id"):
+        if not _blank(row.get(field)):
+            event[field] = _int(row[field], line, field)
+
+    if not _blank(row.get("color")):
+        try:
+            color = row["color"]
+            event["color"] = color if isinstance(color, int) else int(str(color).replace("#", ""), 16)
+        except ValueError:
+            raise RowError(line, "'color' debe ser hexadecimal")
+
+    if not _blank(row.get("participants_roles")):
+        roles = row["participants_roles"]
+        try:
+            roles = json.loads(roles) if isinstance(roles, str) else roles
+            for key, user_ids in roles.items():
+                if key in event["participants_roles"]:
+                    event["participants_roles"][key] = [int(uid) for uid in user_ids]
+        except (AttributeError, TypeError, ValueError):
+            raise RowError(line, "'participants_roles' debe ser un objeto {rol: [ids]}")
+
+    for field in ("image", "registration_close"):
+        if not _blank(row.get(field)):
+            event[field] = str(row[field]).strip()
+
+    event = Event.from_dict(event, tz)
+    event.reminder_sent = event.started(now) or (not _blank(row.get("reminder_sent")) and _bool(row["reminder_sent"]))
+    return event
+
+
+def read_events(fp, fmt, default_channel_id, creator_id, existing_ids, tz=timezone.utc, now=None):
+    """Valida el archivo en streaming. Devuelve (eventos válidos, errores, nº de errores)"""
+    now = now or datetime.now(timezone.utc)
+    valid, errors, error_count = [], [], 0
+    seen = set(existing_ids)
+    try:
+        for line, row in iter_rows(fp, fmt):
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                event = validate_row(row, line, default_channel_id, creator_id, tz, now)
+                if event.id in seen:
+                    raise RowError(line, f"el id '{event.id}' ya existe")
+            except RowError as e:
+                error_count += 1
+                if len(errors) < MAX_ERRORS:
+                    errors.append(str(e))
+                continue
+            seen.add(event.id)
+            valid.append(event)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Error que impide seguir leyendo el archivo
+        error_count += 1
+        errors.append(str(e))
+    return valid, errors, error_count
+
+
+def write_events(events, fp, fmt):
+    """Escribe los eventos (diccionarios de Event.to_dict) en `fp` (binario) uno a uno"""
+    text = io.TextIOWrapper(fp, encoding="utf-8", newline="", write_through=True)
+    if fmt == "csv":
+        writer = csv.DictWriter(text, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for event in events:
+            row = dict(event)
+            for field in LIST_FIELDS | {"participants_roles"}:
+                if field in row:
+                    row[field] = json.dumps(row[field], ensure_ascii=False)
+            writer.writerow(row)
+    else:
+        for event in events:
+            text.write(serializer.dumps({k: event[k] for k in FIELDS if k in event}).decode())
+            text.write("\n")
+    text.flush()
+    text.detach()
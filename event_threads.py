@@ -0,0 +1,146 @@
+# event_threads.py
+import asyncio
+import logging
+
+import discord
+
+from outbound import EDIT, POST
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# GESTOR DE HILOS DE EVENTOS
+# -----------------------------
+class ThreadManager:
+    """Un único hilo por evento: se crea o reutiliza, se anuncian los nuevos
+    inscritos en un resumen periódico y se archiva cuando termina el evento."""
+
+    def __init__(self, bot, on_change=None, rest=None):
+        self.bot = bot
+        self.on_change = on_change  # se llama cuando cambia thread_id / thread_archived
+        self.rest = rest  # OutboundScheduler opcional para crear, publicar y archivar
+        self._threads = {}  # event_id -> Thread
+        self._locks = {}  # event_id -> Lock (evita crear dos hilos a la vez)
+        self._pending = {}  # event_id -> [user_id] pendientes de anunciar
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    async def get(self, event):
+        """Hilo existente del evento (desde caché, caché de discord.py o REST)"""
+        thread = self._threads.get(event.id)
+        if thread:
+            return thread
+        thread_id = event.thread_id
+        if not thread_id:
+            return None
+        thread = self.bot.get_channel(thread_id)
+        if thread is None:
+            try:
+                thread = await self.bot.fetch_channel(thread_id)
+            except (discord.NotFound, discord.Forbidden):
+                return None
+        self._threads[event.id] = thread
+        return thread
+
+    async def get_or_create(self, event, channel, starter=None):
+        """Devuelve el hilo del evento, creándolo (desde `starter` si se da) solo si no existe"""
+        lock = self._locks.setdefault(event.id, asyncio.Lock())
+        async with lock:
+            thread = await self.get(event)
+            if thread:
+                if getattr(thread, "archived", False):
+                    await self._run(EDIT, f"edit:{thread.id}", lambda: thread.edit(archived=False))
+                return thread
+
+            name = f"Hilo - {event.title}"[:100]
+            if starter is not None:
+                thread = await self._run(POST, f"post:{channel.id}", lambda: starter.create_thread(name=name, auto_archive_duration=1440))
+            else:
+                thread = await self._run(POST, f"post:{channel.id}", lambda: channel.create_thread(
+                    name=name, type=discord.ChannelType.public_thread, auto_archive_duration=1440
+                ))
+            self._threads[event.id] = thread
+            event.thread_id = thread.id
+            event.thread_archived = False
+            self._changed()
+            return thread
+
+    def forget(self, event_id):
+        self._threads.pop(event_id, None)
+        self._locks.pop(event_id, None)
+        self._pending.pop(event_id, None)
+
+    # -----------------------------
+    # RESUMEN DE NUEVOS INSCRITOS
+    # -----------------------------
+    @property
+    def pending_count(self):
+        """Inscritos apuntados que aún no se han publicado en su hilo"""
+        return sum(len(user_ids) for user_ids in self._pending.values())
+
+    def announce(self, event, user_ids):
+        """Apunta nuevos inscritos; se publican todos juntos en el siguiente resumen"""
+        if not event.thread_id or event.thread_archived:
+            return
+        pending = self._pending.setdefault(event.id, [])
+        for uid in user_ids:
+            if uid not in pending:
+                pending.append(uid)
+
+    async def flush_digests(self, get_event):
+        """Publica un mensaje por hilo con todos los inscritos acumulados"""
+        pending, self._pending = self._pending, {}
+        for event_id, user_ids in pending.items():
+            event = get_event(event_id)
+            if not event or not user_ids:
+                continue
+            try:
+                thread = await self.get(event)
+                if not thread:
+                    continue
+                await self._send(thread, f"👥 Nuevos inscritos: {', '.join(f'<@{uid}>' for uid in user_ids)}")
+            except (discord.Forbidden, discord.NotFound) as e:
+                # No va a funcionar a la siguiente: se descartan
+                log.warning("No se pudo publicar el resumen en el hilo: %s", e, extra={"event_id": event.id, "thread_id": event.thread_id})
+            except discord.HTTPException as e:
+                # Error pasajero (5xx, límite de peticiones): se reintenta en el siguiente resumen
+                log.warning("Error al publicar resumen en el hilo: %s", e, extra={"event_id": event.id, "thread_id": event.thread_id})
+                newer = self._pending.get(event_id, [])
+                self._pending[event_id] = user_ids + [uid for uid in newer if uid not in user_ids]
+
+    async def _send(self, thread, content):
+        return await self._run(POST, f"post:{thread.id}", lambda: thread.send(content))
+
+    async def _run(self, priority, route, factory):
+        """Llamada REST a través de `rest` si lo hay"""
+        if self.rest is None:
+            return await factory()
+        return await self.rest.run(priority, route, factory)
+
+    # -----------------------------
+    # ARCHIVADO
+    # -----------------------------
+    async def archive(self, events, concurrency=5):
+        """Archiva en bloque los hilos de los eventos indicados"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def archive_one(event):
+            async with semaphore:
+                try:
+                    thread = await self.get(event)
+                    if thread and not getattr(thread, "archived", False):
+                        await self._run(EDIT, f"edit:{thread.id}", lambda: thread.edit(archived=True))
+                except discord.HTTPException as e:
+                    log.warning("Error al archivar el hilo: %s", e, extra={"event_id": event.id, "thread_id": event.thread_id})
+                    return False
+                event.thread_archived = True
+                self.forget(event.id)
+                return True
+
+        results = await asyncio.gather(*(archive_one(e) for e in events))
+        if any(results):
+            self._changed()
+        return sum(results)
@@ -0,0 +1,81 @@
+# images.py
+import hashlib
+import io
+import os
+
+from store import atomic_write
+
+try:
+    from PIL import Image
+    # Archivos que no son una imagen (o están corruptos) y bombas de descompresión
+    INVALID_IMAGE_ERRORS = (OSError, Image.DecompressionBombError)
+except ImportError:  # Pillow es opcional: sin él las imágenes no se reducen
+    Image = None
+    INVALID_IMAGE_ERRORS = (OSError,)
+
+
+# -----------------------------
+# IMÁGENES DE EVENTOS
+# -----------------------------
+# Las URLs del CDN de los adjuntos de un DM caducan. La imagen se descarga una
+# vez, se reduce si es muy grande y se guarda en disco con su hash como
+# nombre. El evento guarda "attachment://<nombre>" y el archivo se sube junto
+# al mensaje del evento; al editar el mensaje el adjunto se conserva y no se
+# vuelve a subir.
+ATTACHMENT_PREFIX = "attachment://"
+FORMATS = {"image/png": ("png", "PNG"), "image/jpeg": ("jpg", "JPEG"), "image/webp": ("webp", "WEBP"), "image/gif": ("gif", None)}
+
+
+class ImageCache:
+    def __init__(self, directory, max_size=1280):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, os.path.basename(name))
+
+    def _downscale(self, data, pil_format):
+        """Reduce la imagen si supera `max_size` por algún lado (bloquea: usar en un hilo)"""
+        if Image is None or pil_format is None or not self.max_size:
+            return data
+        with Image.open(io.BytesIO(data)) as img:
+            if max(img.size) <= self.max_size:
+                return data
+            img.thumbnail((self.max_size, self.max_size))
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            out = io.BytesIO()
+            img.save(out, format=pil_format, optimize=True)
+            return out.getvalue()
+
+    def store(self, data, content_type):
+        """Guarda los bytes y devuelve la referencia attachment:// (bloquea: usar en un hilo).
+        Lanza una de INVALID_IMAGE_ERRORS si Pillow no puede abrir la imagen"""
+        ext, pil_format = FORMATS.get((content_type or "").split(";")[0], ("png", None))
+        # El hash se calcula sobre el original: la misma imagen reutiliza el archivo
+        name = hashlib.sha256(data).hexdigest()[:32] + "." + ext
+        path = self.path(name)
+        if os.path.exists(path):
+            self.hits += 1
+        else:
+            self.misses += 1
+            atomic_write(path, self._downscale(data, pil_format))
+        return ATTACHMENT_PREFIX + name
+
+    def local_name(self, image):
+        """Nombre del archivo en caché si `image` es una referencia attachment://"""
+        if image and image.startswith(ATTACHMENT_PREFIX):
+            return image[len(ATTACHMENT_PREFIX):]
+        return None
+
+    def prune(self, referenced):
+        """Borra los archivos que ya no usa ningún evento"""
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name not in referenced and not name.startswith("."):
+                os.unlink(self.path(name))
+                removed += 1
+        return removed
@@ -1,13 +1,39 @@
-from flask import Flask
+from flask import Flask, Response, abort, request
 from threading import Thread
 import os
 
+from core import calendar_for
+
 app = Flask('')
 
 @app.route('/')
 def home():
     return "✅ Bot activo en Koyeb"
 
+# -----------------------------
+# CALENDARIO .ICS
+# -----------------------------
+# Para suscribirse desde el móvil: /calendario/<guild_id>.ics, o ?rol=TANQUE
+# para ver solo los eventos con inscritos en ese rol. Las apps de calendario
+# repiten la petición con If-None-Match / If-Modified-Since y reciben 304.
+@app.route('/calendario/<int:guild_id>.ics')
+def calendario(guild_id):
+    role = request.args.get("rol", "").upper() or None
+    try:
+        feed = calendar_for(guild_id, role)
+    except (LookupError, TimeoutError):
+        # Eventos sin cargar todavía o loop ocupado: el cliente lo reintenta
+        return Response("Calendario no disponible", status=503, headers={"Retry-After": "30"})
+    if feed is None:
+        abort(404)
+    body, etag, last_modified = feed
+    response = Response(body, mimetype="text/calendar")
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
+
 def run():
     port = int(os.environ.get("PORT", 8080))
     app.run(host='0.0.0.0', port=port)
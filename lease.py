@@ -0,0 +1,75 @@
+# lease.py
+import contextlib
+import os
+import socket
+import time
+import uuid
+
+import serializer
+from store import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+
+# -----------------------------
+# LÍDER ENTRE RÉPLICAS
+# -----------------------------
+# Durante un despliegue pueden convivir dos instancias del bot. Solo la que
+# tiene el lease (un archivo con dueño y caducidad que se renueva cada pocos
+# segundos) programa recordatorios; las demás siguen atendiendo botones.
+
+class Lease:
+    def __init__(self, path, ttl=30, owner=None):
+        self.path = path
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        self.released = False  # al apagar: ya no se vuelve a tomar
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Bloqueo del archivo auxiliar mientras se lee y reescribe el lease"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return serializer.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def try_acquire(self):
+        """Toma o renueva el lease si está libre, caducado o ya es nuestro (bloquea: usar en un hilo)"""
+        with self._locked():
+            if self.released:
+                # Una renovación que llega tarde, después de soltarlo
+                self.is_leader = False
+                return False
+            current = self._read()
+            now = time.time()
+            if current and current.get("owner") != self.owner and current.get("expires", 0) > now:
+                self.is_leader = False
+                return False
+            atomic_write(self.path, serializer.dumps({"owner": self.owner, "expires": now + self.ttl}))
+        self.is_leader = True
+        return True
+
+    def release(self):
+        """Suelta el lease para que otra réplica lo tome sin esperar a que caduque"""
+        with self._locked():
+            self.released = True
+            current = self._read()
+            if current and current.get("owner") == self.owner:
+                os.unlink(self.path)
+        self.is_leader = False
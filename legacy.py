@@ -0,0 +1,45 @@
+# legacy.py
+from models import ROLE_BITS
+
+
+# -----------------------------
+# NORMALIZACIÓN DE DATOS ANTIGUOS
+# -----------------------------
+# Versiones anteriores del bot guardaban a los inscritos por display_name en
+# lugar de por id, y algunos eventos tienen una lista "participants" sin rol.
+# Al cargar, esos nombres quedan en Event.legacy_names; esto los convierte una
+# sola vez para que el resto del código solo trabaje con ids.
+
+async def normalize_participants(events, resolve_name):
+    """Convierte los nombres de `legacy_names` en inscripciones por id.
+
+    `resolve_name` es una corrutina nombre -> user_id (o None). Los nombres
+    que no se puedan resolver (o que no tienen rol) se quedan en
+    `legacy_names` para no perderlos. Devuelve [(evento, {user_id: roles antes})].
+    """
+    resolved = {}  # nombre -> user_id, compartido entre eventos
+    changed = []
+    for event in events:
+        if not event.legacy_names:
+            continue
+
+        before = {}
+        unresolved = {}
+        for role_key, names in event.legacy_names.items():
+            for name in names:
+                if role_key not in ROLE_BITS:
+                    unresolved.setdefault(role_key, []).append(name)
+                    continue
+                if name not in resolved:
+                    resolved[name] = await resolve_name(name)
+                user_id = resolved[name]
+                if user_id is None:
+                    unresolved.setdefault(role_key, []).append(name)
+                    continue
+                before.setdefault(user_id, event.roles_of(user_id))
+                event.signups[user_id] = event.signups.get(user_id, 0) | ROLE_BITS[role_key]
+
+        event.legacy_names = unresolved or None
+        if before:
+            changed.append((event, before))
+    return changed
@@ -0,0 +1,57 @@
+# lifecycle.py
+import asyncio
+import logging
+import signal
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# APAGADO ORDENADO
+# -----------------------------
+class Lifecycle:
+    """Convierte SIGTERM/SIGINT en un apagado por pasos.
+
+    Al recibir la señal deja de aceptar asistentes nuevos (`accepting`) y
+    ejecuta en orden los pasos registrados con `on_shutdown`. Un paso que
+    falla no impide que se ejecuten los siguientes.
+    """
+
+    def __init__(self, deadline=20):
+        self.deadline = deadline
+        self.accepting = True
+        self._steps = []  # (nombre, corrutina sin argumentos)
+        self._task = None
+
+    @property
+    def stopping(self):
+        return not self.accepting
+
+    def on_shutdown(self, name):
+        def decorator(func):
+            self._steps.append((name, func))
+            return func
+        return decorator
+
+    def install(self, loop):
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig)
+            except (NotImplementedError, RuntimeError):
+                # Windows: sin manejadores de señal en el loop
+                pass
+
+    def request_shutdown(self, sig=None):
+        if self._task is None:
+            name = sig.name if sig is not None else "petición"
+            log.warning("Apagado solicitado (%s), plazo %ss", name, self.deadline)
+            self._task = asyncio.ensure_future(self.shutdown())
+        return self._task
+
+    async def shutdown(self):
+        self.accepting = False
+        for name, step in self._steps:
+            try:
+                await step()
+            except Exception:
+                log.exception("Error en el paso de apagado", extra={"step": name})
@@ -0,0 +1,120 @@
+# logs.py
+import contextlib
+import contextvars
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import serializer
+
+
+# -----------------------------
+# LOGS ESTRUCTURADOS (JSON)
+# -----------------------------
+# Cada línea es un objeto JSON. El loop solo mete el registro en una cola
+# (QueueHandler); el formateo y la escritura ocurren en el hilo del
+# QueueListener. Cada interacción lleva un id de correlación que heredan las
+# tareas que lanza, y puede medir pasos ("spans") con `span()`.
+correlation_id = contextvars.ContextVar("correlation_id", default=None)
+_spans = contextvars.ContextVar("spans", default=None)
+
+STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        cid = getattr(record, "correlation_id", None)
+        if cid:
+            data["cid"] = cid
+        # Campos pasados con extra={...}
+        for key, value in record.__dict__.items():
+            if key not in STANDARD_ATTRS and key != "correlation_id":
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return serializer.dumps(data).decode()
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Añade el id de correlación al registro en el hilo del loop (donde está el contexto)"""
+
+    def prepare(self, record):
+        record.correlation_id = correlation_id.get()
+        if record.exc_info:
+            # La traza se formatea aquí: el objeto excepción no debe cruzar de hilo
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        # Igual que QueueHandler.prepare, pero sin meter la traza dentro de msg
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level="INFO"):
+    """Configura el logger raíz (también el de discord.py). Devuelve el listener para pararlo al salir"""
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    root = logging.getLogger()
+    root.handlers[:] = [ContextQueueHandler(log_queue)]
+    root.setLevel(level)
+    listener.start()
+    return listener
+
+
+# -----------------------------
+# TRAZAS Y SPANS
+# -----------------------------
+def new_correlation_id():
+    return uuid.uuid4().hex[:12]
+
+
+def begin_trace(cid=None):
+    """Inicia una traza en el contexto actual (la heredan las tareas creadas después)"""
+    correlation_id.set(cid or new_correlation_id())
+    spans = []
+    _spans.set(spans)
+    return spans
+
+
+@contextlib.contextmanager
+def span(name):
+    """Mide un paso dentro de la traza actual; sin traza activa no hace nada"""
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, round((time.perf_counter() - started) * 1000, 2)))
+
+
+def finish_trace(logger, message, elapsed, slow_ms=500, sample=0.01, **fields):
+    """Registra el fin de la traza. Las lentas, una muestra de las demás y todas
+    con nivel DEBUG incluyen el desglose de spans"""
+    spans = _spans.get() or []
+    elapsed_ms = round(elapsed * 1000, 2)
+    fields["elapsed_ms"] = elapsed_ms
+    if elapsed_ms >= slow_ms:
+        fields["spans"] = list(spans)
+        logger.warning(message, extra=fields)
+        return
+    if spans and (random.random() < sample or logger.isEnabledFor(logging.DEBUG)):
+        fields["spans"] = list(spans)
+    logger.info(message, extra=fields)
@@ -0,0 +1,68 @@
+# members.py
+import time
+from collections import OrderedDict
+
+
+# -----------------------------
+# CACHÉ DE MIEMBROS CON TTL
+# -----------------------------
+class MemberCache:
+    """Miembros pedidos bajo demanda, con tamaño máximo y caducidad.
+
+    Sustituye a la caché completa de discord.py cuando el bot arranca sin
+    descargar la lista de miembros del servidor. Los ids que el gateway no
+    devuelve (ya no están en el servidor) se guardan como entradas negativas
+    con el mismo TTL para no volver a pedirlos en cada refresco.
+    """
+
+    def __init__(self, maxsize=5000, ttl=6 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()  # user_id -> (expira, member o None si no existe)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, user_id):
+        item = self._items.get(user_id)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._items[user_id]
+            self.misses += 1
+            return None
+        self._items.move_to_end(user_id)
+        self.hits += 1
+        return item[1]
+
+    def put(self, member):
+        self._store(member.id, member)
+
+    def put_missing(self, user_id):
+        """Entrada negativa: el id no es miembro del servidor"""
+        self._store(user_id, None)
+
+    def _store(self, user_id, member):
+        self._items[user_id] = (time.monotonic() + self.ttl, member)
+        self._items.move_to_end(user_id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, user_id):
+        self._items.pop(user_id, None)
+
+    def missing(self, user_ids):
+        now = time.monotonic()
+        return [uid for uid in user_ids if uid not in self._items or self._items[uid][0] < now]
+
+    async def fetch_many(self, guild, user_ids):
+        """Pide al gateway los ids que no están en caché, en lotes de 100"""
+        missing = self.missing(set(user_ids))
+        for i in range(0, len(missing), 100):
+            batch = missing[i:i + 100]
+            members = await guild.query_members(user_ids=batch, cache=False)
+            for member in members:
+                self.put(member)
+            for user_id in set(batch) - {m.id for m in members}:
+                self.put_missing(user_id)
@@ -0,0 +1,257 @@
+# models.py
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+
+# -----------------------------
+# MODELO DE EVENTO
+# -----------------------------
+# Formato en el que se escriben las fechas en los asistentes y al importar.
+# En el archivo se guardan en ISO 8601 con desplazamiento ("2025-09-12T20:00+02:00").
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Claves de rol en el orden en que se muestran. El índice de cada clave es su
+# bit en Event.signups.
+ROLE_KEYS = ("INF", "OFICIAL", "RECON", "TANQUE", "ARTY", "COMANDANTE", "TENTATIVO", "DECLINADO")
+ROLE_BITS = {key: 1 << i for i, key in enumerate(ROLE_KEYS)}
+NOT_ATTENDING_MASK = ROLE_BITS["TENTATIVO"] | ROLE_BITS["DECLINADO"]
+
+DEFAULT_EVENT_DURATION = timedelta(hours=3)
+DURATION_UNITS = {
+    "minuto": timedelta(minutes=1), "min": timedelta(minutes=1),
+    "hora": timedelta(hours=1), "h": timedelta(hours=1),
+    "dia": timedelta(days=1), "día": timedelta(days=1),
+}
+
+# Campos antiguos que ya no se usan y se descartan al cargar
+OBSOLETE_KEYS = {"channel_created", "thread_created", "name"}
+
+
+def parse_datetime(text, tz):
+    """Fecha ISO 8601 o DATE_FORMAT. Si no lleva zona horaria se interpreta en `tz`"""
+    text = str(text).strip()
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        value = datetime.strptime(text, DATE_FORMAT)
+    return value if value.tzinfo else value.replace(tzinfo=tz)
+
+
+def parse_end(start, text):
+    """Fin del evento: fecha absoluta, duración ('2 horas') o inicio + duración por defecto"""
+    text = (text or "").strip().lower()
+    try:
+        return parse_datetime(text, start.tzinfo)
+    except ValueError:
+        pass
+    parts = text.split()
+    if len(parts) >= 2:
+        amount = parts[0].replace(",", ".")
+        unit = parts[1].rstrip("s")
+        if amount.replace(".", "", 1).isdigit() and unit in DURATION_UNITS:
+            return start + float(amount) * DURATION_UNITS[unit]
+    return start + DEFAULT_EVENT_DURATION
+
+
+def _opt_int(value, name):
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' debe ser un número")
+
+
+@dataclass(slots=True, eq=False)
+class Event:
+    id: str
+    title: str
+    description: str
+    channel_id: int
+    start: datetime
+    end_text: str = ""
+    end: datetime = None
+    creator_id: int = None
+    message_id: int = None
+    thread_id: int = None
+    thread_archived: bool = False
+    max_attendees: int = None
+    multi_response: bool = False
+    registration_open: bool = True
+    registration_close: str = None
+    reminder_sent: bool = False
+    mention_roles: list = field(default_factory=list)
+    allowed_roles: list = field(default_factory=list)
+    assign_role: int = None
+    color: int = None
+    image: str = None
+    # user_id -> máscara de bits de ROLE_KEYS, en orden de inscripción
+    signups: dict = field(default_factory=dict)
+    # Inscripciones antiguas por nombre que no se pudieron convertir: rol -> [nombres]
+    legacy_names: dict = None
+    # Claves desconocidas del archivo, se conservan tal cual
+    extra: dict = None
+
+    def __post_init__(self):
+        if self.end is None:
+            self.end = parse_end(self.start, self.end_text)
+
+    # -----------------------------
+    # FECHAS
+    # -----------------------------
+    @property
+    def reminder_time(self):
+        return self.start - timedelta(minutes=15)
+
+    def set_start(self, start):
+        self.start = start
+        self.end = parse_end(start, self.end_text)
+
+    def set_end_text(self, text):
+        self.end_text = text
+        self.end = parse_end(self.start, text)
+
+    def started(self, now=None):
+        return self.start <= (now or datetime.now(timezone.utc))
+
+    # -----------------------------
+    # INSCRIPCIONES
+    # -----------------------------
+    def roles_of(self, user_id):
+        mask = self.signups.get(user_id, 0)
+        return {key for key in ROLE_KEYS if mask & ROLE_BITS[key]}
+
+    def members_in(self, role_key):
+        bit = ROLE_BITS[role_key]
+        return [uid for uid, mask in self.signups.items() if mask & bit]
+
+    def participant_ids(self, skip_declined=False):
+        if not skip_declined:
+            return list(self.signups)
+        declined = ROLE_BITS["DECLINADO"]
+        return [uid for uid, mask in self.signups.items() if mask & ~declined]
+
+    def attending_count(self):
+        return sum(1 for mask in self.signups.values() if mask & ~NOT_ATTENDING_MASK)
+
+    def sign_up(self, user_id, role_key):
+        """Inscribe al usuario en el rol. Devuelve (roles antes, roles después)"""
+        before = self.roles_of(user_id)
+        bit = ROLE_BITS[role_key]
+        mask = self.signups.get(user_id, 0)
+        self.signups[user_id] = (mask | bit) if self.multi_response else bit
+        return before, self.roles_of(user_id)
+
+    def withdraw(self, user_id):
+        before = self.roles_of(user_id)
+        self.signups.pop(user_id, None)
+        return before, set()
+
+    # -----------------------------
+    # CONVERSIÓN A / DESDE DICCIONARIO
+    # -----------------------------
+    @classmethod
+    def from_dict(cls, data, tz=timezone.utc):
+        """Valida un registro del archivo. Lanza ValueError si no es utilizable.
+
+        Las fechas antiguas sin zona horaria se interpretan en `tz`.
+        """
+        data = dict(data)
+        try:
+            event_id = str(data.pop("id"))
+            title = str(data.pop("title", None) or data.get("name") or "Evento sin título")
+            channel_id = int(data.pop("channel_id"))
+            start = parse_datetime(data.pop("start"), tz)
+        except KeyError as e:
+            raise ValueError(f"falta el campo {e}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"campo inválido ({e})")
+
+        signups = {}
+        legacy = {}
+        for key, entries in (data.pop("participants_roles", None) or {}).items():
+            if key not in ROLE_BITS:
+                if entries:
+                    legacy.setdefault(key, []).extend(str(e) for e in entries)
+                continue
+            for entry in entries:
+                if isinstance(entry, str) and entry.isdigit():
+                    entry = int(entry)
+                if isinstance(entry, int):
+                    signups[entry] = signups.get(entry, 0) | ROLE_BITS[key]
+                else:
+                    legacy.setdefault(key, []).append(str(entry))
+        # Lista antigua sin rol
+        for name in data.pop("participants", None) or []:
+            legacy.setdefault("", []).append(str(name))
+        old_legacy = data.pop("legacy_names", None) or {}
+        if isinstance(old_legacy, list):
+            old_legacy = {"": old_legacy}
+        for key, names in old_legacy.items():
+            legacy.setdefault(key, []).extend(n for n in names if n not in legacy.get(key, []))
+
+        color = data.pop("color", None)
+        if isinstance(color, str):
+            color = int(color.replace("#", ""), 16)
+
+        event = cls(
+            id=event_id,
+            title=title,
+            description=str(data.pop("description", None) or "Sin descripción"),
+            channel_id=channel_id,
+            start=start,
+            end_text=str(data.pop("end", None) or ""),
+            creator_id=_opt_int(data.pop("creator_id", None), "creator_id"),
+            message_id=_opt_int(data.pop("message_id", None), "message_id"),
+            thread_id=_opt_int(data.pop("thread_id", None), "thread_id"),
+            thread_archived=bool(data.pop("thread_archived", False)),
+            max_attendees=_opt_int(data.pop("max_attendees", None), "max_attendees"),
+            multi_response=bool(data.pop("multi_response", False)),
+            registration_open=bool(data.pop("registration_open", True)),
+            registration_close=data.pop("registration_close", None) or None,
+            reminder_sent=bool(data.pop("reminder_sent", False)),
+            mention_roles=[int(r) for r in data.pop("mention_roles", None) or []],
+            allowed_roles=[int(r) for r in data.pop("allowed_roles", None) or []],
+            assign_role=_opt_int(data.pop("assign_role", None), "assign_role"),
+            color=color,
+            image=data.pop("image", None) or None,
+            signups=signups,
+            legacy_names=legacy or None,
+        )
+        for key in OBSOLETE_KEYS:
+            data.pop(key, None)
+        event.extra = data or None
+        return event
+
+    def to_dict(self):
+        """Registro para el archivo (participants_roles por rol, inicio en ISO 8601 con zona)"""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "channel_id": self.channel_id,
+            "start": self.start.isoformat(timespec="minutes"),
+            "end": self.end_text,
+            "creator_id": self.creator_id,
+            "max_attendees": self.max_attendees,
+            "multi_response": self.multi_response,
+            "registration_open": self.registration_open,
+            "reminder_sent": self.reminder_sent,
+            "participants_roles": {key: self.members_in(key) for key in ROLE_KEYS},
+        }
+        optional = {
+            "message_id": self.message_id,
+            "thread_id": self.thread_id,
+            "thread_archived": self.thread_archived or None,
+            "registration_close": self.registration_close,
+            "mention_roles": list(self.mention_roles) or None,
+            "allowed_roles": list(self.allowed_roles) or None,
+            "assign_role": self.assign_role,
+            "color": self.color,
+            "image": self.image,
+            "legacy_names": {k: list(v) for k, v in self.legacy_names.items()} if self.legacy_names else None,
+        }
+        data.update((k, v) for k, v in optional.items() if v is not None)
+        if self.extra:
+            data.update(self.extra)
+        return data
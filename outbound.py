@@ -0,0 +1,165 @@
+# outbound.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+
+log = logging.getLogger(__name__)
+
+# Clases de prioridad, de más a menos urgente
+INTERACTION, EDIT, POST, DM = range(4)
+PRIORITY_NAMES = {INTERACTION: "interaccion", EDIT: "edicion", POST: "publicacion", DM: "dm"}
+
+
+# -----------------------------
+# PRESUPUESTO POR RUTA
+# -----------------------------
+class RouteBudget:
+    """Cubo de fichas: `rate` llamadas por segundo con ráfagas de hasta `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def wait_time(self, now):
+        """Segundos hasta que haya una ficha (0 si ya la hay)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+# -----------------------------
+# PLANIFICADOR DE LLAMADAS REST
+# -----------------------------
+class OutboundScheduler:
+    """Ordena las llamadas salientes a Discord por prioridad.
+
+    Las respuestas a interacciones no esperan nunca (Discord da 3 s). El resto
+    se encola por clase (ediciones de embeds, publicaciones en canales e
+    hilos, DMs) y `concurrency` trabajadores atienden siempre la clase más
+    urgente. Cada ruta ("dm", "edit:<canal>", ...) gasta de su presupuesto
+    según el prefijo en `budgets`; si una ruta lo ha agotado, se adelanta
+    trabajo de otras rutas en vez de esperar.
+    """
+
+    def __init__(self, concurrency=4, budgets=None, latency=None):
+        self.concurrency = concurrency
+        self.budgets = budgets or {}  # prefijo de ruta -> (por segundo, ráfaga)
+        self.latency = latency
+        self._routes = {}  # ruta -> RouteBudget
+        self._queues = {p: OrderedDict() for p in PRIORITY_NAMES}  # prioridad -> ruta -> deque
+        self._wakeup = asyncio.Event()
+        self._workers = []
+        self.sent = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.failed = 0
+        self.deferred = 0  # veces que una ruta sin presupuesto cedió el turno
+
+    def queued(self):
+        """Llamadas en cola por clase de prioridad"""
+        return {PRIORITY_NAMES[p]: sum(len(q) for q in routes.values()) for p, routes in self._queues.items()}
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        while len(self._workers) < self.concurrency:
+            self._workers.append(loop.create_task(self._worker(), name=f"rest:{len(self._workers)}"))
+
+    async def stop(self):
+        """Detiene los trabajadores; quien espere una llamada en cola recibe CancelledError"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for routes in self._queues.values():
+            for queue in routes.values():
+                for _, future, _ in queue:
+                    future.cancel()
+            routes.clear()
+
+    async def run(self, priority, route, factory):
+        """Ejecuta `factory()` (corrutina REST) cuando le toque y devuelve su resultado"""
+        if priority == INTERACTION:
+            return await self._call(priority, route, factory, time.monotonic())
+        if not self._workers:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(route, deque()).append((factory, future, time.monotonic()))
+        self._wakeup.set()
+        return await future
+
+    def _budget(self, route):
+        budget = self._routes.get(route)
+        if budget is None:
+            config = self.budgets.get(route.split(":")[0])
+            if config is None:
+                return None
+            budget = self._routes[route] = RouteBudget(*config)
+        return budget
+
+    def _next(self):
+        """(prioridad, ruta, elemento) listo para enviar, o (None, espera mínima)"""
+        now = time.monotonic()
+        shortest = None
+        for priority, routes in self._queues.items():
+            for route in list(routes):
+                queue = routes[route]
+                while queue and queue[0][1].done():
+                    queue.popleft()  # quien esperaba se canceló
+                if not queue:
+                    del routes[route]
+                    continue
+                budget = self._budget(route)
+                wait = budget.wait_time(now) if budget else 0
+                if wait:
+                    self.deferred += 1
+                    shortest = wait if shortest is None else min(shortest, wait)
+                    continue
+                if budget:
+                    budget.take()
+                item = queue.popleft()
+                routes.move_to_end(route)  # turno rotatorio entre rutas de la misma clase
+                if not queue:
+                    del routes[route]
+                return priority, route, item
+        return None, shortest
+
+    async def _worker(self):
+        while True:
+            picked = self._next()
+            if picked[0] is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=picked[1])
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            priority, route, (factory, future, queued) = picked
+            if future.done():
+                continue
+            try:
+                result = await self._call(priority, route, factory, queued)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _call(self, priority, route, factory, queued):
+        started = time.monotonic()
+        if self.latency is not None:
+            self.latency.record(f"rest:{PRIORITY_NAMES[priority]}", started - queued)
+        try:
+            return await factory()
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.sent[priority] += 1
@@ -0,0 +1,129 @@
+# profiling.py
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# PERFIL DEL LOOP (cProfile)
+# -----------------------------
+class LoopProfiler:
+    """Perfila todo lo que se ejecuta en el hilo del loop durante unos segundos.
+
+    Solo hay un perfil a la vez; `stop` lo termina antes de tiempo.
+    """
+
+    def __init__(self):
+        self._profile = None
+        self._done = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    async def run(self, seconds):
+        """Perfila hasta `seconds` segundos o hasta `stop`; None si ya había uno en curso"""
+        if self.running:
+            return None
+        profile = self._profile = cProfile.Profile()
+        self._done = asyncio.Event()
+        profile.enable()
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            profile.disable()
+            self._profile = None
+        return profile
+
+    def stop(self):
+        if not self.running:
+            return False
+        self._done.set()
+        return True
+
+
+def render_profile(profile, limit=40):
+    """(informe ordenado por tiempo acumulado, perfil en formato .prof); llamar en un hilo"""
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    dump = marshal.dumps(stats.stats)  # lo mismo que escribe Stats.dump_stats
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return out.getvalue(), dump
+
+
+# -----------------------------
+# RETRASO DEL LOOP
+# -----------------------------
+class LoopLagMonitor:
+    """Duerme `interval` segundos en bucle y apunta cuánto se pasa del tiempo pedido"""
+
+    def __init__(self, interval=0.25, window=240):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="monitor_retraso")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - before - self.interval))
+
+    def summary(self):
+        """(último, p95, máximo) en milisegundos, o None sin muestras"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return self.samples[-1] * 1000, p95 * 1000, ordered[-1] * 1000
+
+
+# -----------------------------
+# CALLBACKS LENTOS
+# -----------------------------
+class SlowCallbackLog(logging.Handler):
+    """Activa el modo debug del loop y guarda sus avisos de callbacks lentos.
+
+    En modo debug asyncio registra "Executing <callback> took X seconds" para
+    cada callback que pasa de `slow_callback_duration`. El modo debug tiene
+    coste, así que se activa solo mientras se investiga.
+    """
+
+    def __init__(self, size=20):
+        super().__init__(logging.WARNING)
+        self.entries = deque(maxlen=size)
+        self.enabled = False
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith("Executing "):
+            self.entries.append(message)
+
+    def enable(self, loop, threshold_ms):
+        loop.slow_callback_duration = threshold_ms / 1000
+        loop.set_debug(True)
+        if not self.enabled:
+            logging.getLogger("asyncio").addHandler(self)
+        self.enabled = True
+
+    def disable(self, loop):
+        loop.set_debug(False)
+        logging.getLogger("asyncio").removeHandler(self)
+        self.enabled = False
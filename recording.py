@@ -0,0 +1,92 @@
+# recording.py
+import asyncio
+import logging
+import os
+import time
+
+import serializer
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# GRABACIÓN DE TRÁFICO
+# -----------------------------
+# Formato (JSON Lines): una cabecera {"type": "inicio", ...} con el estado de
+# los eventos al empezar y después una línea por interacción o DM, con "t" en
+# segundos desde el inicio. replay.py lo reproduce contra un cliente falso.
+class TrafficRecorder:
+    """Graba interacciones (botones, slash commands) y respuestas por DM.
+
+    Las líneas se agrupan en memoria y se añaden al archivo desde un hilo
+    cada `delay` segundos, así grabar una noche de inscripciones no añade
+    escrituras a disco al camino de cada interacción.
+    """
+
+    def __init__(self, directory, delay=1.0):
+        self.directory = directory
+        self.delay = delay
+        self.path = None
+        self.count = 0
+        self._started = None
+        self._pending = []
+        self._task = None
+
+    @property
+    def active(self):
+        return self.path is not None
+
+    def start(self, header):
+        """Empieza un archivo nuevo con la cabecera `header`. Devuelve su ruta"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, time.strftime("grabacion-%Y%m%d-%H%M%S.jsonl"))
+        self.path, self.count, self._started = path, 0, time.monotonic()
+        self._pending = [{"type": "inicio", "t": 0, "wall": time.time(), **header}]
+        self._schedule()
+        return path
+
+    def record(self, entry):
+        if not self.active:
+            return
+        entry["t"] = round(time.monotonic() - self._started, 4)
+        self._pending.append(entry)
+        self.count += 1
+        self._schedule()
+
+    async def stop(self):
+        """Termina la grabación y escribe lo pendiente. Devuelve (ruta, entradas)"""
+        path, count = self.path, self.count
+        self.path = None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pending:
+            await asyncio.to_thread(self._append, path, self._take_pending())
+        return path, count
+
+    def _schedule(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _take_pending(self):
+        lines = b"".join(serializer.dumps(entry) + b"\n" for entry in self._pending)
+        self._pending = []
+        return lines
+
+    @staticmethod
+    def _append(path, data):
+        with open(path, "ab") as f:
+            f.write(data)
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self.delay)
+            path, data = self.path, self._take_pending()
+            try:
+                # shield: parar la grabación no deja la escritura a medias
+                await asyncio.shield(asyncio.to_thread(self._append, path, data))
+            except OSError as e:
+                log.error("Error al guardar la grabación %s: %s", path, e)
@@ -0,0 +1,102 @@
+# reminders.py
+import hashlib
+import os
+import time
+
+import serializer
+from store import atomic_write
+
+
+# -----------------------------
+# MARCAS DE RECORDATORIO ENVIADO
+# -----------------------------
+class ReminderLog:
+    """Un archivo por evento que se crea ANTES de mandar el recordatorio.
+
+    La creación es exclusiva (O_EXCL), así que si dos réplicas intentan
+    enviar el mismo recordatorio solo una lo consigue, aunque cada una tenga
+    su propia copia de los eventos en memoria. El registro guarda también
+    qué pasos se completaron ("steps") y a quién se envió ya el DM ("dms"),
+    para poder continuar un envío interrumpido sin repetir nada.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, event_id):
+        name = hashlib.sha1(str(event_id).encode()).hexdigest()[:24]
+        return os.path.join(self.directory, name + ".json")
+
+    def claim(self, event_id, owner):
+        """Reserva el envío. Devuelve el registro, o None si ya estaba reservado"""
+        record = {"event_id": event_id, "owner": owner, "claimed": time.time(), "done": False, "steps": {}, "dms": []}
+        path = self._path(event_id)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, "wb") as f:
+            f.write(serializer.dumps(record))
+            f.flush()
+            os.fsync(f.fileno())
+        return record
+
+    def save(self, record):
+        atomic_write(self._path(record["event_id"]), serializer.dumps(record))
+
+    def complete(self, record):
+        record["done"] = True
+        self.save(record)
+
+    def unfinished(self, stale_after=300):
+        """Recordatorios a medias: interrumpidos al apagar o abandonados hace más de `stale_after` s"""
+        now = time.time()
+        records = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    record = serializer.loads(f.read())
+            except (OSError, ValueError):
+                continue
+            if record.get("done"):
+                continue
+            if record.get("interrupted") or now - record.get("claimed", now) > stale_after:
+                records.append(record)
+        return records
+
+    def adopt(self, record, owner):
+        """Esta instancia continúa un recordatorio que dejó a medias otra"""
+        record.update(owner=owner, claimed=time.time(), interrupted=False)
+        self.save(record)
+        return record
+
+    def prune(self, max_age):
+        """Borra las marcas de recordatorios terminados hace más de `max_age` segundos.
+        Devuelve cuántas borró"""
+        cutoff = time.time() - max_age
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    record = serializer.loads(f.read())
+            except (OSError, ValueError):
+                continue
+            if record.get("done") and record.get("claimed", cutoff) < cutoff:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue  # otra réplica la borró a la vez
+                removed += 1
+        return removed
+
+    def forget(self, event_id):
+        try:
+            os.unlink(self._path(event_id))
+        except FileNotFoundError:
+            pass
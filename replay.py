@@ -0,0 +1,510 @@
+# replay.py
+# Reproduce una grabación de /perf grabar contra un cliente de Discord falso,
+# sin conexión, y genera un informe de latencias, llamadas REST y estado final.
+#
+#   python replay.py grabaciones/grabacion-20250912-203000.jsonl --velocidad 10
+#
+# Se ejecuta en un directorio temporal (eventos.json, estadísticas, historial)
+# que parte de los eventos guardados en la cabecera de la grabación; nunca
+# toca los archivos del bot ni se conecta a Discord.
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import serializer
+from background import LatencyStats
+from models import Event
+
+# Extensiones que atienden tráfico; los loops de recordatorios dependen de la
+# hora real y harían el resultado irrepetible
+REPLAY_EXTENSIONS = ["cogs.store", "cogs.registration", "cogs.wizard", "cogs.calendar", "cogs.search", "cogs.admin"]
+
+
+# -----------------------------
+# CLIENTE FALSO
+# -----------------------------
+class FakeAPI:
+    """Cuenta cada llamada que haría el bot a la API y simula su latencia"""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.calls = Counter()
+        self._ids = itertools.count(10**17)
+
+    def next_id(self):
+        return next(self._ids)
+
+    async def call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+class FakeRole:
+    def __init__(self, role_id, name, default=False):
+        self.id = role_id
+        self.name = name
+        self.managed = False
+        self.mention = f"<@&{role_id}>"
+        self._default = default
+
+    def is_default(self):
+        return self._default
+
+
+class FakeMessage:
+    def __init__(self, api, message_id, channel, content=None):
+        self.api = api
+        self.id = message_id
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, **kwargs):
+        await self.api.call("message.edit")
+        return self
+
+    async def delete(self):
+        await self.api.call("message.delete")
+
+    async def create_thread(self, name, **kwargs):
+        await self.api.call("thread.create")
+        return self.channel.guild.add_thread(name)
+
+
+class FakeTextChannel:
+    def __init__(self, api, guild, channel_id, name):
+        self.api = api
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+        self.archived = False
+        self.is_thread = False
+
+    async def send(self, content=None, **kwargs):
+        await self.api.call("channel.send")
+        return FakeMessage(self.api, self.api.next_id(), self, content)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self.api, message_id, self)
+
+    async def fetch_message(self, message_id):
+        await self.api.call("message.fetch")
+        return FakeMessage(self.api, message_id, self)
+
+    async def create_thread(self, name, **kwargs):
+        await self.api.call("thread.create")
+        return self.guild.add_thread(name)
+
+    async def edit(self, **kwargs):
+        await self.api.call("channel.edit")
+        self.archived = kwargs.get("archived", self.archived)
+        return self
+
+
+class FakeDMChannel:
+    def __init__(self, api, user):
+        self.api = api
+        self.recipient = user
+        self.id = api.next_id()
+
+    async def send(self, content=None, **kwargs):
+        await self.api.call("dm.send")
+        return FakeMessage(self.api, self.api.next_id(), self, content)
+
+
+class FakeMember:
+    def __init__(self, api, guild, user_id, name, roles=(), perms=()):
+        self.api = api
+        self.guild = guild
+        self.id = user_id
+        self.name = self.display_name = self.global_name = name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.roles = list(roles)
+        self.guild_permissions = self.permissions(perms)
+        self._dm = None
+
+    @staticmethod
+    def permissions(perms):
+        return SimpleNamespace(**{p: p in perms for p in ("administrator", "manage_guild", "manage_events")})
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    async def create_dm(self):
+        if self._dm is None:
+            self._dm = FakeDMChannel(self.api, self)
+            await self.api.call("dm.create")
+        return self._dm
+
+    async def send(self, content=None, **kwargs):
+        dm = await self.create_dm()
+        return await dm.send(content, **kwargs)
+
+    async def add_roles(self, *roles, **kwargs):
+        await self.api.call("member.add_roles")
+
+    async def remove_roles(self, *roles, **kwargs):
+        await self.api.call("member.remove_roles")
+
+
+class FakeGuild:
+    """Servidor con los canales y roles de la cabecera. Cualquier id de
+    miembro existe (con un nombre genérico) para que renderizar cueste lo mismo"""
+
+    def __init__(self, api, guild_id, channels, roles):
+        self.api = api
+        self.id = guild_id
+        self.default_role = FakeRole(guild_id, "@everyone", default=True)
+        self._roles = {role_id: FakeRole(role_id, name) for role_id, name in roles}
+        self._channels = {channel_id: FakeTextChannel(api, self, channel_id, name) for channel_id, name in channels}
+        self._members = {}
+
+    @property
+    def roles(self):
+        return [self.default_role, *self._roles.values()]
+
+    @property
+    def text_channels(self):
+        return [c for c in self._channels.values() if not c.is_thread]
+
+    @property
+    def channels(self):
+        return list(self._channels.values())
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            # Canal de un evento de la cabecera que ya no estaba en la lista
+            channel = self._channels[channel_id] = FakeTextChannel(self.api, self, channel_id, f"canal-{channel_id}")
+        return channel
+
+    def add_thread(self, name):
+        thread = FakeTextChannel(self.api, self, self.api.next_id(), name)
+        thread.is_thread = True
+        self._channels[thread.id] = thread
+        return thread
+
+    def member(self, user_id, name=None, roles=(), perms=()):
+        member = self._members.get(user_id)
+        if member is None:
+            member = self._members[user_id] = FakeMember(self.api, self, user_id, f"usuario-{user_id}")
+        if name:
+            # Datos grabados: sustituyen a los genéricos
+            member.name = member.display_name = member.global_name = name
+            member.roles = [self._roles[r] for r in roles if r in self._roles]
+            member.guild_permissions = FakeMember.permissions(perms)
+        return member
+
+    def get_member(self, user_id):
+        return self.member(user_id)
+
+    async def query_members(self, query=None, user_ids=None, limit=5, cache=True):
+        await self.api.call("guild.query_members")
+        return [self.member(uid) for uid in user_ids or []]
+
+
+class FakeResponse:
+    def __init__(self, api):
+        self.api = api
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        await self.api.call("interaction.defer")
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        await self.api.call("interaction.send_message")
+        self._done = True
+
+    async def edit_message(self, **kwargs):
+        await self.api.call("interaction.edit_message")
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, api):
+        self.api = api
+
+    async def send(self, content=None, **kwargs):
+        await self.api.call("followup.send")
+        return FakeMessage(self.api, self.api.next_id(), None, content)
+
+
+class FakeInteraction:
+    def __init__(self, api, guild, user, channel_id, kind, data):
+        self.id = api.next_id()
+        self.type = kind
+        self.data = data
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel_id = channel_id
+        self.channel = guild.get_channel(channel_id) if channel_id else None
+        self.message = None
+        self.command = None
+        self.extras = {}
+        self.response = FakeResponse(api)
+        self.followup = FakeFollowup(api)
+
+
+# -----------------------------
+# REPRODUCCIÓN
+# -----------------------------
+def read_recording(path):
+    with open(path, "rb") as f:
+        entries = [serializer.loads(line) for line in f if line.strip()]
+    header = next((e for e in entries if e.get("type") == "inicio"), None)
+    if header is None:
+        raise ValueError(f"{path} no tiene cabecera: ¿es una grabación de /perf grabar?")
+    body = sorted((e for e in entries if e.get("type") != "inicio"), key=lambda e: e["t"])
+    return header, body
+
+
+def shifted_events(header, shift):
+    """Eventos de la cabecera desplazados `shift` segundos: lo que empezaba una
+    hora después de grabar empieza una hora después de reproducir"""
+    delta = timedelta(seconds=shift)
+    events = []
+    for record in header["events"]:
+        event = Event.from_dict(record)
+        event.set_start(event.start + delta)
+        events.append(event.to_dict())
+    return events
+
+
+def store_digest(store, base):
+    """Huella del estado final, para comparar dos reproducciones. Las fechas
+    cuentan en minutos desde `base` (el inicio de la reproducción), porque
+    los eventos se desplazan a la hora a la que se reproduce"""
+    records = []
+    for event in sorted(store.events, key=lambda e: e.id):
+        record = event.to_dict()
+        record["start"] = round((event.start - base).total_seconds() / 60)
+        records.append(record)
+    return hashlib.sha256(json.dumps(records, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def find_command(tree, guild, name):
+    parts = name.split()
+    command = tree.get_command(parts[0], guild=guild)
+    for part in parts[1:]:
+        command = command.get_command(part) if command else None
+    return command
+
+
+async def replay(core, discord, header, entries, args):
+    base = datetime.fromtimestamp(args.base, timezone.utc)
+    api = FakeAPI(args.latencia_ms)
+    guild = FakeGuild(api, header["guild"], header.get("channels", []), header.get("roles", []))
+    bot = core.bot
+    bot.get_guild = lambda guild_id: guild if guild_id == guild.id else None
+    bot.get_channel = lambda channel_id: guild.get_channel(channel_id)
+
+    async def fetch_channel(channel_id):
+        await api.call("channel.fetch")
+        return guild.get_channel(channel_id)
+    bot.fetch_channel = fetch_channel
+
+    for extension in REPLAY_EXTENSIONS:
+        await bot.load_extension(extension)
+    core.startup_done = True
+    await bot.extensions["cogs.store"].warm_up()
+    api.calls.clear()  # el arranque no cuenta
+
+    timings = LatencyStats(window=len(entries) or 1)
+    kinds, errors, tasks = Counter(), Counter(), []
+
+    async def timed(name, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            errors[f"{name}: {type(e).__name__}"] += 1
+        finally:
+            timings.record(name, time.perf_counter() - started)
+
+    async def deliver_dm(previous, message):
+        # En la grabación el usuario respondía después de leer la pregunta del
+        # asistente: se entrega cuando hay un wait_for que la acepte, en orden por usuario
+        if previous is not None:
+            await previous
+        deadline = time.monotonic() + args.espera
+        while time.monotonic() < deadline:
+            # Como Client.dispatch con los wait_for, sin pasar por on_message
+            # (que intentaría procesar comandos de prefijo con el mensaje falso)
+            listeners = bot._listeners.get("message", [])
+            for i, (future, check) in enumerate(listeners):
+                if not future.done() and check(message):
+                    future.set_result(message)
+                    del listeners[i]
+                    return
+            await asyncio.sleep(0.005)
+        errors["dm: ningún asistente la esperaba"] += 1
+
+    dm_chains = {}  # user_id -> última entrega pendiente
+    started = time.monotonic()
+    for entry in entries:
+        if args.velocidad:
+            delay = started + entry["t"] / args.velocidad - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        user = guild.member(entry["user"], entry.get("name"), entry.get("roles", ()), entry.get("perms", ()))
+        if entry["type"] == "dm":
+            # Los adjuntos se reproducen como su URL (el asistente acepta URLs de imagen)
+            content = entry.get("content") or next(iter(entry.get("attachments", [])), "")
+            message = SimpleNamespace(
+                id=api.next_id(), author=user, guild=None, content=content, attachments=[],
+                channel=None, created_at=datetime.now(timezone.utc)
+            )
+            dm_chains[user.id] = asyncio.create_task(deliver_dm(dm_chains.get(user.id), message))
+            tasks.append(dm_chains[user.id])
+            kinds["dm"] += 1
+        elif "custom_id" in entry:
+            interaction = FakeInteraction(
+                api, guild, user, entry.get("channel"), discord.InteractionType.component, {"custom_id": entry["custom_id"]}
+            )
+            action = entry["custom_id"].split(":")[1] if ":" in entry["custom_id"] else "?"
+            tasks.append(asyncio.create_task(timed(f"boton:{action}", core.dispatch_interaction(interaction))))
+            kinds["boton"] += 1
+        else:
+            command = find_command(bot.tree, core.GUILD, entry["command"])
+            if command is None:
+                errors[f"/{entry['command']}: no existe"] += 1
+                continue
+            interaction = FakeInteraction(
+                api, guild, user, entry.get("channel"), discord.InteractionType.application_command, {"name": entry["command"]}
+            )
+            interaction.command = command
+            tasks.append(asyncio.create_task(timed(f"/{entry['command']}", command.callback(interaction, **entry.get("options", {})))))
+            kinds["comando"] += 1
+    dispatched = time.monotonic() - started
+
+    await asyncio.gather(*tasks)
+    # Refrescos de mensajes y asistentes; un asistente al que le faltan
+    # respuestas (grabación cortada) se queda esperando y se interrumpe
+    pending = await core.background.drain(timeout=args.espera)
+    if pending:
+        await core.background.cancel(pending)
+    await core.store.flush()
+    await core.stats.flush()
+    await core.audit.flush()
+    await core.rest.stop()
+
+    return {
+        "grabacion": args.grabacion,
+        "velocidad": args.velocidad or "máxima",
+        "latencia_api_ms": args.latencia_ms,
+        "entradas": dict(kinds),
+        "errores": dict(errors),
+        "tareas_interrumpidas": len(pending),
+        "duracion_s": round(time.monotonic() - started, 3),
+        "duracion_grabacion_s": entries[-1]["t"] if entries else 0,
+        "envio_s": round(dispatched, 3),
+        "latencias_ms": {
+            name: {"n": n, "p50": round(p50, 2), "p95": round(p95, 2), "max": round(top, 2)}
+            for name, (n, p50, p95, top) in sorted(timings.summary().items())
+        },
+        "manejadores_ms": {
+            name: {"n": n, "p50": round(p50, 2), "p95": round(p95, 2), "max": round(top, 2)}
+            for name, (n, p50, p95, top) in sorted(core.latency.summary().items())
+        },
+        "rest": {
+            "llamadas": sum(api.calls.values()),
+            "por_tipo": dict(sorted(api.calls.items())),
+            "programador": {"enviadas": core.rest.sent, "cedidas": core.rest.deferred, "fallidas": core.rest.failed},
+        },
+        "estado_final": {
+            "eventos": len(core.store.events),
+            "inscripciones": sum(len(e.signups) for e in core.store.events),
+            "sha256": store_digest(core.store, base),
+            "directorio": os.getcwd(),
+        },
+    }
+
+
+def print_report(report):
+    print(f"Grabación: {report['grabacion']} (velocidad {report['velocidad']})")
+    print(f"Entradas: {report['entradas']}  duración {report['duracion_s']} s (grabación {report['duracion_grabacion_s']} s)")
+    for name, row in report["latencias_ms"].items():
+        print(f"  {name:<28} n={row['n']:<6} p50 {row['p50']:>8.1f}  p95 {row['p95']:>8.1f}  máx {row['max']:>8.1f} ms")
+    print(f"Llamadas REST: {report['rest']['llamadas']} {report['rest']['por_tipo']}")
+    final = report["estado_final"]
+    print(f"Estado final: {final['eventos']} eventos, {final['inscripciones']} inscripciones, sha256 {final['sha256'][:16]}…")
+    print(f"Archivos: {final['directorio']}")
+    if report["errores"] or report["tareas_interrumpidas"]:
+        print(f"Errores: {report['errores']}  tareas interrumpidas: {report['tareas_interrumpidas']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce una grabación de /perf grabar sin conexión")
+    parser.add_argument("grabacion", help="Archivo .jsonl creado con /perf grabar")
+    parser.add_argument("--velocidad", type=float, default=1.0, help="1 = tiempo real, 10 = diez veces más rápido, 0 = sin esperas")
+    parser.add_argument("--latencia-ms", dest="latencia_ms", type=float, default=80, help="Latencia simulada de cada llamada a la API")
+    parser.add_argument("--espera", type=float, default=10, help="Segundos para que terminen las tareas pendientes al final")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de los ids de los eventos creados")
+    parser.add_argument("--informe", help="Guardar el informe en este archivo JSON")
+    parser.add_argument("--directorio", help="Directorio de trabajo (por defecto, uno temporal)")
+    args = parser.parse_args()
+    args.grabacion = os.path.abspath(args.grabacion)
+    report_path = os.path.abspath(args.informe) if args.informe else None
+
+    header, entries = read_recording(args.grabacion)
+    # En minutos enteros: las fechas se guardan al minuto y la huella del
+    # estado final no debe depender del segundo en que se lanza
+    shift = round((time.time() - header["wall"]) / 60) * 60
+    args.base = header["wall"] + shift
+
+    # core lee la configuración al importarse: entorno y directorio antes de importarlo
+    workdir = args.directorio or tempfile.mkdtemp(prefix="replay-")
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)
+    os.environ.update(GUILD_ID=str(header["guild"]), DISCORD_TOKEN="replay", MEMBER_CHUNKING="full", LOG_LEVEL="WARNING")
+    with open("eventos.json", "wb") as f:
+        f.write(serializer.dumps(serializer.wrap("events", shifted_events(header, shift))))
+
+    # Ids de eventos nuevos repetibles entre reproducciones
+    rng = random.Random(args.semilla)
+    uuid.uuid4 = lambda: uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    import discord
+    import core
+
+    async def run():
+        async with core.bot:
+            return await replay(core, discord, header, entries, args)
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        core.log_listener.stop()
+    print_report(report)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
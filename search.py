@@ -0,0 +1,107 @@
+# search.py
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+# -----------------------------
+# NORMALIZACIÓN DE TEXTO
+# -----------------------------
+# Sin tildes ni mayúsculas: "Operación" y "operacion" son el mismo término
+STOPWORDS = {
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "para", "por", "se", "un", "una", "y", "o", "que",
+}
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(normalize(text)) if t not in STOPWORDS]
+
+
+# -----------------------------
+# ÍNDICE INVERTIDO
+# -----------------------------
+# Peso de cada campo en la puntuación
+TITLE_WEIGHT = 3
+CREATOR_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+
+class SearchIndex:
+    """Índice invertido término -> eventos, actualizado evento a evento.
+
+    Todos los términos de la consulta tienen que aparecer; el último se busca
+    como prefijo para que el autocompletado funcione mientras se escribe.
+    """
+
+    def __init__(self, max_expansions=50):
+        self.max_expansions = max_expansions
+        self._postings = {}  # término -> {event_id: peso}
+        self._terms = []  # términos ordenados (búsqueda por prefijo)
+        self._docs = {}  # event_id -> términos indexados
+
+    def __len__(self):
+        return len(self._docs)
+
+    def index(self, event_id, title, description="", creator=""):
+        self.remove(event_id)
+        weights = {}
+        for text, weight in ((description, DESCRIPTION_WEIGHT), (creator, CREATOR_WEIGHT), (title, TITLE_WEIGHT)):
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0), weight)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[event_id] = weight
+        self._docs[event_id] = set(weights)
+
+    def remove(self, event_id):
+        for term in self._docs.pop(event_id, ()):
+            postings = self._postings[term]
+            postings.pop(event_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _prefixed(self, prefix):
+        i = bisect_left(self._terms, prefix)
+        terms = []
+        while i < len(self._terms) and self._terms[i].startswith(prefix) and len(terms) < self.max_expansions:
+            terms.append(self._terms[i])
+            i += 1
+        return terms
+
+    def search(self, query, limit=25, rank=None):
+        """[(event_id, puntuación)] de mayor a menor puntuación; `rank(event_id)` desempata"""
+        words = TOKEN_RE.findall(normalize(query))
+        # El último se conserva aunque sea una palabra vacía: puede ser el
+        # principio de otra ("la" -> "lanzamiento")
+        terms = [t for t in words[:-1] if t not in STOPWORDS] + words[-1:]
+        if not terms:
+            return []
+        scores = None
+        for i, term in enumerate(terms):
+            # Peso de cada evento para este término (el último admite prefijos)
+            matched = {}
+            for candidate in (self._prefixed(term) if i == len(terms) - 1 else [term]):
+                for event_id, weight in self._postings.get(candidate, {}).items():
+                    # Coincidencia exacta puntúa más que un prefijo
+                    score = weight * (2 if candidate == term else 1)
+                    if score > matched.get(event_id, 0):
+                        matched[event_id] = score
+            if scores is None:
+                scores = matched
+            else:
+                scores = {eid: scores[eid] + s for eid, s in matched.items() if eid in scores}
+            if not scores:
+                return []
+        key = (lambda item: (item[1], rank(item[0]))) if rank else (lambda item: item[1])
+        return heapq.nlargest(limit, scores.items(), key=key)
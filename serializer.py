@@ -0,0 +1,52 @@
+# serializer.py
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+# -----------------------------
+# SERIALIZACIÓN JSON
+# -----------------------------
+# Con orjson instalado se usa orjson; si no, la librería estándar. Por defecto
+# la salida es compacta; `pretty=True` la indenta para depurar a mano.
+# 1 = lista sin envolver (formato antiguo de eventos.json)
+# 2 = documento versionado
+# 3 = inscripciones solo por id (los nombres sin resolver van en legacy_names)
+# 4 = fechas con zona horaria (ISO 8601)
+SCHEMA_VERSION = 4
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def dumps(obj, pretty=False):
+    """Objeto -> bytes"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, default=str, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), default=str, ensure_ascii=False).encode()
+
+
+def loads(data):
+    """bytes o str -> objeto"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def wrap(key, payload, version=SCHEMA_VERSION):
+    """Documento versionado que se guarda en disco"""
+    return {"schema_version": version, key: payload}
+
+
+def unwrap(key, document):
+    """Devuelve (schema_version, payload), aceptando también el formato antiguo sin versión"""
+    if isinstance(document, list) or "schema_version" not in document:
+        return 1, document
+    return document["schema_version"], document.get(key)
@@ -0,0 +1,49 @@
+# settings.py
+import os
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+import serializer
+from store import atomic_write
+
+
+# -----------------------------
+# AJUSTES POR SERVIDOR
+# -----------------------------
+class GuildSettings:
+    """Ajustes de cada servidor en un JSON pequeño: guild_id -> {clave: valor}"""
+
+    def __init__(self, path, default_timezone="UTC"):
+        self.path = path
+        self.default_timezone = default_timezone
+        self._data = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                _, self._data = serializer.unwrap("guilds", serializer.loads(f.read()))
+            self._data = self._data or {}
+
+    def save(self):
+        atomic_write(self.path, serializer.dumps(serializer.wrap("guilds", self._data), pretty=True))
+
+    # -----------------------------
+    # ZONA HORARIA
+    # -----------------------------
+    def timezone(self, guild_id):
+        name = self._data.get(str(guild_id), {}).get("timezone", self.default_timezone)
+        return ZoneInfo(name)
+
+    def set_timezone(self, guild_id, name):
+        """Cambia la zona del servidor. Lanza ValueError si `name` no es una zona IANA"""
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"zona horaria desconocida: {name}")
+        self._data.setdefault(str(guild_id), {})["timezone"] = name
+        self.save()
+        return tz
+
+
+def timezone_names():
+    """Nombres IANA disponibles, ordenados"""
+    return sorted(available_timezones())
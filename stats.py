@@ -0,0 +1,155 @@
+# stats.py
+import os
+
+import serializer
+from store import AsyncFileWriter
+
+
+# -----------------------------
+# ESTADÍSTICAS DE ASISTENCIA
+# -----------------------------
+ATTENDANCE = "ASISTENCIAS"  # inscrito en algún rol que no sea DECLINADO ni TENTATIVO
+NOT_ATTENDING = {"DECLINADO", "TENTATIVO"}
+
+
+class RankedCounter:
+    """Contador por usuario con cubetas por valor: el ranking no necesita ordenar"""
+
+    def __init__(self):
+        self.counts = {}  # user_id -> n
+        self.buckets = {}  # n -> set(user_id)
+        self.max = 0
+
+    def add(self, user_id, delta):
+        old = self.counts.get(user_id, 0)
+        new = max(old + delta, 0)
+        if old == new:
+            return
+        if old:
+            bucket = self.buckets[old]
+            bucket.discard(user_id)
+            if not bucket:
+                del self.buckets[old]
+        if new:
+            self.counts[user_id] = new
+            self.buckets.setdefault(new, set()).add(user_id)
+        else:
+            del self.counts[user_id]
+        if new > self.max:
+            self.max = new
+        while self.max and self.max not in self.buckets:
+            self.max -= 1
+
+    def get(self, user_id):
+        return self.counts.get(user_id, 0)
+
+    def top(self, n):
+        result = []
+        count = self.max
+        while count > 0 and len(result) < n:
+            for user_id in sorted(self.buckets.get(count, ())):
+                result.append((user_id, count))
+                if len(result) == n:
+                    break
+            count -= 1
+        return result
+
+
+class AttendanceStats:
+    """Agregados por usuario y por rol, mantenidos con cada cambio de inscripción.
+
+    Se guardan en su propio archivo, así que los eventos antiguos siguen
+    contando aunque se borren del almacén.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.metrics = {}  # métrica (ATTENDANCE o clave de rol) -> RankedCounter
+        self.role_totals = {}  # clave de rol -> inscripciones totales
+        self.events_counted = 0
+        self.loaded = False
+        self.writer = AsyncFileWriter(path, lambda: serializer.dumps(serializer.wrap("stats", self.to_dict())))
+
+    def counter(self, metric):
+        return self.metrics.setdefault(metric, RankedCounter())
+
+    # -----------------------------
+    # CARGAR / GUARDAR
+    # -----------------------------
+    def load(self):
+        """Lee el archivo. Devuelve False si no existe (hay que reconstruir)"""
+        self.loaded = True
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            _, data = serializer.unwrap("stats", serializer.loads(f.read()))
+        self.events_counted += data.get("events_counted", 0)
+        for metric, counts in data.get("users", {}).items():
+            counter = self.counter(metric)
+            for user_id, n in counts.items():
+                counter.add(int(user_id), n)
+        for role, n in data.get("role_totals", {}).items():
+            self.role_totals[role] = self.role_totals.get(role, 0) + n
+        return True
+
+    def to_dict(self):
+        return {
+            "events_counted": self.events_counted,
+            "role_totals": self.role_totals,
+            "users": {m: {str(u): n for u, n in c.counts.items()} for m, c in self.metrics.items()},
+        }
+
+    def save(self):
+        """Programa el guardado en el hilo escritor (no bloquea)"""
+        self.writer.request()
+
+    async def flush(self):
+        await self.writer.flush()
+
+    # -----------------------------
+    # ACTUALIZACIÓN INCREMENTAL
+    # -----------------------------
+    def update(self, user_id, before, after):
+        """Aplica el cambio de roles de un usuario en un evento (conjuntos de claves)"""
+        for role in after - before:
+            self.counter(role).add(user_id, 1)
+            self.role_totals[role] = self.role_totals.get(role, 0) + 1
+        for role in before - after:
+            self.counter(role).add(user_id, -1)
+            self.role_totals[role] = max(self.role_totals.get(role, 0) - 1, 0)
+        attended_before = bool(before - NOT_ATTENDING)
+        attended_after = bool(after - NOT_ATTENDING)
+        if attended_before != attended_after:
+            self.counter(ATTENDANCE).add(user_id, 1 if attended_after else -1)
+
+    def add_event(self, event):
+        for user_id, roles in user_roles(event).items():
+            self.update(user_id, set(), roles)
+        self.events_counted += 1
+
+    def remove_event(self, event):
+        for user_id, roles in user_roles(event).items():
+            self.update(user_id, roles, set())
+        self.events_counted = max(self.events_counted - 1, 0)
+
+    def rebuild(self, events):
+        self.metrics.clear()
+        self.role_totals.clear()
+        self.events_counted = 0
+        for event in events:
+            self.add_event(event)
+
+    # -----------------------------
+    # CONSULTAS
+    # -----------------------------
+    def leaderboard(self, metric, n=10):
+        counter = self.metrics.get(metric)
+        return counter.top(n) if counter else []
+
+    def user_summary(self, user_id):
+        return {metric: c.get(user_id) for metric, c in self.metrics.items() if c.get(user_id)}
+
+
+def user_roles(event):
+    """user_id -> conjunto de roles en los que está inscrito"""
+    return {user_id: event.roles_of(user_id) for user_id in event.signups}
@@ -0,0 +1,211 @@
+# store.py
+import asyncio
+import logging
+import os
+import time
+import tempfile
+from datetime import timezone
+
+import serializer
+from models import Event
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------
+# ESCRITURA A DISCO FUERA DEL LOOP
+# -----------------------------
+def atomic_write(path, data):
+    """Escribe `data` (bytes) en un temporal, hace fsync y lo renombra sobre `path`"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Que el rename también sobreviva a un corte de luz
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class AsyncFileWriter:
+    """Guarda un archivo desde un hilo aparte sin bloquear el loop.
+
+    `snapshot` se llama en el hilo del loop y devuelve los bytes a escribir,
+    así el hilo escritor nunca ve datos a medio modificar. Varias peticiones
+    seguidas dentro de `delay` segundos se agrupan en una sola escritura.
+    """
+
+    def __init__(self, path, snapshot, delay=0.5):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.writes = 0
+        self.changes = 0  # sube con cada petición; sirve para invalidar cachés
+        self._dirty = False
+        self._task = None
+        self._current = None  # escritura en curso en el hilo
+
+    @property
+    def pending(self):
+        return self._dirty or (self._task is not None and not self._task.done())
+
+    def request(self):
+        """Marca el archivo como pendiente de guardar (no bloquea)"""
+        self.changes += 1
+        self._dirty = True
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin loop (scripts, pruebas): se escribe directamente
+            self.write_now()
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            await self._write()
+
+    async def _write(self):
+        self._dirty = False
+        # shield: cancelar la tarea (al apagar) no deja la escritura a medias
+        started = time.perf_counter()
+        self._current = asyncio.ensure_future(asyncio.to_thread(atomic_write, self.path, self.snapshot()))
+        try:
+            await asyncio.shield(self._current)
+            self.writes += 1
+            log.debug("Archivo guardado", extra={"path": self.path, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)})
+        except OSError as e:
+            log.error("Error al guardar %s: %s", self.path, e)
+            self._dirty = True
+
+    async def flush(self):
+        """Espera a que todo lo pendiente esté en disco (al apagar)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._current is not None and not self._current.done():
+            try:
+                await self._current
+            except OSError:
+                self._dirty = True
+        if self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(atomic_write, self.path, self.snapshot())
+            self.writes += 1
+
+    def write_now(self):
+        self._dirty = False
+        atomic_write(self.path, self.snapshot())
+        self.writes += 1
+
+
+# -----------------------------
+# ALMACÉN DE EVENTOS
+# -----------------------------
+class EventStore:
+    """Eventos guardados en disco. Solo se leen la primera vez que se usan.
+
+    Cada registro se valida una vez al cargar y se convierte en un `Event`.
+    Los registros que no pasan la validación se conservan aparte (`rejected`)
+    y se vuelven a escribir tal cual para no perder datos.
+    """
+
+    def __init__(self, path, pretty=False, tz=timezone.utc):
+        self.path = path
+        self.pretty = pretty
+        self.tz = tz  # para las fechas antiguas guardadas sin zona horaria
+        self.schema_version = serializer.SCHEMA_VERSION
+        self.rejected = []
+        self._events = None
+        self._by_id = {}
+        self.writer = AsyncFileWriter(path, self._snapshot)
+
+    @property
+    def loaded(self):
+        return self._events is not None
+
+    @property
+    def needs_migration(self):
+        """El archivo viene de una versión anterior (inscripciones por nombre o fechas sin zona)"""
+        return self.schema_version < serializer.SCHEMA_VERSION
+
+    def mark_migrated(self):
+        self.schema_version = serializer.SCHEMA_VERSION
+        self.save()
+
+    @property
+    def events(self):
+        if self._events is None:
+            self.load()
+        return self._events
+
+    def load(self):
+        """Lee el archivo (si no se había leído ya) y construye el índice por id"""
+        if self._events is None:
+            records = []
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    document = serializer.loads(f.read())
+                self.schema_version, records = serializer.unwrap("events", document)
+                if isinstance(document, dict):
+                    self.rejected = document.get("rejected", [])
+            events = []
+            for record in records or []:
+                try:
+                    events.append(Event.from_dict(record, self.tz))
+                except (TypeError, ValueError) as e:
+                    record_id = record.get("id", "?") if isinstance(record, dict) else "?"
+                    log.warning("Evento inválido en %s: %s", self.path, e, extra={"event_id": record_id})
+                    self.rejected.append(record)
+            self._by_id = {e.id: e for e in events}
+            self._events = events
+        return self._events
+
+    def _snapshot(self):
+        document = serializer.wrap("events", [e.to_dict() for e in self.events], self.schema_version)
+        if self.rejected:
+            document["rejected"] = self.rejected
+        return serializer.dumps(document, pretty=self.pretty)
+
+    def save(self):
+        """Programa el guardado; la escritura real ocurre en un hilo aparte"""
+        self.writer.request()
+
+    async def flush(self):
+        await self.writer.flush()
+
+    def get(self, event_id):
+        self.events
+        return self._by_id.get(event_id)
+
+    def add(self, event):
+        self.events.append(event)
+        self._by_id[event.id] = event
+
+    def add_many(self, events):
+        """Inserta un lote de eventos de una vez"""
+        self.events.extend(events)
+        self._by_id.update((e.id, e) for e in events)
+
+    def remove(self, event):
+        self.events.remove(event)
+        self._by_id.pop(event.id, None)
@@ -0,0 +1,47 @@
+# tests/test_audit.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import serializer
+from audit import AuditLog, field_diff, signup_diff
+
+EVENT = SimpleNamespace(id="ev1", title="Raid")
+
+
+def read_lines(path):
+    with open(path, "rb") as f:
+        return [serializer.loads(line) for line in f]
+
+
+def test_field_diff_only_lists_changes():
+    before = {"title": "Raid", "max_attendees": 10}
+    after = {"title": "Raid", "max_attendees": 20}
+    assert field_diff(before, after) == {"max_attendees": [10, 20]}
+
+
+def test_signup_diff_keeps_roles_before_and_after():
+    assert signup_diff(5, {"INF"}, {"TANQUE"}) == {"signup": ["5", ["INF"], ["TANQUE"]]}
+
+
+def test_history_is_newest_first(tmp_path):
+    audit = AuditLog(str(tmp_path / "audit.jsonl"))
+    audit.record(EVENT, 1, "crear")
+    audit.record(EVENT, 2, "inscribir")
+    assert [e["action"] for e in audit.history("ev1")] == ["inscribir", "crear"]
+    assert audit.find_events("RAID") == [("ev1", "Raid")]
+
+
+def test_periodic_write_drops_entries_past_max_age(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = AuditLog(path, max_age_days=1, delay=0, compact_every=0)
+    audit.record(EVENT, 1, "crear")  # sin loop: se escribe directamente
+    audit._entries[0]["t"] = time.time() - 2 * 86400  # entrada de hace dos días
+
+    async def run():
+        audit.record(EVENT, 2, "editar")
+        await audit._task
+
+    asyncio.run(run())
+    assert [e["action"] for e in audit.history("ev1")] == ["editar"]
+    assert [e["action"] for e in read_lines(path)] == ["editar"]
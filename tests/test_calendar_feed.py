@@ -0,0 +1,74 @@
+# tests/test_calendar_feed.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from calendar_feed import CalendarFeed, escape_text, fold
+from models import ROLE_BITS
+
+NOW = datetime(2025, 9, 12, 20, 0, tzinfo=timezone.utc)
+
+
+def make_event(event_id, title, days, signups=None, description=""):
+    start = NOW + timedelta(days=days)
+    return SimpleNamespace(
+        id=event_id, title=title, description=description, start=start,
+        end=start + timedelta(hours=2), signups=signups or {},
+    )
+
+
+def unfold(body):
+    return body.decode().replace("\r\n ", "").split("\r\n")
+
+
+def test_escape_and_fold():
+    assert escape_text("a;b,c\nd\\") == r"a\;b\,c\nd\\"
+    line = "DESCRIPTION:" + "ñ" * 60
+    folded = fold(line)
+    assert all(len(part.encode()) <= 75 for part in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "") == line
+
+
+def test_feed_lists_upcoming_events_only():
+    events = [
+        make_event("pasado", "Antiguo", -3),
+        make_event("raid", "Raid, nocturna", 1, {5: ROLE_BITS["TANQUE"]}),
+    ]
+    body, etag, _ = CalendarFeed().render("todos", 1, events, now=NOW)
+    lines = unfold(body)
+    assert lines[0] == "BEGIN:VCALENDAR"
+    assert "UID:raid@eventos" in lines
+    assert "UID:pasado@eventos" not in lines
+    assert "SUMMARY:Raid\\, nocturna" in lines
+    assert "DTSTART:20250913T200000Z" in lines
+    assert any(line.startswith("DESCRIPTION:") and "TANQUE 1" in line for line in lines)
+
+
+def test_role_filter():
+    events = [make_event("tanques", "Tanques", 1, {5: ROLE_BITS["TANQUE"]}), make_event("inf", "Infantería", 1, {6: ROLE_BITS["INF"]})]
+    body, _, _ = CalendarFeed().render("TANQUE", 1, events, role="TANQUE", now=NOW)
+    lines = unfold(body)
+    assert "UID:tanques@eventos" in lines and "UID:inf@eventos" not in lines
+    assert "X-WR-CALNAME:Eventos (TANQUE)" in lines
+
+
+def test_same_version_reuses_feed():
+    feed = CalendarFeed()
+    assert feed.current("todos", 1) is None
+    rendered = feed.render("todos", 1, [make_event("raid", "Raid", 1)], now=NOW)
+    assert feed.current("todos", 1) == rendered
+    assert feed.current("todos", 2) is None
+
+
+def test_etag_and_last_modified_follow_content():
+    feed = CalendarFeed()
+    event = make_event("raid", "Raid", 1)
+    _, etag, modified = feed.render("todos", 1, [event], now=NOW)
+
+    # Nueva versión de los datos sin cambios visibles: mismo ETag y Last-Modified
+    _, same_etag, same_modified = feed.render("todos", 2, [event], now=NOW + timedelta(minutes=5))
+    assert (same_etag, same_modified) == (etag, modified)
+
+    event.title = "Raid aplazada"
+    _, new_etag, new_modified = feed.render("todos", 3, [event], now=NOW + timedelta(minutes=10))
+    assert new_etag != etag
+    assert new_modified == NOW + timedelta(minutes=10)
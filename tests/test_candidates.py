@@ -0,0 +1,35 @@
+# tests/test_candidates.py
+from candidates import CandidateIndex
+
+
+def make_index():
+    index = CandidateIndex()
+    index.rebuild([(1, "chat-general"), (2, "Operaciones"), (3, "óperas")])
+    return index
+
+
+def test_prefix_matches_name_or_any_word():
+    index = make_index()
+    assert index.complete("gen") == [(1, "chat-general")]
+    assert index.complete("chat") == [(1, "chat-general")]
+
+
+def test_prefix_is_accent_and_case_insensitive():
+    assert make_index().complete("OPE") == [(2, "Operaciones"), (3, "óperas")]
+
+
+def test_add_rename_and_remove():
+    index = make_index()
+    index.add(4, "anuncios")
+    index.add(1, "charla")  # renombrado
+    assert index.complete("gen") == []
+    assert index.name(1) == "charla"
+    index.remove(4)
+    assert index.complete("anun") == []
+    assert len(index) == 3
+
+
+def test_limit():
+    index = CandidateIndex()
+    index.rebuild([(i, f"sala-{i}") for i in range(40)])
+    assert len(index.complete("sala")) == 25
@@ -0,0 +1,72 @@
+# tests/test_conflicts.py
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from conflicts import ConflictIndex, IntervalIndex
+from models import ROLE_BITS
+
+BASE = datetime(2025, 9, 20, 20, 0, tzinfo=timezone.utc)
+
+
+def at(hours):
+    return BASE + timedelta(hours=hours)
+
+
+def make_event(event_id, start, end, channel_id=10, signups=None):
+    return SimpleNamespace(id=event_id, channel_id=channel_id, start=at(start), end=at(end), signups=signups or {})
+
+
+def test_overlapping_intervals():
+    index = IntervalIndex()
+    index.add("canal", "a", at(0), at(2))
+    index.add("canal", "b", at(3), at(4))
+    assert index.overlapping("canal", at(1), at(3)) == ["a"]
+    assert sorted(index.overlapping("canal", at(1), at(3.5))) == ["a", "b"]
+
+
+def test_touching_intervals_do_not_overlap():
+    index = IntervalIndex()
+    index.add("canal", "a", at(0), at(2))
+    assert index.overlapping("canal", at(2), at(3)) == []
+    assert index.overlapping("canal", at(-1), at(0)) == []
+
+
+def test_long_interval_found_from_far_start():
+    # Empieza mucho antes que el intervalo consultado pero sigue abierto
+    index = IntervalIndex()
+    index.add("canal", "largo", at(0), at(24))
+    index.add("canal", "corto", at(1), at(2))
+    assert index.overlapping("canal", at(20), at(21)) == ["largo"]
+
+
+def test_readding_moves_interval():
+    index = IntervalIndex()
+    index.add("canal", "a", at(0), at(2))
+    index.add("canal", "a", at(5), at(6))
+    assert index.overlapping("canal", at(0), at(2)) == []
+    assert index.overlapping("canal", at(5), at(6)) == ["a"]
+    index.remove("canal", "a")
+    assert index.overlapping("canal", at(5), at(6)) == []
+
+
+def test_channel_conflicts_ignore_other_channels_and_itself():
+    conflicts = ConflictIndex()
+    first = make_event("a", 0, 2)
+    conflicts.rebuild([first, make_event("b", 1, 3), make_event("c", 1, 3, channel_id=20)])
+    assert conflicts.channel_conflicts(first) == ["b"]
+
+
+def test_member_conflicts_follow_signups():
+    conflicts = ConflictIndex()
+    first = make_event("a", 0, 2, signups={5: ROLE_BITS["INF"]})
+    second = make_event("b", 1, 3, signups={6: ROLE_BITS["DECLINADO"]})
+    conflicts.rebuild([first, second])
+    assert conflicts.member_conflicts(5, second) == ["a"]
+    assert conflicts.member_conflicts(6, first) == []  # declinado no cuenta
+
+    conflicts.set_member(first, 5, attending=False)
+    assert conflicts.member_conflicts(5, second) == []
+
+    conflicts.set_member(first, 5, attending=True)
+    conflicts.remove_event(first)
+    assert conflicts.member_conflicts(5, second) == []
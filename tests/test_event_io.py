@@ -0,0 +1,60 @@
+# tests/test_event_io.py
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from event_io import read_events, validate_row, write_events
+
+NOW = datetime(2025, 9, 12, 20, 0, tzinfo=timezone.utc)
+
+
+def test_past_event_is_imported_with_reminder_sent():
+    event = validate_row({"title": "Operación antigua", "start": "2025-09-01 20:00"}, 1, 10, 1, now=NOW)
+    assert event.reminder_sent
+
+
+def test_event_not_started_keeps_pending_reminder():
+    # Empieza dentro de 10 minutos: el recordatorio (15 min antes) ya pasó, pero aún sirve
+    event = validate_row({"title": "Casi ahora", "start": "2025-09-12 20:10"}, 1, 10, 1, now=NOW)
+    assert not event.reminder_sent
+
+
+def test_exported_reminder_sent_is_kept():
+    row = {"title": "Próxima", "start": "2025-09-20 20:00", "reminder_sent": "True"}
+    assert validate_row(row, 1, 10, 1, now=NOW).reminder_sent
+
+
+def test_future_event_keeps_pending_reminder():
+    event = validate_row({"title": "Próxima", "start": "2025-09-20 20:00"}, 1, 10, 1, now=NOW)
+    assert not event.reminder_sent
+
+
+def test_read_events_marks_only_past_rows():
+    rows = [
+        {"id": "pasado", "title": "Archivado", "start": "2025-08-01T20:00+00:00"},
+        {"id": "futuro", "title": "Próximo", "start": "2025-10-01T20:00+00:00"},
+    ]
+    fp = io.BytesIO("".join(json.dumps(row) + "\n" for row in rows).encode())
+    valid, errors, error_count = read_events(fp, "jsonl", 10, 1, [], now=NOW)
+    assert error_count == 0
+    assert {e.id: e.reminder_sent for e in valid} == {"pasado": True, "futuro": False}
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_export_import_round_trip_keeps_state(fmt):
+    original = validate_row({"id": "ida", "title": "Raid", "start": "2025-09-20T20:00+00:00"}, 1, 10, 1, now=NOW)
+    original.message_id = 111
+    original.thread_id = 222
+    original.reminder_sent = True
+    original.sign_up(5, "TANQUE")
+
+    fp = io.BytesIO()
+    write_events([original.to_dict()], fp, fmt)
+    fp.seek(0)
+    valid, errors, _ = read_events(fp, fmt, 10, 1, [], now=NOW)
+    assert errors == []
+    (event,) = valid
+    assert (event.message_id, event.thread_id, event.reminder_sent) == (111, 222, True)
+    assert event.to_dict() == original.to_dict()
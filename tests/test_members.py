@@ -0,0 +1,34 @@
+# tests/test_members.py
+import asyncio
+from types import SimpleNamespace
+
+from members import MemberCache
+
+
+class FakeGuild:
+    def __init__(self, member_ids):
+        self.member_ids = set(member_ids)
+        self.queries = []
+
+    async def query_members(self, user_ids, cache):
+        self.queries.append(list(user_ids))
+        return [SimpleNamespace(id=uid) for uid in user_ids if uid in self.member_ids]
+
+
+def test_ids_not_returned_are_cached_as_missing():
+    cache = MemberCache()
+    guild = FakeGuild({1})
+    asyncio.run(cache.fetch_many(guild, [1, 2]))
+    assert cache.get(1).id == 1
+    assert cache.get(2) is None
+    assert cache.missing([1, 2]) == []
+
+    # El que se fue del servidor no se vuelve a pedir mientras dure el TTL
+    asyncio.run(cache.fetch_many(guild, [1, 2]))
+    assert len(guild.queries) == 1
+
+
+def test_missing_entries_expire():
+    cache = MemberCache(ttl=-1)
+    asyncio.run(cache.fetch_many(FakeGuild(set()), [2]))
+    assert cache.missing([2]) == [2]
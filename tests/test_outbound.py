@@ -0,0 +1,87 @@
+# tests/test_outbound.py
+import asyncio
+
+import pytest
+
+from outbound import DM, EDIT, INTERACTION, POST, OutboundScheduler, RouteBudget
+
+
+def test_budget_allows_burst_then_waits():
+    budget = RouteBudget(rate=2, burst=2)
+    now = budget.updated
+    for _ in range(2):
+        assert budget.wait_time(now) == 0
+        budget.take()
+    assert budget.wait_time(now) == pytest.approx(0.5)
+    # Medio segundo después hay otra ficha, y nunca más que la ráfaga
+    assert budget.wait_time(now + 0.5) == 0
+    assert budget.wait_time(now + 60) == 0 and budget.tokens == 2
+
+
+def run_calls(scheduler, calls):
+    """Encola `calls` [(prioridad, ruta, nombre)] a la vez; devuelve el orden de ejecución"""
+    order = []
+
+    def factory(name):
+        async def call():
+            order.append(name)
+            return name
+        return call
+
+    async def main():
+        try:
+            results = await asyncio.gather(*(scheduler.run(p, route, factory(name)) for p, route, name in calls))
+        finally:
+            await scheduler.stop()
+        assert results == [name for _, _, name in calls]
+
+    asyncio.run(main())
+    return order
+
+
+def test_most_urgent_class_goes_first():
+    scheduler = OutboundScheduler(concurrency=1)
+    order = run_calls(scheduler, [(DM, "dm", "dm"), (POST, "post:1", "post"), (EDIT, "edit:1", "edit")])
+    assert order == ["edit", "post", "dm"]
+    assert scheduler.sent == {INTERACTION: 0, EDIT: 1, POST: 1, DM: 1}
+
+
+def test_interactions_skip_the_queue():
+    async def main():
+        scheduler = OutboundScheduler()
+
+        async def reply():
+            return "ok"
+
+        assert await scheduler.run(INTERACTION, "interaccion", reply) == "ok"
+        assert scheduler._workers == []
+
+    asyncio.run(main())
+
+
+def test_route_without_budget_yields_to_other_routes():
+    scheduler = OutboundScheduler(concurrency=1, budgets={"edit": (50, 1)})
+    order = run_calls(scheduler, [
+        (EDIT, "edit:1", "canal1-a"),
+        (EDIT, "edit:1", "canal1-b"),
+        (EDIT, "edit:2", "canal2"),
+    ])
+    assert order == ["canal1-a", "canal2", "canal1-b"]
+    assert scheduler.deferred >= 1
+
+
+def test_errors_reach_the_caller():
+    async def main():
+        scheduler = OutboundScheduler(concurrency=1)
+
+        async def fail():
+            raise RuntimeError("403")
+
+        try:
+            with pytest.raises(RuntimeError):
+                await scheduler.run(POST, "post:1", fail)
+        finally:
+            await scheduler.stop()
+        assert scheduler.failed == 1
+
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+# tests/test_search.py
+from search import SearchIndex, normalize, tokenize
+
+
+def make_index():
+    index = SearchIndex()
+    index.index("raid", "Operación nocturna", "Asalto al puerto", "Marta")
+    index.index("scrim", "Scrim de tanques", "Práctica de blindados", "Luis")
+    index.index("lanzamiento", "Lanzamiento de temporada", "", "Marta")
+    return index
+
+
+def ids(results):
+    return [event_id for event_id, _score in results]
+
+
+def test_normalize_ignores_accents_and_case():
+    assert normalize("OPERACIÓN") == "operacion"
+    assert tokenize("La operación de noche") == ["operacion", "noche"]
+
+
+def test_search_is_accent_insensitive():
+    assert ids(make_index().search("operacion")) == ["raid"]
+
+
+def test_all_terms_must_match():
+    index = make_index()
+    assert ids(index.search("marta puerto")) == ["raid"]
+    assert index.search("marta blindados") == []
+
+
+def test_last_term_is_a_prefix():
+    index = make_index()
+    assert ids(index.search("tanq")) == ["scrim"]
+    # Palabra vacía al final: puede ser el principio de otra
+    assert ids(index.search("la")) == ["lanzamiento"]
+
+
+def test_title_scores_above_creator_and_description():
+    index = SearchIndex()
+    index.index("en_descripcion", "Patrulla", "noche de raid")
+    index.index("en_titulo", "Raid", "")
+    assert ids(index.search("raid")) == ["en_titulo", "en_descripcion"]
+
+
+def test_rank_breaks_ties():
+    index = SearchIndex()
+    index.index("viejo", "Raid")
+    index.index("nuevo", "Raid")
+    order = {"viejo": 1, "nuevo": 2}
+    assert ids(index.search("raid", rank=order.get)) == ["nuevo", "viejo"]
+
+
+def test_reindex_and_remove_drop_old_terms():
+    index = make_index()
+    index.index("raid", "Patrulla de día")
+    assert index.search("operacion") == []
+    index.remove("raid")
+    assert index.search("patrulla") == []
+    assert len(index) == 2
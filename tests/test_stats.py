@@ -0,0 +1,29 @@
+# tests/test_stats.py
+from stats import ATTENDANCE, AttendanceStats, RankedCounter
+
+
+def test_ranked_counter_top_and_ties():
+    counter = RankedCounter()
+    for user_id, n in ((1, 3), (2, 5), (3, 3)):
+        counter.add(user_id, n)
+    assert counter.top(2) == [(2, 5), (1, 3)]
+    counter.add(2, -5)
+    assert counter.get(2) == 0
+    assert counter.top(5) == [(1, 3), (3, 3)]
+
+
+def test_role_change_updates_roles_but_not_attendance(tmp_path):
+    stats = AttendanceStats(str(tmp_path / "stats.json"))
+    stats.update(5, set(), {"INF"})
+    stats.update(5, {"INF"}, {"TANQUE"})
+    assert stats.user_summary(5) == {"TANQUE": 1, ATTENDANCE: 1}
+    assert stats.role_totals == {"INF": 0, "TANQUE": 1}
+
+
+def test_tentative_and_declined_do_not_count_as_attendance(tmp_path):
+    stats = AttendanceStats(str(tmp_path / "stats.json"))
+    stats.update(5, set(), {"TENTATIVO"})
+    stats.update(6, set(), {"DECLINADO"})
+    assert stats.leaderboard(ATTENDANCE) == []
+    stats.update(5, {"TENTATIVO"}, {"INF"})
+    assert stats.leaderboard(ATTENDANCE) == [(5, 1)]